@@ -0,0 +1,59 @@
+"""
+Mixed insert/delete throughput of the self-balancing trees.
+
+Starts from a loaded tree, then applies a stream of random inserts and deletes.
+
+Usage: python -m benchmarks.bench_churn [size] [operations]
+"""
+import random
+import sys
+import time
+
+from pymaps import AVLTree, RedBlackTree
+
+
+def measure(name, factory, keys, operations):
+    tree = factory.from_sorted((key, key) for key in sorted(keys))
+
+    start = time.perf_counter()
+    for insert, key in operations:
+        if insert:
+            tree[key] = key
+        else:
+            del tree[key]
+    elapsed = time.perf_counter() - start
+
+    print("%-14s %8.3fs %10.0f ops/s" % (name, elapsed, len(operations) / elapsed))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    operation_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+    keys = random.sample(range(size * 4), size)
+    present = set(keys)
+    present_list = list(keys)
+    operations = []
+
+    for _ in range(operation_count):
+        if random.random() < 0.5:
+            key = random.randrange(size * 4)
+            operations.append((True, key))
+            if key not in present:
+                present.add(key)
+                present_list.append(key)
+        else:
+            i = random.randrange(len(present_list))
+            key = present_list[i]
+            present_list[i] = present_list[-1]
+            present_list.pop()
+            present.discard(key)
+            operations.append((False, key))
+
+    print("%d keys, %d mixed inserts and deletes" % (size, operation_count))
+    measure("AVLTree", AVLTree, keys, operations)
+    measure("RedBlackTree", RedBlackTree, keys, operations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Reader throughput of a shared map while a background thread keeps writing.
+
+Compares a tree behind a single global mutex with ConcurrentSortedMap, over a PersistentAVLTree (lock-free
+reads of published snapshots) and over an AVLTree (reader/writer lock), both with batched commits.
+
+Usage: python -m benchmarks.bench_concurrent [size] [readers] [seconds] [pause between write batches]
+"""
+import random
+import sys
+import threading
+import time
+
+from pymaps import AVLTree, ConcurrentSortedMap, PersistentAVLTree
+
+
+class MutexMap:
+    """
+    The baseline: every call is serialized by one lock
+    """
+
+    def __init__(self, tree):
+        self._tree = tree
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._tree[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._tree[key] = value
+
+    def write_batch(self, items):
+        for key, value in items:
+            self[key] = value
+
+
+def write_batch(concurrent_map, items):
+    with concurrent_map.batch() as batch:
+        for key, value in items:
+            batch[key] = value
+
+
+def measure(name, shared_map, write, size, reader_count, duration, pause):
+    stop = threading.Event()
+    read_counts = [0] * reader_count
+    write_count = [0]
+
+    def read(slot):
+        rng = random.Random(slot)
+        count = 0
+        while not stop.is_set():
+            for _ in range(100):
+                shared_map[rng.randrange(size)]
+            count += 100
+        read_counts[slot] = count
+
+    def update():
+        rng = random.Random(-1)
+        while not stop.is_set():
+            write(shared_map, [(rng.randrange(size), 0) for _ in range(64)])
+            write_count[0] += 64
+            time.sleep(pause)
+
+    threads = [threading.Thread(target=read, args=(slot,)) for slot in range(reader_count)]
+    threads.append(threading.Thread(target=update))
+
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print("%-22s %10.0f reads/s %10.0f writes/s" % (name, sum(read_counts) / duration, write_count[0] / duration))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    reader_count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+    pause = float(sys.argv[4]) if len(sys.argv) > 4 else 0.001
+
+    pairs = [(key, key) for key in range(size)]
+
+    print("%d keys, %d readers, 1 writer pausing %.4fs between batches of 64, %.1fs"
+          % (size, reader_count, pause, duration))
+    measure("global mutex", MutexMap(AVLTree.from_sorted(pairs)), MutexMap.write_batch, size, reader_count,
+            duration, pause)
+    measure("Concurrent (snapshots)", ConcurrentSortedMap(PersistentAVLTree.from_sorted(pairs)), write_batch,
+            size, reader_count, duration, pause)
+    measure("Concurrent (AVLTree)", ConcurrentSortedMap(AVLTree.from_sorted(pairs)), write_batch, size,
+            reader_count, duration, pause)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Cold and warm range scans of the on-disk B+ tree, next to the in-memory one.
+
+Cold: a freshly opened tree with an empty node cache (and, where supported, the file dropped from
+the OS page cache). Warm: the same scans again, with the nodes cached.
+
+Usage: python -m benchmarks.bench_disk [size] [scans] [scan length] [cache size]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from pymaps import BPlusTree, DiskBPlusTree
+
+
+def drop_os_cache(path):
+    if hasattr(os, "posix_fadvise"):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def measure(name, tree, starts, length):
+    start = time.perf_counter()
+    count = 0
+    for key in starts:
+        count += len(tree.slice(key, key + length))
+    elapsed = time.perf_counter() - start
+
+    print("%-28s %8.3fs %12.0f keys/s" % (name, elapsed, count / elapsed))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    scan_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    length = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    cache_size = int(sys.argv[4]) if len(sys.argv) > 4 else 1024
+
+    starts = [random.randrange(size) for _ in range(scan_count)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tree.bin")
+
+        start = time.perf_counter()
+        DiskBPlusTree.from_sorted(path, ((key, key) for key in range(size))).close()
+        print("%d keys written in %.3fs, %.1f MB, %d scans of %d keys, cache of %d nodes"
+              % (size, time.perf_counter() - start, os.path.getsize(path) / 1e6, scan_count, length, cache_size))
+
+        drop_os_cache(path)
+
+        with DiskBPlusTree(path, cache_size=cache_size) as tree:
+            measure("DiskBPlusTree cold", tree, starts, length)
+            measure("DiskBPlusTree warm", tree, starts, length)
+
+    measure("BPlusTree (memory)", BPlusTree.from_sorted(((key, key) for key in range(size)), order=128), starts,
+            length)
+
+
+if __name__ == "__main__":
+    main()
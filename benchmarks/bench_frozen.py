@@ -0,0 +1,41 @@
+"""
+Read throughput of a frozen map against the tree it was frozen from.
+
+Usage: python -m benchmarks.bench_frozen [size] [lookups]
+"""
+import random
+import sys
+import time
+
+from pymaps import AVLTree
+
+
+def measure(name, operation, probes):
+    start = time.perf_counter()
+    for key in probes:
+        operation(key)
+    elapsed = time.perf_counter() - start
+
+    print("%-28s %8.3fs %10.0f ops/s" % (name, elapsed, len(probes) / elapsed))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    lookup_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+
+    tree = AVLTree.from_sorted((key, key) for key in range(0, 2 * size, 2))
+
+    start = time.perf_counter()
+    frozen = tree.freeze()
+    print("%d keys, frozen in %.3fs" % (size, time.perf_counter() - start))
+
+    probes = [random.randrange(2 * size) for _ in range(lookup_count)]
+
+    for name, structure in [("AVLTree", tree), ("FrozenSortedMap", frozen)]:
+        measure("%s get" % name, structure.__getitem__, probes)
+        measure("%s find_gte" % name, structure.find_gte, probes)
+        measure("%s index_of" % name, structure.index_of, probes)
+
+
+if __name__ == "__main__":
+    main()
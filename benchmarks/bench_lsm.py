@@ -0,0 +1,70 @@
+"""
+Random writes (inserts, overwrites and deletes), then point reads and range scans, on the LSM map
+and on a plain AVLTree.
+
+Usage: python -m benchmarks.bench_lsm [size] [memtable size] [max runs]
+"""
+import random
+import sys
+import tempfile
+import time
+
+from pymaps import AVLTree, LSMSortedMap
+
+
+def measure(name, operation, count):
+    start = time.perf_counter()
+    operation()
+    elapsed = time.perf_counter() - start
+
+    print("%-42s %8.3fs %12.0f ops/s" % (name, elapsed, count / elapsed))
+
+
+def write(container, keys):
+    for i, key in enumerate(keys):
+        if i % 10 == 9:
+            del container[key]
+        else:
+            container[key] = i
+
+
+def read(container, keys):
+    for key in keys:
+        container[key]
+
+
+def scan(container, starts):
+    for key in starts:
+        container.slice(key, key + 100)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    memtable_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    max_runs = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    keys = [random.randrange(size) for _ in range(size)]
+    lookups = random.sample(keys, min(len(keys), 50000))
+    starts = random.sample(keys, min(len(keys), 2000))
+
+    print("%d writes, memtable of %d keys, at most %d runs" % (size, memtable_size, max_runs))
+
+    with tempfile.TemporaryDirectory() as directory:
+        containers = [
+            ("AVLTree", AVLTree()),
+            ("LSMSortedMap (memory)", LSMSortedMap(memtable_size, max_runs)),
+            ("LSMSortedMap (memory, background)", LSMSortedMap(memtable_size, max_runs, background=True)),
+            ("LSMSortedMap (disk)", LSMSortedMap(memtable_size, max_runs, directory=directory)),
+        ]
+
+        for name, container in containers:
+            measure(name + " writes", lambda: write(container, keys), len(keys))
+            measure(name + " reads", lambda: read(container, lookups), len(lookups))
+            measure(name + " scans", lambda: scan(container, starts), len(starts))
+
+            if isinstance(container, LSMSortedMap):
+                container.close()
+
+
+if __name__ == "__main__":
+    main()
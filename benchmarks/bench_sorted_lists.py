@@ -0,0 +1,68 @@
+"""
+Throughput of the SortedList implementations.
+
+Usage: python -m benchmarks.bench_sorted_lists [size]
+"""
+import random
+import sys
+import time
+
+from pymaps import AVLSortedList, ChunkedSortedList, SkipListSortedList
+
+
+def timed(operation, count):
+    start = time.perf_counter()
+    operation()
+    return count / (time.perf_counter() - start)
+
+
+def measure(name, factory, elements, indices):
+    sorted_list = factory()
+
+    def append():
+        for element in elements:
+            sorted_list.append(element)
+
+    def at_index():
+        for index in indices:
+            sorted_list.at_index(index)
+
+    def index_of():
+        for element in elements:
+            sorted_list.index_of(element)
+
+    def find_gt():
+        for element in elements:
+            sorted_list.find_gt(element)
+
+    def scan():
+        for _ in sorted_list:
+            pass
+
+    print("%-24s %10.0f %10.0f %10.0f %10.0f %10.0f" % (
+        name,
+        timed(append, len(elements)),
+        timed(at_index, len(indices)),
+        timed(index_of, len(elements)),
+        timed(find_gt, len(elements)),
+        timed(scan, len(elements))))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    random_elements = [random.randrange(size) for _ in range(size)]
+    ascending_elements = sorted(random_elements)
+    indices = [random.randrange(size) for _ in range(size)]
+
+    print("%d elements, operations per second" % size)
+    print("%-24s %10s %10s %10s %10s %10s" % ("", "append", "at_index", "index_of", "find_gt", "iterate"))
+
+    for distribution, elements in [("random", random_elements), ("ascending", ascending_elements)]:
+        measure("AVLSortedList " + distribution, AVLSortedList, elements, indices)
+        measure("SkipList " + distribution, SkipListSortedList, elements, indices)
+        measure("Chunked " + distribution, ChunkedSortedList, elements, indices)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Memory per key and insert/search throughput of the node storage engines.
+
+Compares AVLTree (one object per node) with ArrayAVLTree (parallel int32 columns).
+
+Usage: python -m benchmarks.bench_storage [size]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from pymaps import AVLTree, ArrayAVLTree
+
+
+def measure(name, factory, keys, probes):
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    tree = factory()
+    for key in keys:
+        tree[key] = None
+
+    insert_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for key in probes:
+        tree[key]
+    search_time = time.perf_counter() - start
+
+    # keys are shared small ints and values are None, so the memory is the structure itself
+    print("%-14s %8.1f bytes/key %10.0f inserts/s %10.0f searches/s" % (
+        name, memory / len(keys), len(keys) / insert_time, len(probes) / search_time))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    keys = list(range(size))
+    random.shuffle(keys)
+    probes = [random.randrange(size) for _ in range(size)]
+
+    print("%d random keys" % size)
+    measure("AVLTree", AVLTree, keys, probes)
+    measure("ArrayAVLTree", ArrayAVLTree, keys, probes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+"""
+Micro-benchmark suite: the operations of BinarySearchTree, AVLTree and AVLSortedList across sizes and key
+distributions, next to dict + bisect and list + bisect baselines.
+
+For every container, distribution and size, the container is built by inserting the keys one by one, the last
+inserts being timed. Then searches, slices, at_index, index_of and finally removes are timed one by one, which
+gives the throughput and the latency percentiles of each operation. The cost of the timer and of the call
+is measured once and subtracted. A case stops, and is marked incomplete, once it runs longer than the budget.
+
+The report has one table per distribution and operation: the median latency by size (the scaling curve), its
+ratio to the baseline, and the slope of the curve on a log-log scale (0 for O(1), about 1 for O(n)).
+With --output, the results are also written as JSON. The inputs are seeded, so two runs on two commits can
+be compared with --compare.
+
+Runs on the Python versions tested by the CI (3.4 and later).
+
+Usage: python -m benchmarks.bench_suite [--sizes 1e3,1e4,1e5] [--distributions sorted,random,zipf,duplicates]
+                                        [--containers BinarySearchTree,AVLTree,...] [--ops 1000] [--budget 60]
+                                        [--seed 0] [--output results.json]
+       python -m benchmarks.bench_suite --compare before.json after.json [--threshold 0.1]
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from benchmarks.bench_zipf import zipf_keys
+from pymaps import AVLSortedList, AVLTree, BinarySearchTree
+
+OPERATIONS = ["insert", "search", "slice", "at_index", "index_of", "remove"]
+SLICE_LENGTH = 100
+
+
+class BisectMap:
+    """
+    Baseline map: a dict for the lookups, and a list of the keys kept sorted with bisect for the ordered operations
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._keys = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __setitem__(self, key, value):
+        if key not in self._values:
+            insort(self._keys, key)
+        self._values[key] = value
+
+    def __getitem__(self, key):
+        return self._values.get(key)
+
+    def __delitem__(self, key):
+        if key in self._values:
+            del self._values[key]
+            del self._keys[bisect_left(self._keys, key)]
+
+    def slice(self, start, stop):
+        keys = self._keys[bisect_left(self._keys, start):bisect_left(self._keys, stop)]
+        return [(key, self._values[key]) for key in keys]
+
+    def at_index(self, index):
+        key = self._keys[index]
+        return key, self._values[key]
+
+    def index_of(self, key):
+        return bisect_left(self._keys, key) if key in self._values else None
+
+
+class BisectList:
+    """
+    Baseline sorted list: a list kept sorted with bisect, with the methods of AVLSortedList used by the suite
+    """
+
+    def __init__(self):
+        self._elements = []
+
+    def __len__(self):
+        return len(self._elements)
+
+    def append(self, element):
+        insort(self._elements, element)
+
+    def __contains__(self, element):
+        index = bisect_left(self._elements, element)
+        return index < len(self._elements) and self._elements[index] == element
+
+    def __delitem__(self, index):
+        del self._elements[index]
+
+    def bisect_left(self, element):
+        return bisect_left(self._elements, element)
+
+    def slice_by_index(self, start, stop):
+        return self._elements[start:stop]
+
+    def at_index(self, index):
+        return self._elements[index]
+
+    def index_of(self, element):
+        return self.bisect_left(element) if element in self else None
+
+
+def _remove_element(sorted_list, element):
+    del sorted_list[sorted_list.bisect_left(element)]
+
+
+def _slice_elements(sorted_list, bounds):
+    return sorted_list.slice_by_index(sorted_list.bisect_left(bounds[0]), sorted_list.bisect_left(bounds[1]))
+
+
+def _set_key(tree, key):
+    tree[key] = key
+
+
+def _del_key(tree, key):
+    del tree[key]
+
+
+MAP_OPERATIONS = {
+    "insert": _set_key,
+    "search": lambda tree, key: tree[key],
+    "slice": lambda tree, bounds: tree.slice(bounds[0], bounds[1]),
+    "at_index": lambda tree, index: tree.at_index(index),
+    "index_of": lambda tree, key: tree.index_of(key),
+    "remove": _del_key,
+}
+
+# AVLSortedList has no slice by value nor remove by value, both go through bisect_left
+LIST_OPERATIONS = {
+    "insert": lambda sorted_list, element: sorted_list.append(element),
+    "search": lambda sorted_list, element: element in sorted_list,
+    "slice": _slice_elements,
+    "at_index": lambda sorted_list, index: sorted_list.at_index(index),
+    "index_of": lambda sorted_list, element: sorted_list.index_of(element),
+    "remove": _remove_element,
+}
+
+CONTAINERS = OrderedDict([
+    ("BinarySearchTree", (BinarySearchTree, MAP_OPERATIONS)),
+    ("AVLTree", (AVLTree, MAP_OPERATIONS)),
+    ("dict+bisect", (BisectMap, MAP_OPERATIONS)),
+    ("AVLSortedList", (AVLSortedList, LIST_OPERATIONS)),
+    ("list+bisect", (BisectList, LIST_OPERATIONS)),
+])
+
+BASELINES = {
+    "BinarySearchTree": "dict+bisect",
+    "AVLTree": "dict+bisect",
+    "AVLSortedList": "list+bisect",
+}
+
+DISTRIBUTIONS = OrderedDict([
+    ("sorted", lambda size, rng: list(range(size))),
+    ("random", lambda size, rng: rng.sample(range(10 * size), size)),
+    ("zipf", lambda size, rng: zipf_keys(size, size, 1.2, rng)),
+    ("duplicates", lambda size, rng: [rng.randrange(max(1, size // 100)) for _ in range(size)]),
+])
+
+
+class Workload:
+    """
+    The keys of a (distribution, size) case and the arguments of every operation, the same for every container
+    """
+
+    def __init__(self, distribution, size, ops, seed):
+        rng = random.Random("%d-%s-%d" % (seed, distribution, size))
+
+        self.keys = DISTRIBUTIONS[distribution](size, rng)
+        unique_keys = sorted(set(self.keys))
+        ops = min(ops, size)
+
+        # the searched keys follow the distribution, so a skewed distribution searches the popular keys
+        self.searched = [rng.choice(self.keys) for _ in range(ops)]
+
+        # a slice covers about SLICE_LENGTH distinct keys
+        width = max(1, (unique_keys[-1] - unique_keys[0] + 1) * SLICE_LENGTH // len(unique_keys))
+        self.bounds = [(key, key + width) for key in [rng.choice(self.keys) for _ in range(ops)]]
+
+        self.positions = [rng.random() for _ in range(ops)]
+        self.removed_keys = rng.sample(unique_keys, min(ops, len(unique_keys)))
+        self.removed_elements = rng.sample(self.keys, ops)
+
+
+def _time_each(operation, container, arguments, deadline, overhead):
+    """
+    :return: the latencies in nanoseconds, fewer than arguments if the deadline was reached
+    """
+    clock = time.perf_counter
+    latencies = []
+
+    # like timeit, the collector is paused so that its pauses do not land on random operations
+    gc.disable()
+    try:
+        for argument in arguments:
+            start = clock()
+            operation(container, argument)
+            latencies.append(max(0, (clock() - start) * 1e9 - overhead))
+
+            if clock() > deadline:
+                break
+    finally:
+        gc.enable()
+
+    return latencies
+
+
+def _timer_overhead():
+    latencies = _time_each(lambda container, argument: None, None, range(10000), float("inf"), 0)
+    return sorted(latencies)[len(latencies) // 2]
+
+
+def _summary(latencies, expected):
+    latencies = sorted(latencies)
+
+    if not latencies:
+        return {"ops": 0, "complete": False}
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, len(latencies) * p // 100)]
+
+    return {
+        "ops": len(latencies),
+        "complete": len(latencies) == expected,
+        "throughput": len(latencies) / (max(1, sum(latencies)) / 1e9),
+        "mean_ns": sum(latencies) / len(latencies),
+        "p50_ns": percentile(50),
+        "p90_ns": percentile(90),
+        "p99_ns": percentile(99),
+        "max_ns": latencies[-1],
+    }
+
+
+def run_case(name, workload, budget, overhead):
+    """
+    Build the container and time every operation
+    :return: a dict of summaries by operation
+    """
+    factory, operations = CONTAINERS[name]
+    deadline = time.perf_counter() + budget
+    container = factory()
+    keys = workload.keys
+    timed_inserts = len(workload.searched)
+
+    for i in range(len(keys) - timed_inserts):
+        operations["insert"](container, keys[i])
+
+        if i % 1024 == 0 and time.perf_counter() > deadline:
+            return {operation: {"ops": 0, "complete": False} for operation in OPERATIONS}
+
+    is_list = operations is LIST_OPERATIONS
+    arguments = {
+        "insert": keys[len(keys) - timed_inserts:],
+        "search": workload.searched,
+        "slice": workload.bounds,
+        "at_index": None,
+        "index_of": workload.searched,
+        "remove": workload.removed_elements if is_list else workload.removed_keys,
+    }
+
+    results = {}
+
+    for operation in OPERATIONS:
+        if operation == "at_index":
+            arguments[operation] = [int(position * len(container)) for position in workload.positions]
+
+        latencies = _time_each(operations[operation], container, arguments[operation], deadline, overhead)
+        results[operation] = _summary(latencies, len(arguments[operation]))
+
+    return results
+
+
+def _git_commit():
+    try:
+        output = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+                                         cwd=os.path.dirname(os.path.abspath(__file__)), universal_newlines=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.strip()
+
+
+def _slope(points):
+    """
+    :param points: (size, latency) pairs
+    :return: the slope of the latency by size on a log-log scale, between the first and the last point
+    """
+    if len(points) < 2:
+        return None
+
+    (first_size, first_latency), (last_size, last_latency) = points[0], points[-1]
+
+    if first_latency <= 0 or last_latency <= 0:
+        return None
+
+    return math.log(last_latency / first_latency) / math.log(last_size / first_size)
+
+
+def print_report(records, sizes):
+    indexed = {(r["container"], r["distribution"], r["size"], r["operation"]): r for r in records}
+    containers = list(OrderedDict.fromkeys(r["container"] for r in records))
+
+    for distribution in OrderedDict.fromkeys(r["distribution"] for r in records):
+        for operation in OPERATIONS:
+            print()
+            print("%s / %s: median latency by size (ratio to the baseline)" % (distribution, operation))
+            print("%-18s" % "" + "".join("%22s" % ("n=%d" % size) for size in sizes) + "%8s" % "slope")
+
+            for container in containers:
+                cells, points = [], []
+
+                for size in sizes:
+                    record = indexed.get((container, distribution, size, operation))
+
+                    if record is None or record["ops"] == 0:
+                        cells.append("%22s" % "-")
+                        continue
+
+                    latency = record["p50_ns"]
+                    points.append((size, latency))
+                    baseline = indexed.get((BASELINES.get(container), distribution, size, operation))
+
+                    cell = "%dns" % latency + ("" if record["complete"] else "*")
+                    if baseline is not None and baseline["ops"] > 0 and baseline["p50_ns"] > 0:
+                        cell += " (x%.1f)" % (latency / baseline["p50_ns"])
+
+                    cells.append("%22s" % cell)
+
+                slope = _slope(points)
+                print("%-18s" % container + "".join(cells) + ("%8.2f" % slope if slope is not None else "%8s" % "-"))
+
+    print()
+    print("* stopped by the budget before the end of the operations")
+
+
+def compare(before_path, after_path, threshold):
+    """
+    Print the change of the median latency of every case present in both runs. The median is compared rather
+    than the throughput, which follows the mean and moves with every outlier
+    :return: the number of regressions larger than the threshold
+    """
+    with open(before_path) as file:
+        before = json.load(file)
+    with open(after_path) as file:
+        after = json.load(file)
+
+    def index(run):
+        return {(r["container"], r["distribution"], r["size"], r["operation"]): r for r in run["results"]
+                if r["ops"] > 0}
+
+    before_records, after_records = index(before), index(after)
+    regressions = 0
+
+    print("%s -> %s" % (before["meta"].get("commit"), after["meta"].get("commit")))
+    print("%-18s %-11s %9s %-9s %12s %12s %8s" % ("container", "keys", "size", "operation", "before p50",
+                                                  "after p50", "change"))
+
+    for key in before_records:
+        if key not in after_records:
+            continue
+
+        old, new = before_records[key]["p50_ns"], after_records[key]["p50_ns"]
+        change = new / max(1, old) - 1
+        flag = ""
+
+        if change > threshold:
+            flag = "  slower"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  faster"
+
+        print("%-18s %-11s %9d %-9s %10dns %10dns %+7.1f%%%s" % (key + (old, new, change * 100, flag)))
+
+    print("%d regressions above %.0f%%" % (regressions, threshold * 100))
+    return regressions
+
+
+def _parse_list(text, choices):
+    names = text.split(",")
+
+    for name in names:
+        if name not in choices:
+            raise argparse.ArgumentTypeError("%s is not one of %s" % (name, ", ".join(choices)))
+
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark suite of the pymaps containers")
+    parser.add_argument("--sizes", default="1e3,1e4,1e5",
+                        type=lambda text: [int(float(size)) for size in text.split(",")],
+                        help="comma separated sizes, up to 1e7 (memory permitting)")
+    parser.add_argument("--distributions", default=",".join(DISTRIBUTIONS),
+                        type=lambda text: _parse_list(text, DISTRIBUTIONS))
+    parser.add_argument("--containers", default=",".join(CONTAINERS),
+                        type=lambda text: _parse_list(text, CONTAINERS))
+    parser.add_argument("--ops", type=int, default=1000, help="the number of timed operations of each kind")
+    parser.add_argument("--budget", type=float, default=60, help="the maximal duration of a case, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two JSON results")
+    parser.add_argument("--threshold", type=float, default=0.1, help="the relative change reported by --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(args.compare[0], args.compare[1], args.threshold) > 0 else 0)
+
+    overhead = _timer_overhead()
+    records = []
+
+    for distribution in args.distributions:
+        for size in args.sizes:
+            workload = Workload(distribution, size, args.ops, args.seed)
+
+            for container in args.containers:
+                start = time.perf_counter()
+                results = run_case(container, workload, args.budget, overhead)
+                print("%-18s %-11s n=%-9d %7.2fs" % (container, distribution, size, time.perf_counter() - start),
+                      file=sys.stderr)
+
+                for operation in OPERATIONS:
+                    record = {"container": container, "distribution": distribution, "size": size,
+                              "operation": operation}
+                    record.update(results[operation])
+                    records.append(record)
+
+            del workload
+
+    print_report(records, args.sizes)
+
+    if args.output:
+        meta = {
+            "commit": _git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": "%s %s" % (platform.python_implementation(), platform.python_version()),
+            "machine": platform.machine(),
+            "timer_overhead_ns": overhead,
+            "ops": args.ops,
+            "budget": args.budget,
+            "seed": args.seed,
+        }
+
+        with open(args.output, "w") as file:
+            json.dump({"meta": meta, "results": records}, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
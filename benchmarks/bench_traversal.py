@@ -0,0 +1,49 @@
+"""
+Full scan throughput of the tree traversals.
+
+Compares the explicit stack traversal engine of BinarySearchTree with the
+recursive generator chain it replaced.
+
+Usage: python -m benchmarks.bench_traversal [size]
+"""
+import sys
+import time
+
+from pymaps import AVLTree
+from pymaps.trees.BinarySearchTree import LEFT_CHILD, RIGHT_CHILD
+
+
+def recursive_inorder(node):
+    if node is None:
+        return
+
+    yield from recursive_inorder(node.get_child(LEFT_CHILD))
+    yield node
+    yield from recursive_inorder(node.get_child(RIGHT_CHILD))
+
+
+def scan(name, generator, size):
+    start = time.perf_counter()
+    count = sum(1 for _ in generator)
+    elapsed = time.perf_counter() - start
+
+    assert count == size
+    print("%-12s %8.3fs %12.0f nodes/s" % (name, elapsed, size / elapsed))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    tree = AVLTree.from_sorted((i, i) for i in range(size))
+
+    print("Full scan of %d keys" % size)
+    scan("recursive", recursive_inorder(tree._root), size)
+    scan("inorder", tree._inorder_traversal(tree._root), size)
+    scan("preorder", tree._preorder_traversal(tree._root), size)
+    scan("postorder", tree._postorder_traversal(tree._root), size)
+    scan("bfs", tree._gen_bfs(), size)
+    scan("__iter__", iter(tree), size)
+
+
+if __name__ == "__main__":
+    main()
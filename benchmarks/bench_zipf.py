@@ -0,0 +1,51 @@
+"""
+Lookup throughput on Zipf-distributed (skewed) keys.
+
+Usage: python -m benchmarks.bench_zipf [size] [lookups] [exponent]
+"""
+import itertools
+import random
+import sys
+import time
+from bisect import bisect
+
+from pymaps import AVLTree, SplayTree
+
+
+def zipf_keys(size, count, exponent, rng=random):
+    """
+    Draw keys where the k-th most popular key is drawn with a probability proportional to 1 / k^exponent.
+    The popular keys are spread over the key space. rng is the random module or a seeded random.Random.
+    """
+    ranked_keys = rng.sample(range(size), size)
+    cumulative_weights = list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, size + 1)))
+    total = cumulative_weights[-1]
+    return [ranked_keys[bisect(cumulative_weights, rng.random() * total)] for _ in range(count)]
+
+
+def measure(name, tree, lookups):
+    start = time.perf_counter()
+    for key in lookups:
+        tree[key]
+    elapsed = time.perf_counter() - start
+
+    print("%-24s %8.3fs %10.0f lookups/s" % (name, elapsed, len(lookups) / elapsed))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    lookup_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    exponent = float(sys.argv[3]) if len(sys.argv) > 3 else 1.2
+
+    pairs = [(key, key) for key in range(size)]
+    lookups = zipf_keys(size, lookup_count, exponent)
+
+    print("%d keys, %d Zipf lookups (s=%.2f)" % (size, lookup_count, exponent))
+    measure("AVLTree", AVLTree.from_sorted(pairs), lookups)
+
+    for interval in [1, 4, 16]:
+        measure("SplayTree interval=%d" % interval, SplayTree.from_sorted(pairs, splay_interval=interval), lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,63 @@
+def dedup_sorted_pairs(items):
+    """
+    Check that (key, value) pairs are sorted by key, keeping the last value of repeated keys.
+    The pairs are read lazily, one ahead of the pair yielded.
+    :param items: an iterable of (key, value) tuples sorted by key
+    :return: generator of (key, value) tuples with strictly increasing keys
+    """
+    pending = None
+
+    for key, value in items:
+        if pending is not None:
+            if key == pending[0]:
+                pending = (key, value)
+                continue
+            elif key < pending[0]:
+                raise ValueError("The items are not sorted by key")
+            yield pending
+        pending = (key, value)
+
+    if pending is not None:
+        yield pending
+
+
 class SortedContainer:
 
     def __init__(self):
         pass
 
+    def _range_indices(self, start, stop, inclusive, bisect_left, bisect_right):
+        """
+        Find the positions of the elements of a slice between two values
+        :param start: the start of the range (inclusive), None for the min
+        :param stop: the stop of the range (inclusive if specified else exclusive), None for the max
+        :param inclusive: if we include the stop or not
+        :param bisect_left: function element -> number of elements smaller than the element
+        :param bisect_right: function element -> number of elements smaller or equal to the element
+        :return: (first, last), the positions of the first element and after the last one, first <= last
+        """
+        if start is not None and stop is not None and start > stop:
+            raise ValueError("Cannot search for a slice with a start greater than a stop")
+
+        first = bisect_left(start) if start is not None else 0
+
+        if stop is None:
+            last = len(self)
+        elif inclusive:
+            last = bisect_right(stop)
+        else:
+            last = bisect_left(stop)
+
+        return first, max(first, last)
+
+    @staticmethod
+    def _step_count(first, last, step):
+        """
+        :return: the number of positions from first (inclusive) to last (exclusive), taking one every step
+        """
+        step = 1 if step is None else step
+        return (last - first + step - 1) // step
+
     def clear(self):
         raise NotImplementedError()
 
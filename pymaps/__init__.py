@@ -1,5 +1,16 @@
 from pymaps.trees.BinarySearchTree import BinarySearchTree
 from pymaps.trees.AVLTree import AVLTree
+from pymaps.trees.RedBlackTree import RedBlackTree
+from pymaps.trees.SplayTree import SplayTree
+from pymaps.trees.ArrayAVLTree import ArrayAVLTree
+from pymaps.trees.BPlusTree import BPlusTree
+from pymaps.trees.DiskBPlusTree import DiskBPlusTree
+from pymaps.trees.FrozenSortedMap import FrozenSortedMap
+from pymaps.trees.PersistentAVLTree import PersistentAVLTree
 from pymaps.adapters.AVLSortedList import AVLSortedList
+from pymaps.adapters.ChunkedSortedList import ChunkedSortedList
+from pymaps.adapters.SkipListSortedList import SkipListSortedList
+from pymaps.adapters.ConcurrentSortedMap import ConcurrentSortedMap
+from pymaps.adapters.LSMSortedMap import LSMSortedMap
 from pymaps.SortedContainer import SortedContainer
 from pymaps.adapters.SortedList import SortedList
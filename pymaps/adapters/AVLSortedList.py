@@ -3,7 +3,7 @@ from pymaps.trees.AVLTree import AVLTree, HeightAwareNode
 
 # TODO we need to take in account that we can insert multiple times an item. We need to keep track of how many time
 # it is in the array
-from pymaps.trees.BinarySearchTree import RIGHT_CHILD, LEFT_CHILD
+from pymaps.trees.BinarySearchTree import RIGHT_CHILD, LEFT_CHILD, _fill_array
 
 
 class SortedListNode(HeightAwareNode):
@@ -21,13 +21,224 @@ class SortedListNode(HeightAwareNode):
 class AVLSortedList(SortedList, AVLTree):
     __slots__ = ["_node_count"]
 
-    def __init__(self):
+    def __init__(self, enable_threading=False):
         super().__init__()
         self._item_count = 0
+        self._enable_threading = enable_threading
+
+    @classmethod
+    def from_sorted(cls, elements, enable_threading=False):
+        """
+        Build a sorted list from elements that are already sorted.
+        Equal elements are grouped in a single node, like append does.
+        :performance: O(n)
+        :param elements: an iterable of sorted elements
+        :param enable_threading: see BinarySearchTree.__init__
+        :return: the new sorted list
+        """
+        pairs = cls._group_sorted_elements(elements)
+
+        sorted_list = cls(enable_threading=enable_threading)
+        sorted_list._bulk_load(pairs)
+        return sorted_list
+
+    @classmethod
+    def bulk_load(cls, elements, enable_threading=False):
+        """
+        Build a sorted list from elements in any order
+        :performance: O(n log(n))
+        :param elements: an iterable of elements
+        :param enable_threading: see BinarySearchTree.__init__
+        :return: the new sorted list
+        """
+        return cls.from_sorted(sorted(elements), enable_threading=enable_threading)
+
+    @classmethod
+    def from_arrays(cls, elements, enable_threading=False):
+        """
+        Build a sorted list from an array of elements in any order
+        :performance: O(n log(n)), O(n) if the elements are already sorted
+        :param elements: a numpy array, an array.array or a list of elements
+        :param enable_threading: see BinarySearchTree.__init__
+        :return: the new sorted list
+        """
+        elements = elements.tolist() if hasattr(elements, "tolist") else elements
+        return cls.bulk_load(elements, enable_threading=enable_threading)
+
+    @staticmethod
+    def _group_sorted_elements(elements):
+        """
+        Group sorted elements as (element, count) tuples
+        :param elements: an iterable of sorted elements
+        :return: a list of (element, count) tuples with strictly increasing elements
+        """
+        pairs = []
+
+        for element in elements:
+            if pairs:
+                last_element, count = pairs[-1]
+                if element == last_element:
+                    pairs[-1] = (last_element, count + 1)
+                    continue
+                elif element < last_element:
+                    raise ValueError("The elements are not sorted")
+            pairs.append((element, 1))
+
+        return pairs
+
+    def update(self, elements):
+        """
+        Append a batch of elements. The batch is sorted, then either appended one by one (small batch)
+        or merged with the content of the list and rebuilt in linear time (large batch).
+        :performance: O(m log(m) + min(m log(n + m), n + m)) for a batch of size m
+        :param elements: an iterable of elements
+        :return: void
+        """
+        batch = self._group_sorted_elements(sorted(elements))
+
+        if self._prefer_rebuild(len(batch)):
+            self._bulk_load(self._merge_sorted_pairs(self._pairs(), batch, lambda old, new: old + new))
+        else:
+            for element, count in batch:
+                for _ in range(count):
+                    self.append(element)
 
     def __len__(self):
         return self._item_count
 
+    def _options(self):
+        return dict(enable_threading=self._enable_threading)
+
+    def _bulk_load(self, pairs):
+        super()._bulk_load(pairs)
+        self._item_count = sum(count for _, count in pairs)
+
+    def split(self, key):
+        """
+        Split the list in two lists: the elements smaller than the element, and the elements greater or equal to it.
+        The nodes are moved, not copied, and this list is left empty.
+        :performance: O(log(n) + min(k, n - k)) for k distinct elements on the left, the nodes of the smaller
+        side being counted
+        :param key: the element where to cut
+        :return: (left, right) the two new lists
+        """
+        node_count = self._node_count
+        left, right = super().split(key)
+
+        # the subtree sizes give the number of elements of each side, but not its number of nodes
+        for side in (left, right):
+            side._item_count = side._root.get_subtree_size() if side._root is not None else 0
+
+        smaller, larger = (left, right) if len(left) <= len(right) else (right, left)
+        smaller._node_count = sum(1 for _ in smaller._inorder_traversal(smaller._root))
+        larger._node_count = node_count - smaller._node_count
+
+        return left, right
+
+    @classmethod
+    def join(cls, left, right):
+        """
+        Concatenate two lists, where every element of the left list is smaller than every element of the right list.
+        The nodes are moved, not copied, and both lists are left empty.
+        :performance: O(log(n))
+        :param left: the list with the smaller elements
+        :param right: the list with the larger elements
+        :return: the new list
+        """
+        node_count, item_count = left._node_count + right._node_count, len(left) + len(right)
+
+        tree = super().join(left, right)
+        tree._node_count, tree._item_count = node_count, item_count
+
+        return tree
+
+    def elements_array(self, dtype=None, start=None, stop=None, inclusive=False):
+        """
+        Export the elements in order, repeated as many times as they were appended.
+        The keys_array, values_array and items_arrays exports give the distinct elements and their counts.
+        :performance: O(log(n) + k) for k exported elements
+        :param dtype: see BinarySearchTree.keys_array
+        :param start: the start element (inclusive), None for the min
+        :param stop: the stop element (inclusive if specified else exclusive), None for the max
+        :param inclusive: if the stop is included or not
+        :return: the array of elements
+        """
+        nodes = list(super(AVLTree, self)._gen_slice(slice(start, stop), inclusive=inclusive))
+        count = sum(node.get_count() for node in nodes)
+
+        return _fill_array((node.get_element() for node in nodes for _ in range(node.get_count())), count, dtype)
+
+    def freeze(self):
+        """
+        Return an immutable, read-optimized copy of the list, mapping each distinct element to its count
+        :performance: O(n) for n distinct elements
+        :return: a FrozenSortedMap of (element, count) mappings
+        """
+        return super(AVLTree, self).freeze()
+
+    # The set operations work on the counts of the elements, like collections.Counter. They copy the (element, count)
+    # pairs to a new list: the split and join of AVLTree would not keep the number of nodes of the lists
+
+    def union(self, other, merge_values=None, consume=False):
+        """
+        Return a new list with the elements of both lists.
+        An element appended i times to this list and j times to the other one is i + j times in the result.
+        :performance: O(n + m) for n and m distinct elements
+        :param other: the other list
+        :param merge_values: function (count, other_count) -> count for the elements in both lists, the sum by default
+        :param consume: empty both lists once the result is built, otherwise they are left untouched
+        :return: the new list
+        """
+        if merge_values is None:
+            merge_values = lambda count, other_count: count + other_count
+
+        return super(AVLTree, self).union(other, merge_values, consume)
+
+    def intersection(self, other, merge_values=None, consume=False):
+        """
+        Return a new list with the elements present in both lists.
+        An element appended i times to this list and j times to the other one is min(i, j) times in the result.
+        :performance: see BinarySearchTree.intersection, for n and m distinct elements
+        :param other: the other list
+        :param merge_values: function (count, other_count) -> count, the minimum by default
+        :param consume: empty both lists once the result is built, otherwise they are left untouched
+        :return: the new list
+        """
+        if merge_values is None:
+            merge_values = min
+
+        return super(AVLTree, self).intersection(other, merge_values, consume)
+
+    def difference(self, other, consume=False):
+        """
+        Return a new list with the elements of this list, each removed as many times as it is in the other list.
+        An element appended i times to this list and j times to the other one is max(i - j, 0) times in the result.
+        When this list is much smaller, the counts of its elements are searched in the other one with get_many.
+        :performance: O(m log(n / m + 1)) when this list has m distinct elements and the other n >= m,
+        O(n + m) otherwise
+        :param other: the other list
+        :param consume: empty both lists once the result is built, otherwise they are left untouched
+        :return: the new list
+        """
+        pairs = self._pairs()
+
+        if self._node_count <= other._node_count and self._prefer_search(self._node_count, other._node_count):
+            other_counts = other.get_many([element for element, _ in pairs], 0)
+        else:
+            other_pairs = other._pairs()
+            other_counts = []
+            j = 0
+
+            for element, _ in pairs:
+                while j < len(other_pairs) and other_pairs[j][0] < element:
+                    j += 1
+                other_counts.append(other_pairs[j][1] if j < len(other_pairs) and other_pairs[j][0] == element else 0)
+
+        tree = self._new_empty()
+        tree._bulk_load([(element, count - other_count)
+                         for (element, count), other_count in zip(pairs, other_counts) if count > other_count])
+        return self._end_set_operation(other, tree, consume)
+
     def __getitem__(self, item):
         if isinstance(item, slice):
             return self._get_slice(item)
@@ -41,7 +252,92 @@ class AVLSortedList(SortedList, AVLTree):
             self._set_at_index(key, value)
 
     def __delitem__(self, key):
-        pass
+        if isinstance(key, slice):
+            self._delete_index_slice(key)
+        else:
+            self._remove_occurrences(self._at_index(key), 1)
+
+    def delete_range(self, start, stop, inclusive=False):
+        """
+        Delete every element in the range of values. The range is cut out as a whole subtree.
+        :performance: O(log(n) + k) for k distinct deleted elements
+        :param start: the start element (inclusive), None for the min
+        :param stop: the stop element (inclusive if specified else exclusive), None for the max
+        :param inclusive: if the stop is deleted or not
+        :return: the number of deleted elements
+        """
+        node_count, item_count = self._node_count, self._item_count
+        middle = self._cut_range(start, stop, inclusive)
+
+        if middle is None:
+            return 0
+
+        # the subtree sizes count the elements, the nodes of the cut have to be counted
+        self._node_count = node_count - sum(1 for _ in self._inorder_traversal(middle))
+        self._item_count = item_count - middle.get_subtree_size()
+
+        return middle.get_subtree_size()
+
+    def _delete_index_slice(self, query):
+        """
+        Delete the elements between two positions, same as del list[start:stop:step].
+        A contiguous slice keeps the partial nodes at its ends and cuts the nodes in between at once.
+        :performance: O(log(n) + k) for a contiguous slice, O(min(k log(n), n)) otherwise
+        :param query: the slice of indices
+        :return: void
+        """
+        indices = range(*query.indices(len(self)))
+
+        if len(indices) == 0:
+            return
+
+        if indices.step < 0:
+            indices = indices[::-1]
+
+        if indices.step == 1:
+            first, last = self._at_index(indices[0]), self._at_index(indices[-1])
+
+            if first is last:
+                self._remove_occurrences(first, len(indices))
+                return
+
+            head_count = self.bisect_right(first.get_element()) - indices[0]
+            tail_count = indices[-1] + 1 - self.bisect_left(last.get_element())
+
+            inner = self._inorder_successor(first)
+            if inner is not last:
+                self.delete_range(inner.get_element(), last.get_element())
+
+            # the cut moves nodes around without replacing them, so both ends are still valid
+            self._remove_occurrences(first, head_count)
+            self._remove_occurrences(last, tail_count)
+        elif self._prefer_rebuild(len(indices)):
+            elements = list(self)
+            del elements[query]
+
+            self._bulk_load(self._group_sorted_elements(elements))
+        else:
+            for index in reversed(indices):
+                self._remove_occurrences(self._at_index(index), 1)
+
+    def _remove_occurrences(self, node, count):
+        """
+        Remove occurrences of the element of a node, and the node itself once none is left
+        :param node: the node
+        :param count: the number of occurrences to remove
+        :return: void
+        """
+        if count >= node.get_count():
+            self.delete_range(node.get_element(), node.get_element(), inclusive=True)
+            return
+
+        node.set_value(node.get_count() - count)
+        self._item_count -= count
+
+        walk = node
+        while walk is not None:
+            walk.set_subtree_size(walk.get_subtree_size() - count)
+            walk = walk.get_parent()
 
     def __iter__(self):
         for item, count in super(AVLTree, self).__iter__():
@@ -89,6 +385,17 @@ class AVLSortedList(SortedList, AVLTree):
     def islice(self, start, stop, stpe=1, inclusive=False):
         pass
 
+    def slice_by_index(self, start=None, stop=None, step=1):
+        """
+        Return the elements between two positions, same as self[start:stop:step]
+        :performance: O(log(n) + k * min(step, log(n))) for k results
+        :param start: the start index (inclusive), None for the first
+        :param stop: the stop index (exclusive), None for the end
+        :param step: the index increment between two results
+        :return: an array of elements
+        """
+        return self._get_slice(slice(start, stop, step))
+
     def get_min(self):
         return super(AVLTree, self).get_min()[0]
 
@@ -107,12 +414,65 @@ class AVLSortedList(SortedList, AVLTree):
     def find_ste(self, item):
         return super(AVLTree, self).find_ste(item)[0]
 
+    def find_gt_many(self, items):
+        return [element for element, _ in super(AVLTree, self).find_gt_many(items)]
+
+    def find_gte_many(self, items):
+        return [element for element, _ in super(AVLTree, self).find_gte_many(items)]
+
+    def find_st_many(self, items):
+        return [element for element, _ in super(AVLTree, self).find_st_many(items)]
+
+    def find_ste_many(self, items):
+        return [element for element, _ in super(AVLTree, self).find_ste_many(items)]
+
     def _make_node(self, key, value, parent):
         return SortedListNode(key, value, parent)
 
+    def _node_weight(self, node):
+        return node.get_count()
+
+    def _built_hook(self, built_node):
+        # the subtree size counts every occurrence of an element, not only the node
+        built_node.set_subtree_size(built_node.get_subtree_size() + built_node.get_count() - 1)
+        super()._built_hook(built_node)
+
     def at_index(self, index):
         return super(AVLTree, self).at_index(index)[0]
 
+    def _at_index(self, index):
+        """
+        Return the node holding the element at the index. Unlike the tree version, a node
+        covers as many indices as its count.
+        :performance: O(log(n))
+        :param index: the index
+        :return: the node
+        """
+        if not self._enable_index:
+            raise RuntimeError("The binary search tree has been instantiated without support for index methods.")
+
+        if not self._is_valid_index(index):
+            raise ValueError("Illegal index")
+
+        if index < 0:
+            index = len(self) + index
+
+        walk = self._root
+
+        while walk is not None:
+            left = walk.get_child(LEFT_CHILD)
+            left_size = left.get_subtree_size() if left is not None else 0
+
+            if index < left_size:
+                walk = left
+            elif index < left_size + walk.get_count():
+                return walk
+            else:
+                index -= left_size + walk.get_count()
+                walk = walk.get_child(RIGHT_CHILD)
+
+        return None
+
     def index_of(self, key):
         """
         Return the index of the item with the key.
@@ -157,24 +517,36 @@ class AVLSortedList(SortedList, AVLTree):
 
     def _gen_slice(self, query, inclusive=False):
 
-        start = query.start if query.start is not None else 0
-        stop = query.stop if query.stop is not None else (len(self) + 1)
-        step = query.step if query.step is not None else 1
+        start, stop, step = query.indices(len(self))
+
+        if step < 1:
+            raise ValueError("The step of a slice must be positive")
+
+        if inclusive:
+            stop = min(stop + 1, len(self))
+
+        if start >= stop:
+            return
 
         walk = self._at_index(start)
         current_idx = start
 
-        first_index_of_key = self.index_of(walk.get_element())
-
-        step_walker = (start - first_index_of_key) % step
+        node_start_idx = self.index_of(walk.get_element())
 
-        while walk is not None and current_idx < stop + (1 if inclusive else 0):
-            for _ in range(walk.get_count()):
-                if step_walker == 0:
-                    yield walk
+        while walk is not None and current_idx < stop:
+            node_stop_idx = node_start_idx + walk.get_count()
 
-                step_walker = (step_walker - 1) % step
+            while current_idx < node_stop_idx and current_idx < stop:
+                yield walk
+                current_idx += step
 
-                current_idx += 1
+            if current_idx >= stop:
+                break
 
-            walk = self._inorder_successor(walk)
+            if step > self._node_count.bit_length():
+                # cheaper to seek the next index than to visit the skipped nodes
+                walk = self._at_index(current_idx)
+                node_start_idx = self.index_of(walk.get_element())
+            else:
+                node_start_idx = node_stop_idx
+                walk = self._inorder_successor(walk)
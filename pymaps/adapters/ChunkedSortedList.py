@@ -0,0 +1,485 @@
+from bisect import bisect_left, bisect_right, insort_right
+from heapq import merge
+
+from pymaps.adapters.SortedList import SortedList
+
+
+class ChunkedSortedList(SortedList):
+    """
+    Sorted list made of a list of bounded-size sorted Python lists.
+    The searches, inserts and deletes inside a sublist run in C (bisect, list.insert), and a
+    Fenwick tree over the sublist lengths gives O(log(n)) positional access.
+
+    Sublists are split when they exceed twice the load factor, and merged with a neighbour
+    when they fall under half of it.
+    """
+    __slots__ = ["_lists", "_maxes", "_index", "_load_factor", "_item_count"]
+
+    def __init__(self, load_factor=1000):
+        """
+        :param load_factor: the typical size of a sublist
+        """
+        super().__init__()
+
+        if load_factor < 4:
+            raise ValueError("The load factor must be at least 4")
+
+        self._load_factor = load_factor
+        self._lists = []
+        self._maxes = []
+        self._index = None  # Fenwick tree of the sublist lengths, rebuilt lazily
+        self._item_count = 0
+
+    @classmethod
+    def from_sorted(cls, elements, load_factor=1000):
+        """
+        Build a sorted list from elements that are already sorted.
+        :performance: O(n)
+        :param elements: an iterable of sorted elements
+        :param load_factor: see __init__
+        :return: the new sorted list
+        """
+        sorted_list = cls(load_factor=load_factor)
+        sorted_list._load_sorted(list(elements))
+        return sorted_list
+
+    @classmethod
+    def bulk_load(cls, elements, load_factor=1000):
+        """
+        Build a sorted list from elements in any order
+        :performance: O(n log(n))
+        :param elements: an iterable of elements
+        :param load_factor: see __init__
+        :return: the new sorted list
+        """
+        sorted_list = cls(load_factor=load_factor)
+        sorted_list._load_sorted(sorted(elements))
+        return sorted_list
+
+    def _load_sorted(self, elements):
+        for previous, element in zip(elements, elements[1:]):
+            if element < previous:
+                raise ValueError("The elements are not sorted")
+
+        load = self._load_factor
+        self._lists = [elements[i:i + load] for i in range(0, len(elements), load)]
+        self._maxes = [sublist[-1] for sublist in self._lists]
+        self._index = None
+        self._item_count = len(elements)
+
+    def update(self, elements):
+        """
+        Append a batch of elements. A large batch is sorted and merged with the content of the list
+        in linear time, a small one is appended element by element.
+        :performance: O(m log(m) + min(m log(n), n + m)) for a batch of size m
+        :param elements: an iterable of elements
+        :return: void
+        """
+        batch = sorted(elements)
+
+        if len(batch) * 8 > self._item_count:
+            self._load_sorted(list(merge(self, batch)))
+        else:
+            for element in batch:
+                self.append(element)
+
+    def __len__(self):
+        return self._item_count
+
+    def __iter__(self):
+        for sublist in self._lists:
+            yield from sublist
+
+    def _get_index(self):
+        """
+        :performance: O(1), O(m) to rebuild the index after a split or a merge of sublists
+        :return: the Fenwick tree of the sublist lengths (1-based)
+        """
+        if self._index is None:
+            index = [0] + [len(sublist) for sublist in self._lists]
+
+            for i in range(1, len(index)):
+                parent = i + (i & -i)
+                if parent < len(index):
+                    index[parent] += index[i]
+
+            self._index = index
+
+        return self._index
+
+    def _index_add(self, position, delta):
+        if self._index is None:
+            return
+
+        index = self._index
+        i = position + 1
+
+        while i < len(index):
+            index[i] += delta
+            i += i & -i
+
+    def _offset(self, position):
+        """
+        :performance: O(log(m))
+        :return: the number of elements in the sublists before the position
+        """
+        index = self._get_index()
+        total = 0
+        i = position
+
+        while i > 0:
+            total += index[i]
+            i -= i & -i
+
+        return total
+
+    def _locate(self, index):
+        """
+        Find the sublist holding an index
+        :performance: O(log(m))
+        :param index: a valid, non negative index
+        :return: (position, offset), the sublist position and the index inside it
+        """
+        tree = self._get_index()
+        position = 0
+        bit = 1 << (len(tree).bit_length() - 1)
+
+        while bit:
+            if position + bit < len(tree) and tree[position + bit] <= index:
+                position += bit
+                index -= tree[position]
+            bit >>= 1
+
+        return position, index
+
+    def _normalize_index(self, index):
+        if not -len(self) <= index < len(self):
+            raise ValueError("Illegal index")
+
+        return index + len(self) if index < 0 else index
+
+    def append(self, element):
+        """
+        Insert the element at its sorted position, after the elements equal to it
+        :performance: O(log(n) + load_factor)
+        :param element: the element
+        :return: void
+        """
+        if not self._lists:
+            self._lists.append([element])
+            self._maxes.append(element)
+            self._index = None
+        else:
+            position = bisect_right(self._maxes, element)
+
+            if position == len(self._lists):
+                position -= 1
+                self._lists[position].append(element)
+                self._maxes[position] = element
+            else:
+                insort_right(self._lists[position], element)
+
+            self._index_add(position, 1)
+
+            if len(self._lists[position]) > 2 * self._load_factor:
+                self._split(position)
+
+        self._item_count += 1
+
+    def _split(self, position):
+        sublist = self._lists[position]
+        half = len(sublist) // 2
+
+        self._lists.insert(position + 1, sublist[half:])
+        self._maxes.insert(position + 1, sublist[-1])
+        del sublist[half:]
+        self._maxes[position] = sublist[-1]
+        self._index = None
+
+    def _delete(self, position, offset):
+        """
+        Delete the element at an offset of a sublist
+        :return: the deleted element
+        """
+        sublist = self._lists[position]
+        element = sublist.pop(offset)
+        self._item_count -= 1
+
+        if not sublist:
+            del self._lists[position]
+            del self._maxes[position]
+            self._index = None
+            return element
+
+        self._maxes[position] = sublist[-1]
+        self._index_add(position, -1)
+
+        if len(sublist) < self._load_factor // 2 and len(self._lists) > 1:
+            # merge with a neighbour, and split again if the result is too large
+            if position == len(self._lists) - 1:
+                position -= 1
+
+            self._lists[position].extend(self._lists[position + 1])
+            self._maxes[position] = self._lists[position][-1]
+            del self._lists[position + 1]
+            del self._maxes[position + 1]
+            self._index = None
+
+            if len(self._lists[position]) > 2 * self._load_factor:
+                self._split(position)
+
+        return element
+
+    def remove(self, element):
+        """
+        Remove one occurrence of the element
+        :performance: O(log(n) + load_factor)
+        :param element: the element
+        :return: void
+        """
+        position = bisect_left(self._maxes, element)
+
+        if position < len(self._lists):
+            offset = bisect_left(self._lists[position], element)
+            if self._lists[position][offset] == element:
+                self._delete(position, offset)
+                return
+
+        raise ValueError("The element is not in the list")
+
+    def pop(self):
+        """
+        Remove the largest element
+        :performance: O(1) amortized
+        :return: the removed element
+        """
+        if self._item_count == 0:
+            raise ValueError("The list is currently empty")
+
+        position = len(self._lists) - 1
+        return self._delete(position, len(self._lists[position]) - 1)
+
+    def clear(self):
+        self.__init__(load_factor=self._load_factor)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self._get_slice(item)
+        else:
+            return self.at_index(item)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            raise TypeError("Cannot assign a slice of a sorted list")
+        else:
+            self._delete(*self._locate(self._normalize_index(key)))
+            self.append(value)
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            indices = range(*key.indices(len(self)))
+
+            if indices.step == 1 and len(indices) * 8 > len(self):
+                remaining = self[:indices.start] + self[indices.stop:]
+                self._load_sorted(remaining)
+            else:
+                # delete from the end, so the remaining indices stay valid
+                for index in sorted(indices, reverse=True):
+                    self._delete(*self._locate(index))
+        else:
+            self._delete(*self._locate(self._normalize_index(key)))
+
+    def at_index(self, index):
+        """
+        Return the element at the index
+        :performance: O(log(n))
+        :param index: the index
+        :return: the element
+        """
+        position, offset = self._locate(self._normalize_index(index))
+        return self._lists[position][offset]
+
+    def index_of(self, element):
+        """
+        Return the index of the first occurrence of the element
+        :performance: O(log(n))
+        :param element: the element
+        :return: the index, or None if the element is not in the list
+        """
+        position = bisect_left(self._maxes, element)
+
+        if position == len(self._lists):
+            return None
+
+        offset = bisect_left(self._lists[position], element)
+
+        if self._lists[position][offset] != element:
+            return None
+
+        return self._offset(position) + offset
+
+    def bisect_left(self, element):
+        """
+        :performance: O(log(n))
+        :return: the number of elements smaller than the element
+        """
+        position = bisect_left(self._maxes, element)
+
+        if position == len(self._lists):
+            return self._item_count
+
+        return self._offset(position) + bisect_left(self._lists[position], element)
+
+    def bisect_right(self, element):
+        """
+        :performance: O(log(n))
+        :return: the number of elements smaller or equal to the element
+        """
+        position = bisect_right(self._maxes, element)
+
+        if position == len(self._lists):
+            return self._item_count
+
+        return self._offset(position) + bisect_right(self._lists[position], element)
+
+    def count_in_range(self, start, stop, step=1, inclusive=False):
+        """
+        Return the number of elements contained in the specified interval.
+        :performance: O(log(n))
+        :param step: the step between two distinct elements
+        :param start: the start of the range (inclusive), None for the min
+        :param stop:  the stop of the range (inclusive if specified else exclusive), None for the max
+        :param inclusive: if we include the stop or not
+        :return: the count
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+        return self._step_count(first, last, step)
+
+    def _get_slice(self, query):
+        indices = range(*query.indices(len(self)))
+
+        if len(indices) == 0:
+            return []
+
+        step = indices.step
+
+        if step < 1:
+            raise ValueError("The step of a slice must be positive")
+
+        position, offset = self._locate(indices[0])
+        remaining = len(indices)
+        result = []
+
+        while remaining > 0:
+            sublist = self._lists[position]
+            chunk = sublist[offset::step][:remaining]
+            result.extend(chunk)
+            remaining -= len(chunk)
+
+            # where the next element falls, relatively to the start of the next sublist
+            offset += len(chunk) * step - len(sublist)
+            position += 1
+
+            while remaining > 0 and offset >= len(self._lists[position]):
+                offset -= len(self._lists[position])
+                position += 1
+
+        return result
+
+    def slice_by_index(self, start=None, stop=None, step=1):
+        """
+        Return the elements between two positions, same as self[start:stop:step]
+        :performance: O(log(n) + k) for k results
+        :param start: the start index (inclusive), None for the first
+        :param stop: the stop index (exclusive), None for the end
+        :param step: the index increment between two results
+        :return: an array of elements
+        """
+        return self._get_slice(slice(start, stop, step))
+
+    def slice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the elements between two values
+        :param start: the start element (inclusive), None for the min
+        :param stop: the stop element, None for the max
+        :param step: the number of elements skipped in between each result
+        :param inclusive: if the stop is included or not
+        :return: an array of elements
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+
+        if first == last:
+            return []
+
+        return self._get_slice(slice(first, last, step))
+
+    def islice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the inverse of a slice: the elements smaller than start or greater than stop
+        :param start: the start element, None for the min
+        :param stop: the stop element, None for the max
+        :param step: the number of elements skipped in between each result
+        :param inclusive: if start and stop are included or not
+        :return: an array of elements
+        """
+        if start is None:
+            before = 0
+        else:
+            before = self.bisect_right(start) if inclusive else self.bisect_left(start)
+
+        if stop is None:
+            after = len(self)
+        else:
+            after = self.bisect_left(stop) if inclusive else self.bisect_right(stop)
+
+        return self._get_slice(slice(0, before, step)) + self._get_slice(slice(after, None, step))
+
+    def get_min(self):
+        if self._item_count == 0:
+            raise ValueError("The list is currently empty")
+
+        return self._lists[0][0]
+
+    def get_max(self):
+        if self._item_count == 0:
+            raise ValueError("The list is currently empty")
+
+        return self._maxes[-1]
+
+    def find_gt(self, item):
+        position = bisect_right(self._maxes, item)
+
+        if position == len(self._lists):
+            return None
+
+        sublist = self._lists[position]
+        return sublist[bisect_right(sublist, item)]
+
+    def find_gte(self, item):
+        position = bisect_left(self._maxes, item)
+
+        if position == len(self._lists):
+            return None
+
+        sublist = self._lists[position]
+        return sublist[bisect_left(sublist, item)]
+
+    def find_st(self, item):
+        position = bisect_left(self._maxes, item)
+
+        if position < len(self._lists):
+            offset = bisect_left(self._lists[position], item)
+            if offset > 0:
+                return self._lists[position][offset - 1]
+
+        return self._maxes[position - 1] if position > 0 else None
+
+    def find_ste(self, item):
+        position = bisect_right(self._maxes, item)
+
+        if position < len(self._lists):
+            offset = bisect_right(self._lists[position], item)
+            if offset > 0:
+                return self._lists[position][offset - 1]
+
+        return self._maxes[position - 1] if position > 0 else None
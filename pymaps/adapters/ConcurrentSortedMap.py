@@ -0,0 +1,293 @@
+import threading
+from contextlib import contextmanager
+
+from pymaps.SortedContainer import SortedContainer
+from pymaps.trees.BinarySearchTree import BinarySearchTree
+from pymaps.trees.PersistentAVLTree import PersistentAVLTree
+
+
+class ReadWriteLock:
+    """
+    Lock shared by any number of readers, or held by a single writer.
+    Waiting writers have priority over new readers, so a steady flow of reads cannot starve the writes.
+    The lock is not reentrant.
+    """
+    __slots__ = ["_condition", "_readers", "_writing", "_waiting_writers"]
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writing or self._waiting_writers > 0:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers > 0:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+
+    def release_write(self):
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class WriteBatch:
+    """
+    Writes recorded by ConcurrentSortedMap.batch(), applied together when the batch is committed
+    """
+    __slots__ = ["_operations"]
+
+    def __init__(self):
+        self._operations = []
+
+    def __setitem__(self, key, value):
+        self._operations.append((True, key, value))
+
+    def __delitem__(self, key):
+        self._operations.append((False, key, None))
+
+    def __len__(self):
+        return len(self._operations)
+
+    def _apply(self, tree, undo_on_error=False):
+        """
+        Run the recorded writes on a tree
+        :param tree: the tree to write
+        :param undo_on_error: if a write raises, restore the mappings changed by the previous writes before raising
+        :return: void
+        """
+        previous = []
+
+        try:
+            for is_set, key, value in self._operations:
+                if undo_on_error:
+                    previous.append(self._previous_state(tree, key))
+
+                if is_set:
+                    tree[key] = value
+                else:
+                    del tree[key]
+        except BaseException:
+            for key, pairs in reversed(previous):
+                del tree[key]
+                for old_key, old_value in pairs:
+                    tree[old_key] = old_value
+            raise
+
+    @staticmethod
+    def _previous_state(tree, key):
+        """
+        :return: (key, pairs), what to delete then insert to put back the mappings a write of the key may change
+        """
+        if isinstance(key, slice):
+            return key, tree.slice(key.start, key.stop)
+
+        return key, [(key, tree[key])] if key in tree else []
+
+
+class ConcurrentSortedMap(SortedContainer):
+    """
+    Thread-safe wrapper of a sorted map, a PersistentAVLTree by default.
+
+    Writes take the writer lock of a ReadWriteLock. When the map is a PersistentAVLTree, a write copies
+    the path it changes instead of modifying nodes, and publishes a snapshot of the new version once done.
+    Reads take the last published snapshot and run on it without any lock. No reader ever sees a node being
+    modified, and the snapshot only changes when a write, or a whole batch, is complete.
+
+    Any other tree (AVLTree, RedBlackTree, ...) is modified in place, so it is read under the reader lock.
+    Trees that restructure on reads, like SplayTree, are read under the writer lock. A batch that fails on
+    such a tree is undone before the writer lock is released.
+    """
+    __slots__ = ["_tree", "_lock", "_snapshot", "_shared_reads"]
+
+    def __init__(self, tree=None):
+        """
+        :param tree: the map to wrap, an empty PersistentAVLTree if None. It must not be used directly afterwards
+        """
+        super().__init__()
+        self._tree = tree if tree is not None else PersistentAVLTree()
+        self._lock = ReadWriteLock()
+
+        # the published version, read without lock. None when the tree is modified in place
+        self._snapshot = self._tree.snapshot() if isinstance(self._tree, PersistentAVLTree) else None
+
+        # the base hook does nothing, any other one may change the tree during a read
+        self._shared_reads = not isinstance(self._tree, BinarySearchTree) or \
+            type(self._tree)._accessed_hook is BinarySearchTree._accessed_hook
+
+    @contextmanager
+    def _writing(self):
+        """
+        Hold the writer lock and give the tree to write. For a PersistentAVLTree, the writes go to a copy of the
+        published version, which replaces it only if the block completes
+        :return: a context manager giving the tree to write
+        """
+        with self._lock.writing():
+            if self._snapshot is None:
+                yield self._tree
+            else:
+                tree = self._tree.snapshot()
+                yield tree
+                self._tree = tree
+                self._snapshot = tree.snapshot()
+
+    def _read(self, name, *args):
+        """
+        Run a read on the published snapshot, or on the tree under the lock
+        :param name: the name of the method of the tree
+        :param args: its arguments
+        :return: the result of the read
+        """
+        snapshot = self._snapshot
+
+        if snapshot is not None:
+            return getattr(snapshot, name)(*args)
+
+        with self._locked():
+            return getattr(self._tree, name)(*args)
+
+    def _locked(self):
+        """
+        :return: the lock context of a read of a tree modified in place
+        """
+        return self._lock.reading() if self._shared_reads else self._writing()
+
+    def __len__(self):
+        return self._read("__len__")
+
+    def __getitem__(self, query):
+        return self._read("__getitem__", query)
+
+    def __contains__(self, key):
+        return self._read("__contains__", key)
+
+    def __iter__(self):
+        """
+        Iterate over the published snapshot, or over a copy of the mappings taken at once under the lock
+        """
+        snapshot = self._snapshot
+
+        if snapshot is not None:
+            return iter(snapshot)
+
+        with self._locked():
+            return iter(list(self._tree))
+
+    def __setitem__(self, key, value):
+        with self._writing() as tree:
+            tree[key] = value
+
+    def __delitem__(self, key):
+        with self._writing() as tree:
+            del tree[key]
+
+    def update(self, items):
+        """
+        Insert a batch of mappings with a single write
+        :param items: a mapping or an iterable of (key, value) tuples
+        :return: void
+        """
+        items = list(items.items() if hasattr(items, "items") else items)
+
+        with self._writing() as tree:
+            tree.update(items)
+
+    @contextmanager
+    def batch(self):
+        """
+        Record writes and commit them at once, with a single acquisition of the writer lock.
+        Readers see either none or all of the writes of the batch.
+
+            with concurrent_map.batch() as batch:
+                batch[key] = value
+                del batch[other_key]
+
+        Nothing is written if the block raises, nor if one of the writes raises when the batch is committed.
+        :return: a context manager giving a WriteBatch
+        """
+        write_batch = WriteBatch()
+        yield write_batch
+
+        if len(write_batch) > 0:
+            with self._writing() as tree:
+                write_batch._apply(tree, undo_on_error=self._snapshot is None)
+
+    def clear(self):
+        with self._writing() as tree:
+            tree.clear()
+
+    def get_many(self, keys, default=None):
+        return self._read("get_many", keys, default)
+
+    def contains_many(self, keys):
+        return self._read("contains_many", keys)
+
+    def slice(self, start, stop, step=1, inclusive=False):
+        return self._read("slice", start, stop, step, inclusive)
+
+    def islice(self, start, stop, step=1, inclusive=False):
+        return self._read("islice", start, stop, step, inclusive)
+
+    def slice_by_index(self, start=None, stop=None, step=1):
+        return self._read("slice_by_index", start, stop, step)
+
+    def freeze(self):
+        return self._read("freeze")
+
+    def get_min(self):
+        return self._read("get_min")
+
+    def get_max(self):
+        return self._read("get_max")
+
+    def find_gt(self, key):
+        return self._read("find_gt", key)
+
+    def find_gte(self, key):
+        return self._read("find_gte", key)
+
+    def find_st(self, key):
+        return self._read("find_st", key)
+
+    def find_ste(self, key):
+        return self._read("find_ste", key)
+
+    def at_index(self, index):
+        return self._read("at_index", index)
+
+    def index_of(self, key):
+        return self._read("index_of", key)
+
+    def count_in_range(self, start, stop, step=1, inclusive=False):
+        return self._read("count_in_range", start, stop, step, inclusive)
@@ -0,0 +1,349 @@
+import heapq
+import os
+import tempfile
+import threading
+
+from pymaps.SortedContainer import SortedContainer
+from pymaps.trees.AVLTree import AVLTree
+from pymaps.trees.DiskBPlusTree import DiskBPlusTree
+from pymaps.trees.FrozenSortedMap import FrozenSortedMap
+
+
+class _Tombstone:
+    """
+    The value written by a delete, hiding the older values of the key
+    """
+    __slots__ = []
+
+    def __reduce__(self):
+        # pickled as a reference to the module singleton, so it survives the disk runs
+        return "TOMBSTONE"
+
+    def __repr__(self):
+        return "TOMBSTONE"
+
+
+TOMBSTONE = _Tombstone()
+MISSING = object()
+
+
+class LSMSortedMap(SortedContainer):
+    """
+    Write-optimized sorted map, in the manner of a log-structured merge tree.
+
+    Writes go to a small AVLTree, the memtable. When it reaches memtable_size keys, it is frozen into an
+    immutable sorted run (a FrozenSortedMap, or a DiskBPlusTree file when a directory is given), and a new
+    memtable is started. A delete writes a tombstone, which hides the older values of the key until a
+    compaction merges every run into one and drops the tombstones. Compactions start once there are more
+    than max_runs runs, in a background thread if asked.
+
+    Reads merge the memtable and the runs, the most recent value of a key winning.
+    The map is not thread-safe, apart from its own background compactions.
+    """
+    __slots__ = ["_memtable_size", "_max_runs", "_directory", "_background", "_memtable", "_runs", "_retired",
+                 "_lock", "_compaction"]
+
+    def __init__(self, memtable_size=4096, max_runs=8, directory=None, background=False):
+        """
+        :param memtable_size: the number of keys (tombstones included) of the memtable that triggers a flush
+        :param max_runs: the number of runs above which the runs are compacted
+        :param directory: where to write the runs as DiskBPlusTree files, None to keep them in memory.
+        Each run gets a new file, so several maps can share a directory
+        :param background: compact in a background thread instead of during the write that triggered it
+        """
+        super().__init__()
+
+        if memtable_size < 1 or max_runs < 1:
+            raise ValueError("The memtable size and the maximal number of runs must be at least 1")
+
+        self._memtable_size = memtable_size
+        self._max_runs = max_runs
+        self._directory = directory
+        self._background = background
+
+        self._memtable = AVLTree()
+        self._runs = []  # newest first, never modified in place
+        self._retired = []  # disk runs replaced by a compaction, closed by the next flush
+        self._lock = threading.Lock()
+        self._compaction = None
+
+    def _levels(self):
+        """
+        :return: the memtable and the runs, newest first
+        """
+        return [self._memtable] + self._runs
+
+    def __setitem__(self, key, value):
+        self._memtable[key] = value
+
+        if len(self._memtable) >= self._memtable_size:
+            self.flush()
+
+    def __delitem__(self, key):
+        self[key] = TOMBSTONE
+
+    def _make_run(self, pairs):
+        """
+        :param pairs: an iterable of (key, value) tuples, sorted by key
+        :return: the new immutable run
+        """
+        if self._directory is None:
+            return FrozenSortedMap.from_sorted(pairs)
+
+        # a unique name, never one of the files of another map
+        handle, path = tempfile.mkstemp(suffix=".bin", prefix="run-", dir=self._directory)
+        os.close(handle)
+
+        return DiskBPlusTree.from_sorted(path, pairs)
+
+    def flush(self):
+        """
+        Turn the memtable into a run, then compact the runs if there are too many
+        :performance: O(m) for a memtable of m keys
+        :return: void
+        """
+        self._close_retired()
+
+        if len(self._memtable) == 0:
+            return
+
+        run = self._make_run(iter(self._memtable))
+        self._memtable = AVLTree()
+
+        with self._lock:
+            self._runs = [run] + self._runs
+
+        if len(self._runs) > self._max_runs:
+            self.compact(wait=not self._background)
+
+    def compact(self, wait=True):
+        """
+        Merge every run into one and drop the tombstones
+        :performance: O(n log(r)) for n keys in r runs
+        :param wait: compact now, or in a background thread
+        :return: void
+        """
+        # the compaction thread resets the attribute when it ends, so it is read once
+        thread = self._compaction
+
+        if thread is not None:
+            if not wait:
+                return  # the running compaction will be followed by another one if needed
+            thread.join()
+
+        if wait:
+            self._compact()
+        else:
+            thread = threading.Thread(target=self._compact, daemon=True)
+            self._compaction = thread
+            thread.start()
+
+    def wait_for_compaction(self):
+        """
+        Block until the background compaction, if any, is over
+        :return: void
+        """
+        thread = self._compaction
+
+        if thread is not None:
+            thread.join()
+
+    def _compact(self):
+        runs = self._runs
+
+        try:
+            if len(runs) > 1:
+                merged = self._make_run((key, value) for key, value in self._merge(runs) if value is not TOMBSTONE)
+
+                with self._lock:
+                    # the runs flushed during the compaction are newer than the merged ones
+                    self._runs = self._runs[:len(self._runs) - len(runs)] + [merged]
+                    self._retired.extend(runs)
+        finally:
+            # a failed compaction must not block the next ones
+            self._compaction = None
+
+    def _close_retired(self):
+        with self._lock:
+            retired, self._retired = self._retired, []
+
+        for run in retired:
+            if isinstance(run, DiskBPlusTree):
+                run.close()
+                os.remove(run.get_path())
+
+    def close(self):
+        """
+        Wait for the compaction, then close the disk runs. Their files are kept
+        :return: void
+        """
+        self.wait_for_compaction()
+        self._close_retired()
+
+        for run in self._runs:
+            if isinstance(run, DiskBPlusTree):
+                run.close()
+
+    def clear(self):
+        """
+        Empty the map, deleting the files of the disk runs
+        :return: void
+        """
+        self.wait_for_compaction()
+
+        with self._lock:
+            self._retired.extend(self._runs)
+            self._runs = []
+
+        self._close_retired()
+        self._memtable = AVLTree()
+
+    def _merge(self, levels):
+        """
+        Merge sorted sequences of (key, value) tuples, newest first. Only the newest value of a key is kept,
+        tombstones included
+        :param levels: sorted iterables of (key, value) tuples, newest first
+        :return: generator of (key, value) tuples
+        """
+        # a key appears once per level, so (key, age) is unique and the values are never compared
+        tagged = [self._tagged(level, age) for age, level in enumerate(levels)]
+        last_key = MISSING
+
+        for key, _, value in heapq.merge(*tagged):
+            if last_key is MISSING or key != last_key:
+                last_key = key
+                yield key, value
+
+    @staticmethod
+    def _tagged(level, age):
+        for key, value in level:
+            yield key, age, value
+
+    def _live(self, pairs):
+        return [(key, value) for key, value in pairs if value is not TOMBSTONE]
+
+    def __iter__(self):
+        for key, value in self._merge(self._levels()):
+            if value is not TOMBSTONE:
+                yield key, value
+
+    def __len__(self):
+        """
+        :performance: O(n), every level is merged to skip the overwritten and deleted keys
+        """
+        return sum(1 for _ in self)
+
+    def _resolve(self, key):
+        """
+        :return: the newest value of the key, TOMBSTONE if deleted, MISSING if never written
+        """
+        for level in self._levels():
+            found_key, value = level.find_gte(key)
+            if found_key is not None and found_key == key:
+                return value
+
+        return MISSING
+
+    def __getitem__(self, query):
+        if isinstance(query, slice):
+            return self.slice(query.start, query.stop, query.step)
+
+        value = self._resolve(query)
+        return None if value is MISSING or value is TOMBSTONE else value
+
+    def __contains__(self, key):
+        value = self._resolve(key)
+        return value is not MISSING and value is not TOMBSTONE
+
+    def slice(self, start, stop, step=1, inclusive=False):
+        """
+        Return a slice of the map
+        :performance: O(r log(n) + k log(r)) for k keys in the range of r levels
+        :param start: the start key (None for min_key)
+        :param stop: the stop key (None for until the end of the map)
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if the stop key is included or not
+        :return: an array of (key,value) tuples
+        """
+        levels = [level.slice(start, stop, 1, inclusive) for level in self._levels()]
+        return self._live(self._merge(levels))[::1 if step is None else step]
+
+    def islice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the inverse of a slice: the mappings with a key smaller than start or greater than stop
+        :param start: the start key (None for min_key)
+        :param stop: the stop key (None for max_key)
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if start and stop are included or not
+        :return: an array of (key,value) tuples
+        """
+        pairs = []
+
+        for key, value in self:
+            if start is not None and (key < start or (inclusive and key == start)):
+                pairs.append((key, value))
+            elif stop is not None and (stop < key or (inclusive and key == stop)):
+                pairs.append((key, value))
+
+        return pairs[::1 if step is None else step]
+
+    def _neighbour(self, key, greater, strict):
+        """
+        Find the closest live key in a direction: the closest key of every level is a candidate,
+        and a candidate deleted by a newer level is skipped
+        :return: (key, value), (None, None) if there is none
+        """
+        while True:
+            candidates = []
+
+            for level in self._levels():
+                if greater:
+                    found_key, _ = level.find_gt(key) if strict else level.find_gte(key)
+                else:
+                    found_key, _ = level.find_st(key) if strict else level.find_ste(key)
+
+                if found_key is not None:
+                    candidates.append(found_key)
+
+            if not candidates:
+                return None, None
+
+            candidate = min(candidates) if greater else max(candidates)
+            value = self._resolve(candidate)
+
+            if value is not TOMBSTONE:
+                return candidate, value
+
+            key, strict = candidate, True
+
+    def find_gt(self, key):
+        return self._neighbour(key, greater=True, strict=True)
+
+    def find_gte(self, key):
+        return self._neighbour(key, greater=True, strict=False)
+
+    def find_st(self, key):
+        return self._neighbour(key, greater=False, strict=True)
+
+    def find_ste(self, key):
+        return self._neighbour(key, greater=False, strict=False)
+
+    def _extreme(self, greater):
+        keys = [(level.get_min() if greater else level.get_max())[0] for level in self._levels() if len(level) > 0]
+
+        if not keys:
+            raise ValueError("Empty LSM map")
+
+        key = min(keys) if greater else max(keys)
+        found = self._neighbour(key, greater, strict=False)
+
+        if found[0] is None:
+            raise ValueError("Empty LSM map")
+
+        return found
+
+    def get_min(self):
+        return self._extreme(greater=True)
+
+    def get_max(self):
+        return self._extreme(greater=False)
@@ -0,0 +1,437 @@
+import random
+
+from pymaps.adapters.SortedList import SortedList
+
+MAX_LEVEL = 32
+
+
+class SkipListNode:
+    __slots__ = ["_element", "_next_nodes", "_widths"]
+
+    def __init__(self, element, level):
+        self._element = element
+        self._next_nodes = [None] * level
+        self._widths = [1] * level
+
+    def get_element(self):
+        return self._element
+
+    def get_level(self):
+        return len(self._next_nodes)
+
+    def get_next(self, level=0):
+        return self._next_nodes[level]
+
+    def __repr__(self):
+        return "[%s]" % (self._element,)
+
+
+class SkipListSortedList(SortedList):
+    """
+    Sorted list based on an indexable skip list.
+    Every link is annotated with its width, the number of elements it skips, which gives
+    O(log(n)) positional access on top of the usual O(log(n)) searches and inserts.
+
+    Equal elements are stored in distinct nodes, in insertion order.
+    """
+    __slots__ = ["_head", "_level", "_item_count"]
+
+    def __init__(self):
+        super().__init__()
+        self._head = SkipListNode(None, MAX_LEVEL)
+        self._level = 1
+        self._item_count = 0
+
+        # the position of the end of the list is len + 1 (the head is at position 0)
+        self._head._widths[0] = 1
+
+    @classmethod
+    def from_sorted(cls, elements):
+        """
+        Build a sorted list from elements that are already sorted.
+        Each node is linked after the last node of every level, without searching.
+        :performance: O(n)
+        :param elements: an iterable of sorted elements
+        :return: the new sorted list
+        """
+        sorted_list = cls()
+        head = sorted_list._head
+
+        last_nodes = [head] * MAX_LEVEL
+        last_positions = [0] * MAX_LEVEL
+        position = 0
+        last_element = None
+
+        for element in elements:
+            if position > 0 and element < last_element:
+                raise ValueError("The elements are not sorted")
+
+            position += 1
+            last_element = element
+
+            node = SkipListNode(element, sorted_list._random_level())
+            sorted_list._level = max(sorted_list._level, node.get_level())
+
+            for level in range(node.get_level()):
+                previous = last_nodes[level]
+                previous._next_nodes[level] = node
+                previous._widths[level] = position - last_positions[level]
+                last_nodes[level] = node
+                last_positions[level] = position
+
+        # close every level on the end of the list
+        for level in range(sorted_list._level):
+            last_nodes[level]._widths[level] = position + 1 - last_positions[level]
+
+        sorted_list._item_count = position
+        return sorted_list
+
+    @classmethod
+    def bulk_load(cls, elements):
+        """
+        Build a sorted list from elements in any order
+        :performance: O(n log(n))
+        :param elements: an iterable of elements
+        :return: the new sorted list
+        """
+        return cls.from_sorted(sorted(elements))
+
+    def update(self, elements):
+        """
+        Append a batch of elements
+        :performance: O(m log(n + m)) for a batch of size m
+        :param elements: an iterable of elements
+        :return: void
+        """
+        for element in elements:
+            self.append(element)
+
+    def _random_level(self):
+        level = 1
+        while level < MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def __len__(self):
+        return self._item_count
+
+    def __iter__(self):
+        walk = self._head.get_next()
+
+        while walk is not None:
+            yield walk.get_element()
+            walk = walk.get_next()
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self._get_slice(item)
+        else:
+            return self.at_index(item)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            raise TypeError("Cannot assign a slice of a sorted list")
+        else:
+            self._remove_chain(self._chain_at_index(self._normalize_index(key)))
+            self.append(value)
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            indices = range(*key.indices(len(self)))
+            # delete from the end, so the remaining indices stay valid
+            for index in sorted(indices, reverse=True):
+                self._remove_chain(self._chain_at_index(index))
+        else:
+            self._remove_chain(self._chain_at_index(self._normalize_index(key)))
+
+    def _normalize_index(self, index):
+        if not -len(self) <= index < len(self):
+            raise ValueError("Illegal index")
+
+        return index + len(self) if index < 0 else index
+
+    def _chain(self, element, after_equals):
+        """
+        Find, at every level, the last node before the element.
+        :param element: the element
+        :param after_equals: if True the chain goes past the nodes equal to the element
+        :return: (chain, positions), the nodes and their positions, by level
+        """
+        chain = [None] * self._level
+        positions = [0] * self._level
+
+        node = self._head
+        position = 0
+
+        for level in reversed(range(self._level)):
+            next_node = node._next_nodes[level]
+
+            while next_node is not None and (next_node._element < element or
+                                             (after_equals and next_node._element == element)):
+                position += node._widths[level]
+                node = next_node
+                next_node = node._next_nodes[level]
+
+            chain[level] = node
+            positions[level] = position
+
+        return chain, positions
+
+    def _chain_at_index(self, index):
+        """
+        Find, at every level, the last node before the index
+        :param index: a valid, non negative index
+        :return: the nodes, by level
+        """
+        chain = [None] * self._level
+
+        node = self._head
+        position = 0
+        target = index + 1
+
+        for level in reversed(range(self._level)):
+            while node._next_nodes[level] is not None and position + node._widths[level] < target:
+                position += node._widths[level]
+                node = node._next_nodes[level]
+
+            chain[level] = node
+
+        return chain
+
+    def _remove_chain(self, chain):
+        """
+        Unlink the node following the chain at the lowest level
+        :param chain: the nodes before the removed node, by level
+        :return: the removed element
+        """
+        target = chain[0]._next_nodes[0]
+
+        for level in range(self._level):
+            previous = chain[level]
+
+            if level < target.get_level():
+                previous._widths[level] += target._widths[level] - 1
+                previous._next_nodes[level] = target._next_nodes[level]
+            else:
+                previous._widths[level] -= 1
+
+        self._item_count -= 1
+
+        return target.get_element()
+
+    def append(self, element):
+        """
+        Insert the element at its sorted position, after the elements equal to it
+        :performance: O(log(n)) expected
+        :param element: the element
+        :return: void
+        """
+        node = SkipListNode(element, self._random_level())
+
+        if node.get_level() > self._level:
+            for level in range(self._level, node.get_level()):
+                self._head._next_nodes[level] = None
+                self._head._widths[level] = self._item_count + 1
+            self._level = node.get_level()
+
+        chain, positions = self._chain(element, after_equals=True)
+        position = positions[0] + 1  # the position of the new node
+
+        for level in range(self._level):
+            previous = chain[level]
+
+            if level < node.get_level():
+                node._next_nodes[level] = previous._next_nodes[level]
+                node._widths[level] = positions[level] + previous._widths[level] - position + 1
+                previous._next_nodes[level] = node
+                previous._widths[level] = position - positions[level]
+            else:
+                previous._widths[level] += 1
+
+        self._item_count += 1
+
+    def remove(self, element):
+        """
+        Remove one occurrence of the element
+        :performance: O(log(n)) expected
+        :param element: the element
+        :return: void
+        """
+        chain, _ = self._chain(element, after_equals=False)
+        target = chain[0].get_next()
+
+        if target is None or target.get_element() != element:
+            raise ValueError("The element is not in the list")
+
+        self._remove_chain(chain)
+
+    def pop(self):
+        """
+        Remove the largest element
+        :performance: O(log(n)) expected
+        :return: the removed element
+        """
+        if self._item_count == 0:
+            raise ValueError("The list is currently empty")
+
+        return self._remove_chain(self._chain_at_index(self._item_count - 1))
+
+    def clear(self):
+        self.__init__()
+
+    def _node_at_index(self, index):
+        return self._chain_at_index(self._normalize_index(index))[0].get_next()
+
+    def at_index(self, index):
+        """
+        Return the element at the index
+        :performance: O(log(n)) expected
+        :param index: the index
+        :return: the element
+        """
+        return self._node_at_index(index).get_element()
+
+    def index_of(self, element):
+        """
+        Return the index of the first occurrence of the element
+        :performance: O(log(n)) expected
+        :param element: the element
+        :return: the index, or None if the element is not in the list
+        """
+        chain, positions = self._chain(element, after_equals=False)
+        next_node = chain[0].get_next()
+
+        if next_node is None or next_node.get_element() != element:
+            return None
+
+        return positions[0]
+
+    def bisect_left(self, element):
+        """
+        :performance: O(log(n)) expected
+        :return: the number of elements smaller than the element
+        """
+        return self._chain(element, after_equals=False)[1][0]
+
+    def bisect_right(self, element):
+        """
+        :performance: O(log(n)) expected
+        :return: the number of elements smaller or equal to the element
+        """
+        return self._chain(element, after_equals=True)[1][0]
+
+    def count_in_range(self, start, stop, step=1, inclusive=False):
+        """
+        Return the number of elements contained in the specified interval.
+        :performance: O(log(n)) expected
+        :param step: the step between two distinct elements
+        :param start: the start of the range (inclusive), None for the min
+        :param stop:  the stop of the range (inclusive if specified else exclusive), None for the max
+        :param inclusive: if we include the stop or not
+        :return: the count
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+        return self._step_count(first, last, step)
+
+    def _get_slice(self, query):
+        return [node.get_element() for node in self._gen_index_slice(query)]
+
+    def _gen_index_slice(self, query):
+        indices = range(*query.indices(len(self)))
+
+        if len(indices) == 0:
+            return
+
+        step = indices.step
+
+        if step < 1:
+            raise ValueError("The step of a slice must be positive")
+
+        jump = step > self._level
+
+        walk = self._node_at_index(indices[0])
+        yield walk
+
+        for index in indices[1:]:
+            if jump:
+                walk = self._node_at_index(index)
+            else:
+                for _ in range(step):
+                    walk = walk.get_next()
+            yield walk
+
+    def slice_by_index(self, start=None, stop=None, step=1):
+        """
+        Return the elements between two positions, same as self[start:stop:step]
+        :performance: O(log(n) + k * min(step, log(n))) for k results
+        :param start: the start index (inclusive), None for the first
+        :param stop: the stop index (exclusive), None for the end
+        :param step: the index increment between two results
+        :return: an array of elements
+        """
+        return self._get_slice(slice(start, stop, step))
+
+    def slice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the elements between two values
+        :param start: the start element (inclusive), None for the min
+        :param stop: the stop element, None for the max
+        :param step: the number of elements skipped in between each result
+        :param inclusive: if the stop is included or not
+        :return: an array of elements
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+
+        if first == last:
+            return []
+
+        return self._get_slice(slice(first, last, step))
+
+    def islice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the inverse of a slice: the elements smaller than start or greater than stop
+        :param start: the start element, None for the min
+        :param stop: the stop element, None for the max
+        :param step: the number of elements skipped in between each result
+        :param inclusive: if start and stop are included or not
+        :return: an array of elements
+        """
+        if start is None:
+            before = 0
+        else:
+            before = self.bisect_right(start) if inclusive else self.bisect_left(start)
+
+        if stop is None:
+            after = len(self)
+        else:
+            after = self.bisect_left(stop) if inclusive else self.bisect_right(stop)
+
+        return self._get_slice(slice(0, before, step)) + self._get_slice(slice(after, None, step))
+
+    def get_min(self):
+        if self._item_count == 0:
+            raise ValueError("The list is currently empty")
+
+        return self._head.get_next().get_element()
+
+    def get_max(self):
+        if self._item_count == 0:
+            raise ValueError("The list is currently empty")
+
+        return self.at_index(-1)
+
+    def find_gt(self, item):
+        next_node = self._chain(item, after_equals=True)[0][0].get_next()
+        return None if next_node is None else next_node.get_element()
+
+    def find_gte(self, item):
+        next_node = self._chain(item, after_equals=False)[0][0].get_next()
+        return None if next_node is None else next_node.get_element()
+
+    def find_st(self, item):
+        node = self._chain(item, after_equals=False)[0][0]
+        return None if node is self._head else node.get_element()
+
+    def find_ste(self, item):
+        node = self._chain(item, after_equals=True)[0][0]
+        return None if node is self._head else node.get_element()
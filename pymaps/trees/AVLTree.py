@@ -40,8 +40,8 @@ class HeightAwareNode(TreeNode):
 
 class AVLTree(BinarySearchTree):
 
-    def __init__(self, enable_index=True):
-        super().__init__(enable_index=enable_index)
+    def __init__(self, enable_index=True, enable_threading=False):
+        super().__init__(enable_index=enable_index, enable_threading=enable_threading)
 
     def _inserted_hook(self, inserted_node):
         self._rebalance(inserted_node, True)
@@ -49,6 +49,9 @@ class AVLTree(BinarySearchTree):
     def _deleted_hook(self, parent_node):
         self._rebalance(parent_node, False)
 
+    def _built_hook(self, built_node):
+        built_node.recompute_height()
+
     def _rebalance(self, node, insert):
 
         walk = node
@@ -84,3 +87,410 @@ class AVLTree(BinarySearchTree):
 
     def _make_node(self, key, value, parent):
         return HeightAwareNode(key, value, parent)
+
+    def split(self, key):
+        """
+        Split the tree in two trees: the keys smaller than the key, and the keys greater or equal to it.
+        The nodes are moved, not copied, and this tree is left empty.
+        :performance: O(log(n)), O(n) without index since the keys of one side have to be counted
+        :param key: the key where to cut
+        :return: (left, right) the two new trees
+        """
+        left = self._new_empty()
+        right = self._new_empty()
+
+        count = len(self)
+        left_root, right_root = self._split_subtree(self._root, key)
+        left._adopt(left_root)
+        right._adopt(right_root, count - len(left))
+
+        if self._enable_threading and left._max_node is not None and right._min_node is not None:
+            left._max_node.set_next(None)
+            right._min_node.set_prev(None)
+
+        self.clear()
+
+        return left, right
+
+    @classmethod
+    def join(cls, left, right):
+        """
+        Concatenate two trees, where every key of the left tree is smaller than every key of the right tree.
+        The nodes are moved, not copied, and both trees are left empty.
+        :performance: O(log(n))
+        :param left: the tree with the smaller keys
+        :param right: the tree with the larger keys
+        :return: the new tree
+        """
+        if left._enable_threading != right._enable_threading:
+            raise ValueError("Cannot join a threaded tree with a tree without threading")
+
+        if left._enable_index != right._enable_index:
+            raise ValueError("Cannot join an indexed tree with a tree without index")
+
+        if len(left) > 0 and len(right) > 0:
+            if not left._max_node.get_key() < right._min_node.get_key():
+                raise ValueError("The keys of the left tree must be smaller than the keys of the right tree")
+
+            left._link(left._max_node, right._min_node)
+
+        tree = cls(**left._options())
+        tree._adopt(tree._join_subtrees(left._root, right._root), len(left) + len(right))
+
+        left.clear()
+        right.clear()
+
+        return tree
+
+    def union(self, other, merge_values=None, consume=False):
+        """
+        Return a new tree with the mappings of both trees.
+        The nodes of the smaller tree are moved into the larger one only when consuming indexed trees that are not
+        threaded, and when m is small enough compared to n (see _prefer_search). Otherwise the mappings are copied.
+        :performance: O(m log(n / m + 1)) for sizes n >= m on that path, O(n + m) otherwise. Without consume it is
+        always O(n + m), since all the mappings are copied to the new tree (see BinarySearchTree.union)
+        :param other: the other tree
+        :param merge_values: function (value, other_value) -> value for the keys in both trees.
+        By default the value of the other tree wins, like dict.update
+        :param consume: move the nodes of both trees to the result instead of copying them. Both trees are left empty
+        :return: the new tree
+        """
+        if merge_values is None:
+            merge_values = lambda value, other_value: other_value
+
+        return self._set_operation(other, consume, lambda: super(AVLTree, self).union(other, merge_values),
+                                   lambda root, other_root: self._union_subtrees(root, other_root, merge_values))
+
+    def intersection(self, other, merge_values=None, consume=False):
+        """
+        Return a new tree with the keys present in both trees.
+        :performance: O(m log(n / m + 1)) for sizes n >= m, by moving the nodes when consuming indexed trees
+        that are not threaded, by searching the keys of the smaller tree otherwise. O(n + m) when the sizes are close
+        :param other: the other tree
+        :param merge_values: function (value, other_value) -> value. By default the value of this tree is kept
+        :param consume: move the nodes of both trees to the result instead of copying them. Both trees are left empty
+        :return: the new tree
+        """
+        if merge_values is None:
+            merge_values = lambda value, other_value: value
+
+        return self._set_operation(other, consume, lambda: super(AVLTree, self).intersection(other, merge_values),
+                                   lambda root, other_root: self._intersect_subtrees(root, other_root, merge_values))
+
+    def difference(self, other, consume=False):
+        """
+        Return a new tree with the mappings of this tree whose key is not in the other tree.
+        :performance: O(m log(n / m + 1)) for sizes n >= m when consuming indexed trees that are not threaded,
+        or when this tree is the smaller one. O(n + m) otherwise: the mappings left are copied to the new tree
+        :param other: the other tree
+        :param consume: move the nodes of both trees to the result instead of copying them. Both trees are left empty
+        :return: the new tree
+        """
+        return self._set_operation(other, consume, lambda: super(AVLTree, self).difference(other),
+                                   self._subtract_subtrees)
+
+    def _set_operation(self, other, consume, copy_operation, subtree_operation):
+        """
+        Run a set operation, either by copying the mappings to a new tree (see BinarySearchTree),
+        or by splitting and joining the nodes of both trees when consuming and one is much smaller than the other.
+        The split and join keep the subtree sizes and the node count only for indexed trees
+        """
+        joinable = isinstance(other, AVLTree) and self._enable_index and other._enable_index and \
+            not (self._enable_threading or other._enable_threading)
+
+        if consume and joinable and self._prefer_search(*sorted((len(self), len(other)))):
+            tree = self._new_empty()
+            tree._adopt(subtree_operation(self._root, other._root))
+        else:
+            tree = copy_operation()
+
+        return self._end_set_operation(other, tree, consume)
+
+    def _split_subtree_at(self, node, key):
+        """
+        :return: (left, found, right) the subtrees with the keys smaller and greater than the key,
+        and the detached node with the key (None if it is not in the subtree)
+        """
+        if node is None:
+            return None, None, None
+
+        left, right = node.get_child(LEFT_CHILD), node.get_child(RIGHT_CHILD)
+
+        if key == node.get_key():
+            if left is not None:
+                left.set_parent(None)
+            if right is not None:
+                right.set_parent(None)
+            return left, node, right
+        elif key < node.get_key():
+            left_left, found, left_right = self._split_subtree_at(left, key)
+            return left_left, found, self._join_with(left_right, node, right)
+        else:
+            right_left, found, right_right = self._split_subtree_at(right, key)
+            return self._join_with(left, node, right_left), found, right_right
+
+    def _union_subtrees(self, node, other_node, merge_values):
+        if node is None:
+            return other_node
+        if other_node is None:
+            return node
+
+        other_left, other_right = other_node.get_child(LEFT_CHILD), other_node.get_child(RIGHT_CHILD)
+        left, found, right = self._split_subtree_at(node, other_node.get_key())
+
+        if found is not None:
+            other_node.set_value(merge_values(found.get_value(), other_node.get_value()))
+
+        return self._join_with(self._union_subtrees(left, other_left, merge_values), other_node,
+                               self._union_subtrees(right, other_right, merge_values))
+
+    def _intersect_subtrees(self, node, other_node, merge_values):
+        if node is None or other_node is None:
+            return None
+
+        left, right = node.get_child(LEFT_CHILD), node.get_child(RIGHT_CHILD)
+        other_left, found, other_right = self._split_subtree_at(other_node, node.get_key())
+
+        common_left = self._intersect_subtrees(left, other_left, merge_values)
+        common_right = self._intersect_subtrees(right, other_right, merge_values)
+
+        if found is None:
+            return self._join_subtrees(common_left, common_right)
+
+        node.set_value(merge_values(node.get_value(), found.get_value()))
+        return self._join_with(common_left, node, common_right)
+
+    def _subtract_subtrees(self, node, other_node):
+        if node is None or other_node is None:
+            return node
+
+        other_left, other_right = other_node.get_child(LEFT_CHILD), other_node.get_child(RIGHT_CHILD)
+        left, _, right = self._split_subtree_at(node, other_node.get_key())
+
+        return self._join_subtrees(self._subtract_subtrees(left, other_left),
+                                   self._subtract_subtrees(right, other_right))
+
+    def delete_range(self, start, stop, inclusive=False):
+        """
+        Delete every mapping whose key is in the range, same as del self[start:stop].
+        The range is cut out as a whole subtree, by splitting the tree twice and joining what remains.
+        :performance: O(log(n)), O(log(n) + k) for k deleted keys without index since they have to be counted
+        :param start: the start key (inclusive), None for the min
+        :param stop: the stop key (inclusive if specified else exclusive), None for the max
+        :param inclusive: if the stop key is deleted or not
+        :return: the number of deleted mappings
+        """
+        node_count = self._node_count
+        self._cut_range(start, stop, inclusive)
+        return node_count - self._node_count
+
+    def _cut_range(self, start, stop, inclusive):
+        """
+        Detach the subtree of the keys in the range and keep the remaining keys, balanced.
+        The node count drops by the subtree size of the detached subtree, or by its number of nodes without index
+        :return: the root of the detached subtree, None if the range is empty
+        """
+        if start is not None and stop is not None and start > stop:
+            raise ValueError("Cannot search for a slice with a start greater than a stop")
+
+        if start is None:
+            left, rest = None, self._root
+        else:
+            left, rest = self._split_subtree(self._root, start)
+
+        if stop is None:
+            middle, right = rest, None
+        else:
+            middle, found, right = self._split_subtree_at(rest, stop)
+
+            if found is not None:
+                if inclusive:
+                    middle = self._join_with(middle, found, None)
+                else:
+                    right = self._join_with(None, found, right)
+
+        if middle is None:
+            self._adopt(self._join_subtrees(left, right), self._node_count)
+            return None
+
+        if self._enable_threading:
+            last = left
+            while last is not None and last.has_child(RIGHT_CHILD):
+                last = last.get_child(RIGHT_CHILD)
+
+            first = right
+            while first is not None and first.has_child(LEFT_CHILD):
+                first = first.get_child(LEFT_CHILD)
+
+            self._link(last, first)
+
+        if self._enable_index:
+            removed = middle.get_subtree_size()
+        else:
+            removed = sum(1 for _ in self._inorder_traversal(middle))
+
+        self._adopt(self._join_subtrees(left, right), self._node_count - removed)
+
+        if self._root is None:
+            self.clear()
+
+        return middle
+
+    def _adopt(self, root, count=None):
+        """
+        Make a detached subtree the content of this (empty) tree
+        :param root: the root of the subtree, can be None
+        :param count: the number of nodes of the subtree. If None, it is read from the subtree size of the root,
+        or counted in O(n) when the subtree sizes are not maintained
+        :return: void
+        """
+        if count is None:
+            if root is None:
+                count = 0
+            elif self._enable_index:
+                count = root.get_subtree_size()
+            else:
+                count = sum(1 for _ in self._inorder_traversal(root))
+
+        self._root = root
+        self._node_count = count
+
+        if root is not None:
+            root.set_parent(None)
+
+            walk = root
+            while walk.has_child(LEFT_CHILD):
+                walk = walk.get_child(LEFT_CHILD)
+            self._min_node = walk
+
+            walk = root
+            while walk.has_child(RIGHT_CHILD):
+                walk = walk.get_child(RIGHT_CHILD)
+            self._max_node = walk
+
+    def _split_subtree(self, node, key):
+        """
+        :return: (left, right) the roots of the subtrees with the keys smaller and greater or equal to the key
+        """
+        if node is None:
+            return None, None
+
+        left, right = node.get_child(LEFT_CHILD), node.get_child(RIGHT_CHILD)
+
+        if key <= node.get_key():
+            left_left, left_right = self._split_subtree(left, key)
+            return left_left, self._join_with(left_right, node, right)
+        else:
+            right_left, right_right = self._split_subtree(right, key)
+            return self._join_with(left, node, right_left), right_right
+
+    def _join_subtrees(self, left, right):
+        """
+        :return: the root of the concatenation of two subtrees
+        """
+        if left is None:
+            return right
+        if right is None:
+            return left
+
+        left, last = self._split_last(left)
+        return self._join_with(left, last, right)
+
+    def _split_last(self, node):
+        """
+        :return: (root, last) the subtree without its largest node, and that node
+        """
+        right = node.get_child(RIGHT_CHILD)
+
+        if right is None:
+            return node.get_child(LEFT_CHILD), node
+
+        right, last = self._split_last(right)
+        return self._join_with(node.get_child(LEFT_CHILD), node, right), last
+
+    def _join_with(self, left, middle, right):
+        """
+        Join two subtrees with a middle node, whose key is between them, keeping the AVL property.
+        :performance: O(|height(left) - height(right)|)
+        :return: the root of the joined subtree
+        """
+        left_height, right_height = self._subtree_height(left), self._subtree_height(right)
+
+        if left_height > right_height + 1:
+            return self._join_right(left, middle, right)
+        if right_height > left_height + 1:
+            return self._join_left(left, middle, right)
+
+        return self._link_subtree(left, middle, right)
+
+    def _join_right(self, left, middle, right):
+        # walk down the right spine of the taller left subtree
+        inner, outer = left.get_child(RIGHT_CHILD), left.get_child(LEFT_CHILD)
+        height = self._subtree_height
+
+        if height(inner) <= height(right) + 1:
+            joined = self._link_subtree(inner, middle, right)
+            if height(joined) <= height(outer) + 1:
+                return self._link_subtree(outer, left, joined)
+            return self._rotate_subtree_left(self._link_subtree(outer, left, self._rotate_subtree_right(joined)))
+
+        joined = self._join_right(inner, middle, right)
+        root = self._link_subtree(outer, left, joined)
+        if height(joined) <= height(outer) + 1:
+            return root
+        return self._rotate_subtree_left(root)
+
+    def _join_left(self, left, middle, right):
+        # walk down the left spine of the taller right subtree
+        inner, outer = right.get_child(LEFT_CHILD), right.get_child(RIGHT_CHILD)
+        height = self._subtree_height
+
+        if height(inner) <= height(left) + 1:
+            joined = self._link_subtree(left, middle, inner)
+            if height(joined) <= height(outer) + 1:
+                return self._link_subtree(joined, right, outer)
+            return self._rotate_subtree_right(self._link_subtree(self._rotate_subtree_left(joined), right, outer))
+
+        joined = self._join_left(left, middle, inner)
+        root = self._link_subtree(joined, right, outer)
+        if height(joined) <= height(outer) + 1:
+            return root
+        return self._rotate_subtree_right(root)
+
+    def _node_weight(self, node):
+        """
+        :return: what the node adds to the subtree size of its ancestors
+        """
+        return 1
+
+    def _subtree_height(self, node):
+        return 0 if node is None else node.get_height()
+
+    def _link_subtree(self, left, node, right):
+        """
+        Make a detached subtree out of a node and its two children, with its height and size up to date
+        :return: the node
+        """
+        self._attach(node, left, LEFT_CHILD)
+        self._attach(node, right, RIGHT_CHILD)
+        node.set_parent(None)
+        node.recompute_height()
+
+        size = self._node_weight(node)
+        if left is not None:
+            size += left.get_subtree_size()
+        if right is not None:
+            size += right.get_subtree_size()
+        node.set_subtree_size(size)
+
+        return node
+
+    def _rotate_subtree_left(self, node):
+        pivot = node.get_child(RIGHT_CHILD)
+        return self._link_subtree(self._link_subtree(node.get_child(LEFT_CHILD), node, pivot.get_child(LEFT_CHILD)),
+                                  pivot, pivot.get_child(RIGHT_CHILD))
+
+    def _rotate_subtree_right(self, node):
+        pivot = node.get_child(LEFT_CHILD)
+        return self._link_subtree(pivot.get_child(LEFT_CHILD), pivot,
+                                  self._link_subtree(pivot.get_child(RIGHT_CHILD), node, node.get_child(RIGHT_CHILD)))
@@ -0,0 +1,617 @@
+from array import array
+
+from pymaps.SortedContainer import SortedContainer, dedup_sorted_pairs
+
+NIL = -1
+
+
+# noinspection PyMethodMayBeStatic
+class ArrayAVLTree(SortedContainer):
+    """
+    AVL tree where the nodes are not objects, but slots in parallel columns.
+    The links (left, right, parent), the subtree sizes and the heights are int32 arrays,
+    while the keys and values are kept in lists. Deleted slots are reused through a free list.
+
+    It offers the same map interface as AVLTree, with far less memory and allocation per key.
+    """
+    __slots__ = [
+        "_root",
+        "_left",
+        "_right",
+        "_parent",
+        "_size",
+        "_height",
+        "_keys",
+        "_values",
+        "_free"
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self._root = NIL
+        self._left = array("i")
+        self._right = array("i")
+        self._parent = array("i")
+        self._size = array("i")
+        self._height = array("i")
+        self._keys = []
+        self._values = []
+        self._free = []
+
+    @classmethod
+    def from_sorted(cls, items):
+        """
+        Build a perfectly balanced tree from (key, value) pairs already sorted by key.
+        :performance: O(n)
+        :param items: an iterable of (key, value) tuples, sorted by key. When a key is repeated, the last value wins
+        :return: the new tree
+        """
+        tree = cls()
+        pairs = list(dedup_sorted_pairs(items))
+
+        count = len(pairs)
+        tree._keys = [key for key, _ in pairs]
+        tree._values = [value for _, value in pairs]
+        tree._left = array("i", [NIL]) * count
+        tree._right = array("i", [NIL]) * count
+        tree._parent = array("i", [NIL]) * count
+        tree._size = array("i", [0]) * count
+        tree._height = array("i", [0]) * count
+
+        # the slot of a node is its index in the sorted sequence
+        tree._root = tree._build_balanced(0, count, NIL)
+
+        return tree
+
+    @classmethod
+    def bulk_load(cls, items):
+        """
+        Build a perfectly balanced tree from (key, value) pairs (or a mapping) in any order
+        :performance: O(n log(n))
+        :param items: a mapping or an iterable of (key, value) tuples. When a key is repeated, the last value wins
+        :return: the new tree
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        return cls.from_sorted(sorted(items, key=lambda pair: pair[0]))
+
+    def _build_balanced(self, low, high, parent):
+        if low >= high:
+            return NIL
+
+        middle = (low + high) // 2
+
+        self._parent[middle] = parent
+        self._left[middle] = self._build_balanced(low, middle, middle)
+        self._right[middle] = self._build_balanced(middle + 1, high, middle)
+        self._update(middle)
+
+        return middle
+
+    def clear(self):
+        """
+        Empty the tree
+        :return: void
+        """
+        self.__init__()
+
+    def __len__(self):
+        return self._node_size(self._root)
+
+    def _node_size(self, node):
+        return 0 if node == NIL else self._size[node]
+
+    def _node_height(self, node):
+        return 0 if node == NIL else self._height[node]
+
+    def _update(self, node):
+        """
+        Recompute the size and the height of a node from its children
+        :param node: the slot of the node
+        :return: void
+        """
+        left, right = self._left[node], self._right[node]
+        self._size[node] = 1 + self._node_size(left) + self._node_size(right)
+        self._height[node] = 1 + max(self._node_height(left), self._node_height(right))
+
+    def _allocate(self, key, value, parent):
+        """
+        Take a free slot (or append a new one) for a new leaf
+        :return: the slot
+        """
+        if self._free:
+            node = self._free.pop()
+            self._keys[node] = key
+            self._values[node] = value
+            self._left[node] = NIL
+            self._right[node] = NIL
+            self._parent[node] = parent
+            self._size[node] = 1
+            self._height[node] = 1
+        else:
+            node = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            self._left.append(NIL)
+            self._right.append(NIL)
+            self._parent.append(parent)
+            self._size.append(1)
+            self._height.append(1)
+
+        return node
+
+    def _release(self, node):
+        self._keys[node] = None
+        self._values[node] = None
+        self._free.append(node)
+
+    def _replace_child(self, parent, old_child, new_child):
+        if parent == NIL:
+            self._root = new_child
+        elif self._left[parent] == old_child:
+            self._left[parent] = new_child
+        else:
+            self._right[parent] = new_child
+
+        if new_child != NIL:
+            self._parent[new_child] = parent
+
+    def _rotate_left(self, node):
+        pivot = self._right[node]
+        moved = self._left[pivot]
+
+        self._right[node] = moved
+        if moved != NIL:
+            self._parent[moved] = node
+
+        self._replace_child(self._parent[node], node, pivot)
+
+        self._left[pivot] = node
+        self._parent[node] = pivot
+
+        self._update(node)
+        self._update(pivot)
+
+        return pivot
+
+    def _rotate_right(self, node):
+        pivot = self._left[node]
+        moved = self._right[pivot]
+
+        self._left[node] = moved
+        if moved != NIL:
+            self._parent[moved] = node
+
+        self._replace_child(self._parent[node], node, pivot)
+
+        self._right[pivot] = node
+        self._parent[node] = pivot
+
+        self._update(node)
+        self._update(pivot)
+
+        return pivot
+
+    def _adjust_sizes(self, node, delta):
+        """
+        Add delta to the subtree size of every node between the node and the root
+        :performance: O(log(n))
+        """
+        size, parent = self._size, self._parent
+
+        while node != NIL:
+            size[node] += delta
+            node = parent[node]
+
+    def _rebalance(self, node):
+        """
+        Walk from the node toward the root, updating the heights and restoring the AVL property.
+        The walk stops as soon as a subtree keeps its height, since nothing above it changes.
+        The subtree sizes must already be up to date.
+        :performance: O(log(n))
+        :param node: the lowest node that changed
+        :return: void
+        """
+        left, right, height, node_height = self._left, self._right, self._height, self._node_height
+
+        while node != NIL:
+            old_height = height[node]
+            left_height, right_height = node_height(left[node]), node_height(right[node])
+
+            if left_height - right_height > 1:
+                child = left[node]
+                if node_height(left[child]) < node_height(right[child]):
+                    self._rotate_left(child)
+                node = self._rotate_right(node)
+            elif right_height - left_height > 1:
+                child = right[node]
+                if node_height(right[child]) < node_height(left[child]):
+                    self._rotate_right(child)
+                node = self._rotate_left(node)
+            else:
+                height[node] = 1 + max(left_height, right_height)
+
+            if height[node] == old_height:
+                break
+
+            node = self._parent[node]
+
+    def _search(self, key):
+        """
+        Performs a binary search for a key in the tree.
+        :performance: O(log(n))
+        :param key: the key to search for
+        :return: the slot of the key, or the slot where the key would be a child of (NIL if empty)
+        """
+        keys, left, right = self._keys, self._left, self._right
+        last = NIL
+        walk = self._root
+
+        while walk != NIL:
+            walk_key = keys[walk]
+            if walk_key == key:
+                return walk
+            last = walk
+            walk = left[walk] if key < walk_key else right[walk]
+
+        return last
+
+    def _find(self, key):
+        node = self._search(key)
+        return node if node != NIL and self._keys[node] == key else NIL
+
+    def __getitem__(self, query):
+        if isinstance(query, slice):
+            return self.slice(query.start, query.stop, query.step)
+        else:
+            return self._get(query)
+
+    def _get(self, key):
+        node = self._find(key)
+        return None if node == NIL else self._values[node]
+
+    def __contains__(self, key):
+        return self._find(key) != NIL
+
+    def __setitem__(self, key, value):
+        self._insert(key, value)
+
+    def _insert(self, key, value):
+        """
+        Insert a mapping, or replace the value if the key is already in the tree
+        :performance: O(log(n))
+        :param key: the key of the mapping
+        :param value: the value of the mapping
+        :return: void
+        """
+        spot = self._search(key)
+
+        if spot == NIL:
+            self._root = self._allocate(key, value, NIL)
+        elif self._keys[spot] == key:
+            self._values[spot] = value
+        else:
+            node = self._allocate(key, value, spot)
+            if key < self._keys[spot]:
+                self._left[spot] = node
+            else:
+                self._right[spot] = node
+            self._adjust_sizes(spot, 1)
+            self._rebalance(spot)
+
+    def __delitem__(self, key):
+        self._remove(key)
+
+    def _remove(self, key):
+        """
+        Remove a mapping, does nothing if the key is not in the tree
+        :performance: O(log(n))
+        :param key: the key
+        :return: void
+        """
+        node = self._find(key)
+
+        if node == NIL:
+            return
+
+        if self._left[node] != NIL and self._right[node] != NIL:
+            # move the successor's mapping up, then delete the successor which has no left child
+            successor = self._right[node]
+            while self._left[successor] != NIL:
+                successor = self._left[successor]
+
+            self._keys[node] = self._keys[successor]
+            self._values[node] = self._values[successor]
+            node = successor
+
+        child = self._left[node] if self._left[node] != NIL else self._right[node]
+        parent = self._parent[node]
+
+        self._replace_child(parent, node, child)
+        self._release(node)
+        self._adjust_sizes(parent, -1)
+        self._rebalance(parent)
+
+    def __iter__(self):
+        """
+        Yield all (key,value) pairs of the tree, in order
+        :return:
+        """
+        keys, values, left, right = self._keys, self._values, self._left, self._right
+        stack = []
+        walk = self._root
+
+        while stack or walk != NIL:
+            while walk != NIL:
+                stack.append(walk)
+                walk = left[walk]
+
+            walk = stack.pop()
+            yield keys[walk], values[walk]
+            walk = right[walk]
+
+    def _successor(self, node):
+        walk = self._right[node]
+
+        if walk != NIL:
+            while self._left[walk] != NIL:
+                walk = self._left[walk]
+            return walk
+
+        parent = self._parent[node]
+        while parent != NIL and node == self._right[parent]:
+            node = parent
+            parent = self._parent[parent]
+
+        return parent
+
+    def _predecessor(self, node):
+        walk = self._left[node]
+
+        if walk != NIL:
+            while self._right[walk] != NIL:
+                walk = self._right[walk]
+            return walk
+
+        parent = self._parent[node]
+        while parent != NIL and node == self._left[parent]:
+            node = parent
+            parent = self._parent[parent]
+
+        return parent
+
+    def _ceiling(self, key, strict=False):
+        """
+        :return: the slot of the smallest key greater (or equal if not strict) than the key, NIL if none
+        """
+        keys, left, right = self._keys, self._left, self._right
+        walk = self._root
+        found = NIL
+
+        while walk != NIL:
+            walk_key = keys[walk]
+            if walk_key < key or (strict and walk_key == key):
+                walk = right[walk]
+            else:
+                found = walk
+                walk = left[walk]
+
+        return found
+
+    def _floor(self, key, strict=False):
+        """
+        :return: the slot of the largest key smaller (or equal if not strict) than the key, NIL if none
+        """
+        keys, left, right = self._keys, self._left, self._right
+        walk = self._root
+        found = NIL
+
+        while walk != NIL:
+            walk_key = keys[walk]
+            if key < walk_key or (strict and walk_key == key):
+                walk = left[walk]
+            else:
+                found = walk
+                walk = right[walk]
+
+        return found
+
+    def _pair(self, node):
+        if node == NIL:
+            return None, None
+        return self._keys[node], self._values[node]
+
+    def get_min(self):
+        """
+        Get the key and the value associated with the smallest key
+        :performance O(log(n))
+        :return: tuple (key, value)
+        """
+        if self._root == NIL:
+            raise ValueError("Empty Binary Search tree")
+
+        walk = self._root
+        while self._left[walk] != NIL:
+            walk = self._left[walk]
+
+        return self._pair(walk)
+
+    def get_max(self):
+        """
+        Get the key and the value associated with the largest key
+        :performance O(log(n))
+        :return: tuple (key, value)
+        """
+        if self._root == NIL:
+            raise ValueError("Empty Binary Search tree")
+
+        walk = self._root
+        while self._right[walk] != NIL:
+            walk = self._right[walk]
+
+        return self._pair(walk)
+
+    def find_gt(self, key):
+        return self._pair(self._ceiling(key, strict=True))
+
+    def find_gte(self, key):
+        return self._pair(self._ceiling(key))
+
+    def find_st(self, key):
+        return self._pair(self._floor(key, strict=True))
+
+    def find_ste(self, key):
+        return self._pair(self._floor(key))
+
+    def _gen_slice(self, start, stop, step, inclusive):
+        if start is not None and stop is not None and start > stop:
+            raise ValueError("Cannot search for a slice with a start greater than a stop")
+
+        keys = self._keys
+        walk = self._ceiling(start) if start is not None else self._ceiling_of_all()
+
+        while walk != NIL:
+            key = keys[walk]
+
+            if stop is not None and (stop < key or (not inclusive and key == stop)):
+                break
+
+            yield walk
+
+            for i in range(1 if step is None else step):  # skip "step" many items
+                walk = self._successor(walk)
+                if walk == NIL:
+                    break
+
+    def _ceiling_of_all(self):
+        walk = self._root
+        if walk == NIL:
+            return NIL
+        while self._left[walk] != NIL:
+            walk = self._left[walk]
+        return walk
+
+    def slice(self, start, stop, step=1, inclusive=False):
+        """
+        Return a slice of the tree
+        :param start: the start key (None for min_key)
+        :param stop: the stop key (None for until the end of the tree)
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if the stop key is included or not
+        :return: an array of (key,value) tuples
+        """
+        return [self._pair(node) for node in self._gen_slice(start, stop, step, inclusive)]
+
+    def islice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the inverse of a slice: the mappings with a key smaller than start or greater than stop
+        :param start: the start key (None for min_key)
+        :param stop: the stop key (None for max_key)
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if start and stop are included or not
+        :return: an array of (key,value) tuples
+        """
+        keys = self._keys
+        result = []
+        step = 1 if step is None else step
+
+        for i, node in enumerate(self._gen_slice(None, start, 1, inclusive)):
+            if i % step == 0:
+                result.append(self._pair(node))
+
+        if stop is not None:
+            walk = self._ceiling(stop, strict=not inclusive)
+            while walk != NIL:
+                result.append(self._pair(walk))
+                for i in range(step):
+                    walk = self._successor(walk)
+                    if walk == NIL:
+                        break
+
+        return result
+
+    def bisect_left(self, key):
+        """
+        :performance: O(log(n))
+        :return: the number of keys smaller than the key
+        """
+        return self._bisect(key, False)
+
+    def bisect_right(self, key):
+        """
+        :performance: O(log(n))
+        :return: the number of keys smaller or equal to the key
+        """
+        return self._bisect(key, True)
+
+    def _bisect(self, key, right):
+        keys, left_column, right_column = self._keys, self._left, self._right
+        walk = self._root
+        smaller_count = 0
+
+        while walk != NIL:
+            walk_key = keys[walk]
+            if walk_key < key or (right and walk_key == key):
+                smaller_count += 1 + self._node_size(left_column[walk])
+                walk = right_column[walk]
+            else:
+                walk = left_column[walk]
+
+        return smaller_count
+
+    def index_of(self, key):
+        """
+        Return the index of the key, as if the keys were a sorted list
+        :performance: O(log(n))
+        :param key: the key to search for
+        :return: the index, or None if the key is not in the tree
+        """
+        if key not in self:
+            return None
+        return self.bisect_left(key)
+
+    def _at_index(self, index):
+        if not -len(self) <= index < len(self):
+            raise ValueError("Illegal index")
+
+        if index < 0:
+            index += len(self)
+
+        walk = self._root
+
+        while True:
+            left_size = self._node_size(self._left[walk])
+
+            if index < left_size:
+                walk = self._left[walk]
+            elif index == left_size:
+                return walk
+            else:
+                index -= left_size + 1
+                walk = self._right[walk]
+
+    def at_index(self, index):
+        """
+        Return the mapping at the specified index of the sorted sequence of keys
+        :performance: O(log(n))
+        :param index: the index
+        :return: (tuple)(key, value)
+        """
+        return self._pair(self._at_index(index))
+
+    def count_in_range(self, start, stop, step=1, inclusive=False):
+        """
+        Return the number of elements contained in the specified interval.
+        :performance: O(log(n))
+        :param step: the step between two distinct elements
+        :param start: the start of the range (inclusive), None for min_key
+        :param stop:  the stop of the range (inclusive if specified else exclusive), None for max_key
+        :param inclusive: if we include the stop or not
+        :return: the count
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+        return self._step_count(first, last, step)
+
+    def height(self):
+        return self._node_height(self._root)
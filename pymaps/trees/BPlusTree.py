@@ -0,0 +1,373 @@
+from bisect import bisect_left, bisect_right
+
+from pymaps.SortedContainer import dedup_sorted_pairs
+from pymaps.trees.BaseBPlusTree import BaseBPlusTree
+
+
+class BPlusLeaf:
+    __slots__ = ["_keys", "_values", "_prev_leaf", "_next_leaf"]
+
+    def __init__(self, keys, values):
+        self._keys = keys
+        self._values = values
+        self._prev_leaf = None
+        self._next_leaf = None
+
+    def get_count(self):
+        return len(self._keys)
+
+    def get_width(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return "Leaf%s" % (self._keys,)
+
+
+class BPlusInternal:
+    """
+    Internal node. The child i holds the keys k such that keys[i - 1] <= k < keys[i],
+    and counts[i] is the number of keys stored under it.
+    """
+    __slots__ = ["_keys", "_children", "_counts"]
+
+    def __init__(self, keys, children, counts):
+        self._keys = keys
+        self._children = children
+        self._counts = counts
+
+    def get_count(self):
+        return sum(self._counts)
+
+    def get_width(self):
+        return len(self._children)
+
+    def __repr__(self):
+        return "Internal%s" % (self._keys,)
+
+
+class BPlusTree(BaseBPlusTree):
+    """
+    Sorted map based on a B+ tree. Every node holds up to `order` keys (leaves) or children (internal
+    nodes) in Python lists searched with bisect, so a lookup visits about log_order(n) nodes instead
+    of log_2(n). The leaves are linked for range scans, and every internal node keeps the number of
+    keys under each child for the index methods.
+    """
+    __slots__ = ["_order"]
+
+    _internal_class = BPlusInternal
+
+    def __init__(self, order=64):
+        """
+        :param order: the maximal number of keys in a leaf and of children in an internal node (at least 4)
+        """
+        super().__init__()
+
+        if order < 4:
+            raise ValueError("The order of a B+ tree must be at least 4")
+
+        self._order = order
+        self._root = BPlusLeaf([], [])
+        self._first_leaf = self._root
+        self._last_leaf = self._root
+        self._item_count = 0
+
+    @classmethod
+    def from_sorted(cls, items, order=64):
+        """
+        Build a tree from (key, value) pairs already sorted by key, level by level.
+        :performance: O(n)
+        :param items: an iterable of (key, value) tuples, sorted by key. When a key is repeated, the last value wins
+        :param order: see __init__
+        :return: the new tree
+        """
+        tree = cls(order=order)
+
+        pairs = list(dedup_sorted_pairs(items))
+        keys = [key for key, _ in pairs]
+        values = [value for _, value in pairs]
+
+        if not keys:
+            return tree
+
+        leaves = [BPlusLeaf(keys[low:high], values[low:high]) for low, high in tree._chunks(len(keys))]
+
+        for previous, leaf in zip(leaves, leaves[1:]):
+            previous._next_leaf = leaf
+            leaf._prev_leaf = previous
+
+        level = leaves
+        lowest_keys = [leaf._keys[0] for leaf in leaves]
+
+        while len(level) > 1:
+            parents = []
+            parent_lowest_keys = []
+
+            for low, high in tree._chunks(len(level)):
+                children = level[low:high]
+                parents.append(BPlusInternal(lowest_keys[low + 1:high], children,
+                                             [child.get_count() for child in children]))
+                parent_lowest_keys.append(lowest_keys[low])
+
+            level, lowest_keys = parents, parent_lowest_keys
+
+        tree._root = level[0]
+        tree._first_leaf = leaves[0]
+        tree._last_leaf = leaves[-1]
+        tree._item_count = len(keys)
+
+        return tree
+
+    @classmethod
+    def bulk_load(cls, items, order=64):
+        """
+        Build a tree from (key, value) pairs (or a mapping) in any order
+        :performance: O(n log(n))
+        :param items: a mapping or an iterable of (key, value) tuples. When a key is repeated, the last value wins
+        :param order: see __init__
+        :return: the new tree
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        return cls.from_sorted(sorted(items, key=lambda pair: pair[0]), order=order)
+
+    def _chunks(self, count):
+        """
+        Split count items in the fewest nodes, with sizes differing by at most one
+        :return: generator of (low, high) bounds
+        """
+        node_count = -(-count // self._order)
+        for i in range(node_count):
+            yield count * i // node_count, count * (i + 1) // node_count
+
+    def _node(self, ref):
+        """
+        The nodes refer to each other directly
+        """
+        return ref
+
+    def _min_width(self):
+        return self._order // 2
+
+    def clear(self):
+        """
+        Empty the tree
+        :return: void
+        """
+        self.__init__(order=self._order)
+
+    def __setitem__(self, key, value):
+        self._insert(key, value)
+
+    def update(self, items):
+        """
+        Insert a batch of mappings, like dict.update
+        :param items: a mapping or an iterable of (key, value) tuples
+        :return: void
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        for key, value in items:
+            self._insert(key, value)
+
+    def _insert(self, key, value):
+        """
+        Insert a mapping, or replace the value if the key is already in the tree
+        :performance: O(order * log(n))
+        :return: void
+        """
+        added, split = self._insert_in(self._root, key, value)
+
+        if added:
+            self._item_count += 1
+
+        if split is not None:
+            separator, right = split
+            left = self._root
+            self._root = BPlusInternal([separator], [left, right], [left.get_count(), right.get_count()])
+
+    def _insert_in(self, node, key, value):
+        """
+        Insert in the subtree of the node
+        :return: (added, split), if a key was added and the (separator, new right node) if the node was split
+        """
+        if isinstance(node, BPlusLeaf):
+            keys = node._keys
+            i = bisect_left(keys, key)
+
+            if i < len(keys) and keys[i] == key:
+                node._values[i] = value
+                return False, None
+
+            keys.insert(i, key)
+            node._values.insert(i, value)
+
+            if len(keys) <= self._order:
+                return True, None
+
+            middle = len(keys) // 2
+            right = BPlusLeaf(keys[middle:], node._values[middle:])
+            del keys[middle:]
+            del node._values[middle:]
+
+            right._next_leaf = node._next_leaf
+            right._prev_leaf = node
+            if node._next_leaf is not None:
+                node._next_leaf._prev_leaf = right
+            node._next_leaf = right
+
+            if node is self._last_leaf:
+                self._last_leaf = right
+
+            return True, (right._keys[0], right)
+
+        i = bisect_right(node._keys, key)
+        child = node._children[i]
+        added, split = self._insert_in(child, key, value)
+
+        if added:
+            node._counts[i] += 1
+
+        if split is None:
+            return added, None
+
+        separator, right = split
+        node._keys.insert(i, separator)
+        node._children.insert(i + 1, right)
+        node._counts.insert(i + 1, right.get_count())
+        node._counts[i] -= node._counts[i + 1]
+
+        if len(node._children) <= self._order:
+            return added, None
+
+        middle = len(node._children) // 2
+        separator = node._keys[middle - 1]
+        right = BPlusInternal(node._keys[middle:], node._children[middle:], node._counts[middle:])
+        del node._keys[middle - 1:]
+        del node._children[middle:]
+        del node._counts[middle:]
+
+        return added, (separator, right)
+
+    def __delitem__(self, key):
+        self._remove(key)
+
+    def _remove(self, key):
+        """
+        Remove a mapping, does nothing if the key is not in the tree
+        :performance: O(order * log(n))
+        :return: void
+        """
+        if self._remove_in(self._root, key):
+            self._item_count -= 1
+
+        if isinstance(self._root, BPlusInternal) and len(self._root._children) == 1:
+            self._root = self._root._children[0]
+
+    def _remove_in(self, node, key):
+        """
+        Remove from the subtree of the node
+        :return: True if the key was removed
+        """
+        if isinstance(node, BPlusLeaf):
+            i = bisect_left(node._keys, key)
+
+            if i < len(node._keys) and node._keys[i] == key:
+                del node._keys[i]
+                del node._values[i]
+                return True
+
+            return False
+
+        i = bisect_right(node._keys, key)
+
+        if not self._remove_in(node._children[i], key):
+            return False
+
+        node._counts[i] -= 1
+
+        if node._children[i].get_width() < self._min_width():
+            self._fix_child(node, i)
+
+        return True
+
+    def _fix_child(self, parent, i):
+        """
+        Refill an underfull child, by borrowing from a sibling or by merging with it
+        :param parent: the parent node
+        :param i: the index of the underfull child
+        :return: void
+        """
+        children = parent._children
+
+        if i > 0 and children[i - 1].get_width() > self._min_width():
+            self._borrow_from_left(parent, i)
+        elif i + 1 < len(children) and children[i + 1].get_width() > self._min_width():
+            self._borrow_from_right(parent, i)
+        elif i > 0:
+            self._merge(parent, i - 1)
+        elif i + 1 < len(children):
+            self._merge(parent, i)
+
+    def _borrow_from_left(self, parent, i):
+        child, left = parent._children[i], parent._children[i - 1]
+
+        if isinstance(child, BPlusLeaf):
+            child._keys.insert(0, left._keys.pop())
+            child._values.insert(0, left._values.pop())
+            moved_count = 1
+            parent._keys[i - 1] = child._keys[0]
+        else:
+            child._keys.insert(0, parent._keys[i - 1])
+            parent._keys[i - 1] = left._keys.pop()
+            child._children.insert(0, left._children.pop())
+            moved_count = left._counts.pop()
+            child._counts.insert(0, moved_count)
+
+        parent._counts[i - 1] -= moved_count
+        parent._counts[i] += moved_count
+
+    def _borrow_from_right(self, parent, i):
+        child, right = parent._children[i], parent._children[i + 1]
+
+        if isinstance(child, BPlusLeaf):
+            child._keys.append(right._keys.pop(0))
+            child._values.append(right._values.pop(0))
+            moved_count = 1
+            parent._keys[i] = right._keys[0]
+        else:
+            child._keys.append(parent._keys[i])
+            parent._keys[i] = right._keys.pop(0)
+            child._children.append(right._children.pop(0))
+            moved_count = right._counts.pop(0)
+            child._counts.append(moved_count)
+
+        parent._counts[i + 1] -= moved_count
+        parent._counts[i] += moved_count
+
+    def _merge(self, parent, i):
+        """
+        Merge the child i + 1 into the child i
+        """
+        left, right = parent._children[i], parent._children[i + 1]
+
+        if isinstance(left, BPlusLeaf):
+            left._keys.extend(right._keys)
+            left._values.extend(right._values)
+
+            left._next_leaf = right._next_leaf
+            if right._next_leaf is not None:
+                right._next_leaf._prev_leaf = left
+
+            if right is self._last_leaf:
+                self._last_leaf = left
+        else:
+            left._keys.append(parent._keys[i])
+            left._keys.extend(right._keys)
+            left._children.extend(right._children)
+            left._counts.extend(right._counts)
+
+        del parent._keys[i]
+        del parent._children[i + 1]
+        parent._counts[i] += parent._counts.pop(i + 1)
@@ -0,0 +1,283 @@
+from bisect import bisect_left, bisect_right
+
+from pymaps.SortedContainer import SortedContainer
+
+
+class BaseBPlusTree(SortedContainer):
+    """
+    The read side of the B+ trees. The nodes refer to their children and to the neighbouring leaves through
+    references that only _node can follow: the nodes themselves for a tree in memory, offsets for a tree in a file.
+    A leaf has _keys, _values, _prev_leaf and _next_leaf, an internal node has _keys, _children and _counts.
+    The subclasses set _internal_class, and _root, _first_leaf and _last_leaf to references.
+    """
+    __slots__ = ["_root", "_first_leaf", "_last_leaf", "_item_count"]
+
+    _internal_class = None
+
+    def __init__(self):
+        super().__init__()
+
+    def _node(self, ref):
+        """
+        Follow a reference
+        :param ref: the reference to a node, from a parent, a neighbouring leaf or the tree
+        :return: the node, None for the reference to no node
+        """
+        raise NotImplementedError()
+
+    def __len__(self):
+        return self._item_count
+
+    def _find_leaf(self, key):
+        """
+        :performance: O(log(n))
+        :return: the leaf where the key is or would be, None if the tree has no node
+        """
+        node = self._node(self._root)
+
+        while isinstance(node, self._internal_class):
+            node = self._node(node._children[bisect_right(node._keys, key)])
+
+        return node
+
+    def __getitem__(self, query):
+        if isinstance(query, slice):
+            return self.slice(query.start, query.stop, query.step)
+        else:
+            return self._get(query)
+
+    def _get(self, key):
+        leaf = self._find_leaf(key)
+
+        if leaf is not None:
+            i = bisect_left(leaf._keys, key)
+            if i < len(leaf._keys) and leaf._keys[i] == key:
+                return leaf._values[i]
+
+        return None
+
+    def __contains__(self, key):
+        leaf = self._find_leaf(key)
+
+        if leaf is None:
+            return False
+
+        i = bisect_left(leaf._keys, key)
+        return i < len(leaf._keys) and leaf._keys[i] == key
+
+    def __iter__(self):
+        """
+        Yield all (key,value) pairs of the tree, in order
+        :return:
+        """
+        leaf = self._node(self._first_leaf)
+
+        while leaf is not None:
+            yield from zip(leaf._keys, leaf._values)
+            leaf = self._node(leaf._next_leaf)
+
+    def _locate(self, key, after_equals):
+        """
+        Find the position of the first key greater (or equal if not after_equals) than the key
+        :return: (leaf, i), the leaf is None if there is no such key
+        """
+        leaf = self._find_leaf(key)
+
+        if leaf is None:
+            return None, 0
+
+        i = bisect_right(leaf._keys, key) if after_equals else bisect_left(leaf._keys, key)
+
+        if i == len(leaf._keys):
+            return self._node(leaf._next_leaf), 0
+
+        return leaf, i
+
+    def _locate_before(self, key, before_equals):
+        """
+        Find the position of the last key smaller (or equal if not before_equals) than the key
+        :return: (leaf, i), the leaf is None if there is no such key
+        """
+        leaf = self._find_leaf(key)
+
+        if leaf is None:
+            return None, 0
+
+        i = bisect_left(leaf._keys, key) if before_equals else bisect_right(leaf._keys, key)
+
+        if i == 0:
+            leaf = self._node(leaf._prev_leaf)
+            return (leaf, len(leaf._keys) - 1) if leaf is not None else (None, 0)
+
+        return leaf, i - 1
+
+    def _pair_at(self, leaf, i):
+        if leaf is None:
+            return None, None
+        return leaf._keys[i], leaf._values[i]
+
+    def get_min(self):
+        """
+        Get the key and the value associated with the smallest key
+        :performance O(1)
+        :return: tuple (key, value)
+        """
+        if self._item_count == 0:
+            raise ValueError("Empty B+ tree")
+
+        return self._pair_at(self._node(self._first_leaf), 0)
+
+    def get_max(self):
+        """
+        Get the key and the value associated with the largest key
+        :performance O(1)
+        :return: tuple (key, value)
+        """
+        if self._item_count == 0:
+            raise ValueError("Empty B+ tree")
+
+        return self._pair_at(self._node(self._last_leaf), -1)
+
+    def find_gt(self, key):
+        return self._pair_at(*self._locate(key, after_equals=True))
+
+    def find_gte(self, key):
+        return self._pair_at(*self._locate(key, after_equals=False))
+
+    def find_st(self, key):
+        return self._pair_at(*self._locate_before(key, before_equals=True))
+
+    def find_ste(self, key):
+        return self._pair_at(*self._locate_before(key, before_equals=False))
+
+    def _gen_from(self, leaf, i, step):
+        """
+        Yield the (leaf, index) positions from a position to the end, every step keys
+        """
+        while leaf is not None:
+            yield leaf, i
+
+            i += step
+            while leaf is not None and i >= len(leaf._keys):
+                i -= len(leaf._keys)
+                leaf = self._node(leaf._next_leaf)
+
+    def slice(self, start, stop, step=1, inclusive=False):
+        """
+        Return a slice of the tree
+        :param start: the start key (None for min_key)
+        :param stop: the stop key (None for until the end of the tree)
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if the stop key is included or not
+        :return: an array of (key,value) tuples
+        """
+        if start is not None and stop is not None and start > stop:
+            raise ValueError("Cannot search for a slice with a start greater than a stop")
+
+        if start is None:
+            leaf, i = (self._node(self._first_leaf), 0) if self._item_count > 0 else (None, 0)
+        else:
+            leaf, i = self._locate(start, after_equals=False)
+
+        result = []
+
+        for leaf, i in self._gen_from(leaf, i, 1 if step is None else step):
+            key = leaf._keys[i]
+
+            if stop is not None and (stop < key or (not inclusive and key == stop)):
+                break
+
+            result.append((key, leaf._values[i]))
+
+        return result
+
+    def islice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the inverse of a slice: the mappings with a key smaller than start or greater than stop
+        :param start: the start key (None for min_key)
+        :param stop: the stop key (None for max_key)
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if start and stop are included or not
+        :return: an array of (key,value) tuples
+        """
+        result = self.slice(None, start, step, inclusive) if start is not None else []
+
+        if stop is not None:
+            leaf, i = self._locate(stop, after_equals=not inclusive)
+            result.extend(self._pair_at(leaf, i) for leaf, i in self._gen_from(leaf, i, 1 if step is None else step))
+
+        return result
+
+    def _bisect(self, key, right):
+        node = self._node(self._root)
+        smaller_count = 0
+
+        if node is None:
+            return 0
+
+        while isinstance(node, self._internal_class):
+            i = bisect_right(node._keys, key)
+            smaller_count += sum(node._counts[:i])
+            node = self._node(node._children[i])
+
+        return smaller_count + (bisect_right(node._keys, key) if right else bisect_left(node._keys, key))
+
+    def bisect_left(self, key):
+        """
+        :performance: O(order * log(n))
+        :return: the number of keys smaller than the key
+        """
+        return self._bisect(key, False)
+
+    def bisect_right(self, key):
+        """
+        :performance: O(order * log(n))
+        :return: the number of keys smaller or equal to the key
+        """
+        return self._bisect(key, True)
+
+    def index_of(self, key):
+        """
+        Return the index of the key, as if the keys were a sorted list
+        :param key: the key to search for
+        :return: the index, or None if the key is not in the tree
+        """
+        if key not in self:
+            return None
+        return self.bisect_left(key)
+
+    def at_index(self, index):
+        """
+        Return the mapping at the specified index of the sorted sequence of keys
+        :performance: O(order * log(n))
+        :param index: the index
+        :return: (tuple)(key, value)
+        """
+        if not -len(self) <= index < len(self):
+            raise ValueError("Illegal index")
+
+        if index < 0:
+            index += len(self)
+
+        node = self._node(self._root)
+
+        while isinstance(node, self._internal_class):
+            for i, count in enumerate(node._counts):
+                if index < count:
+                    break
+                index -= count
+            node = self._node(node._children[i])
+
+        return node._keys[index], node._values[index]
+
+    def count_in_range(self, start, stop, step=1, inclusive=False):
+        """
+        Return the number of elements contained in the specified interval.
+        :param step: the step between two distinct elements
+        :param start: the start of the range (inclusive), None for min_key
+        :param stop:  the stop of the range (inclusive if specified else exclusive), None for max_key
+        :param inclusive: if we include the stop or not
+        :return: the count
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+        return self._step_count(first, last, step)
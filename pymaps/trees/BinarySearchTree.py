@@ -1,12 +1,56 @@
-from pymaps.SortedContainer import SortedContainer
-from queue import Queue
+import pickle
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+from pymaps.SortedContainer import SortedContainer, dedup_sorted_pairs
+from pymaps.trees.FrozenSortedMap import FrozenSortedMap
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, it is only used by the array exports
+    numpy = None
 
 LEFT_CHILD = True
 RIGHT_CHILD = False
 
+DUMP_MAGIC = b"PYMAPS\x01"
+DUMP_CHUNK_SIZE = 4096
+
+MISSING = object()
+
+
+def _fill_array(items, count, dtype):
+    """
+    Fill an array with the items, in a single pass
+    :param items: an iterable of count items
+    :param count: the number of items
+    :param dtype: the numpy dtype of the array (object by default). Without numpy, the typecode of an
+    array.array, or None for a list
+    :return: the array
+    """
+    if numpy is not None:
+        dtype = numpy.dtype(object if dtype is None else dtype)
+
+        if not dtype.hasobject:
+            return numpy.fromiter(items, dtype=dtype, count=count)
+
+        # numpy.fromiter only builds object arrays from numpy 1.23, which needs Python 3.8
+        result = numpy.empty(count, dtype=dtype)
+        for i, item in enumerate(items):
+            result[i] = item
+
+        return result
+
+    if dtype is None:
+        return list(items)
+
+    return array(dtype, items)
+
 
 class TreeNode:
-    __slots__ = ["_key", "_value", "_parent_node", "_left_child", "_right_child", "_subtree_size"]
+    __slots__ = ["_key", "_value", "_parent_node", "_left_child", "_right_child", "_subtree_size", "_prev_node",
+                 "_next_node"]
 
     def __init__(self, key, value, parent_node):
         self._key = key
@@ -15,6 +59,8 @@ class TreeNode:
         self._left_child = None
         self._right_child = None
         self._subtree_size = 1
+        self._prev_node = None
+        self._next_node = None
 
     def increment_subtree_size(self):
         self._subtree_size += 1
@@ -66,6 +112,22 @@ class TreeNode:
         self._parent_node = new_parent
         return old_parent
 
+    def get_prev(self):
+        return self._prev_node
+
+    def set_prev(self, new_prev):
+        old_prev = self._prev_node
+        self._prev_node = new_prev
+        return old_prev
+
+    def get_next(self):
+        return self._next_node
+
+    def set_next(self, new_next):
+        old_next = self._next_node
+        self._next_node = new_next
+        return old_next
+
     def is_leaf(self):
         return not self.has_child(LEFT_CHILD) and not self.has_child(RIGHT_CHILD)
 
@@ -80,16 +142,23 @@ class BinarySearchTree(SortedContainer):
         "_root",
         "_min_node",
         "_max_node",
-        "_enable_index"
+        "_enable_index",
+        "_enable_threading"
     ]
 
-    def __init__(self, enable_index=True):
+    def __init__(self, enable_index=True, enable_threading=False):
+        """
+        :param enable_index: maintain the subtree sizes, needed by the index methods (at_index, index_of, ...)
+        :param enable_threading: maintain links between in-order neighbours, so stepping to the successor or
+        the predecessor of a node is O(1) instead of O(h). Range scans then cost O(h + k)
+        """
         super().__init__()
         self._node_count = 0
         self._root = None
         self._min_node = None
         self._max_node = None
         self._enable_index = enable_index
+        self._enable_threading = enable_threading
 
     def clear(self):
         """
@@ -101,10 +170,450 @@ class BinarySearchTree(SortedContainer):
         self._min_node = None
         self._max_node = None
 
+    @classmethod
+    def from_sorted(cls, items, **kwargs):
+        """
+        Build a perfectly balanced tree from (key, value) pairs already sorted by key.
+        Nodes are created directly in place, without searching or rebalancing.
+        :performance: O(n)
+        :param items: an iterable of (key, value) tuples, sorted by key. When a key is repeated, the last value wins
+        :param kwargs: the arguments of the constructor (enable_index, ...)
+        :return: the new tree
+        """
+        tree = cls(**kwargs)
+        tree._bulk_load(list(dedup_sorted_pairs(items)))
+        return tree
+
+    @classmethod
+    def bulk_load(cls, items, **kwargs):
+        """
+        Build a perfectly balanced tree from (key, value) pairs (or a mapping) in any order.
+        The pairs are sorted first, then loaded with from_sorted.
+        :performance: O(n log(n)), O(n) if the input is already sorted
+        :param items: a mapping or an iterable of (key, value) tuples. When a key is repeated, the last value wins
+        :param kwargs: the arguments of the constructor (enable_index, ...)
+        :return: the new tree
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        pairs = sorted(items, key=lambda pair: pair[0])  # stable, so the last duplicate stays last
+        return cls.from_sorted(pairs, **kwargs)
+
+    @classmethod
+    def from_arrays(cls, keys, values, **kwargs):
+        """
+        Build a tree from an array of keys and an array of values, in any order
+        :performance: O(n log(n)), O(n) if the keys are already sorted
+        :param keys: a numpy array, an array.array or a list of keys
+        :param values: the values, in the order of the keys
+        :param kwargs: the arguments of the constructor (enable_index, ...)
+        :return: the new tree
+        """
+        if len(keys) != len(values):
+            raise ValueError("There must be as many keys as values")
+
+        # numpy scalars are converted back to python objects
+        keys = keys.tolist() if hasattr(keys, "tolist") else keys
+        values = values.tolist() if hasattr(values, "tolist") else values
+
+        return cls.bulk_load(zip(keys, values), **kwargs)
+
+    @staticmethod
+    def _merge_sorted_pairs(left, right, merge_values):
+        """
+        Merge two lists of (key, value) tuples with strictly increasing keys
+        :performance: O(n + m)
+        :param left: the first list
+        :param right: the second list
+        :param merge_values: function (left_value, right_value) -> value, called for keys present in both lists
+        :return: the merged list, with strictly increasing keys
+        """
+        merged = []
+        i, j = 0, 0
+
+        while i < len(left) and j < len(right):
+            left_key, right_key = left[i][0], right[j][0]
+
+            if left_key < right_key:
+                merged.append(left[i])
+                i += 1
+            elif right_key < left_key:
+                merged.append(right[j])
+                j += 1
+            else:
+                merged.append((left_key, merge_values(left[i][1], right[j][1])))
+                i += 1
+                j += 1
+
+        merged.extend(left[i:])
+        merged.extend(right[j:])
+
+        return merged
+
+    def _prefer_rebuild(self, batch_size):
+        """
+        Estimate if merging a batch into the tree is cheaper by rebuilding it than by inserting each key.
+        Inserting costs about log(n) steps per key, while rebuilding costs one step per key of the result.
+        :param batch_size: the number of distinct keys in the batch
+        :return: True if a rebuild is cheaper
+        """
+        total = self._node_count + batch_size
+        return batch_size * total.bit_length() > total
+
+    @staticmethod
+    def _prefer_search(small, large):
+        """
+        Estimate if searching the keys of a small tree in a large one, about small * log(large / small + 1) steps,
+        is cheaper than merging both trees, one step per key
+        :return: True if searching is cheaper
+        """
+        return small * (large // max(small, 1) + 1).bit_length() < small + large
+
+    def _pairs(self):
+        """
+        :return: the list of (key, value) tuples of the nodes, in order
+        """
+        return [(node.get_key(), node.get_value()) for node in self._inorder_traversal(self._root)]
+
+    def keys_array(self, dtype=None):
+        """
+        Export the keys in order
+        :performance: O(n)
+        :param dtype: the numpy dtype of the array (object by default). Without numpy, the typecode of an
+        array.array, or None for a list
+        :return: the array of keys
+        """
+        return _fill_array((node.get_key() for node in self._inorder_traversal(self._root)), self._node_count, dtype)
+
+    def values_array(self, dtype=None):
+        """
+        Export the values, in the order of the keys
+        :performance: O(n)
+        :param dtype: see keys_array
+        :return: the array of values
+        """
+        return _fill_array((node.get_value() for node in self._inorder_traversal(self._root)), self._node_count,
+                           dtype)
+
+    def items_arrays(self, start=None, stop=None, inclusive=False, key_dtype=None, value_dtype=None):
+        """
+        Export the keys and the values of a range of keys, with a single traversal of the range
+        :performance: O(h + k) for k exported mappings
+        :param start: the start key (inclusive), None for the min
+        :param stop: the stop key (inclusive if specified else exclusive), None for the max
+        :param inclusive: if the stop key is included or not
+        :param key_dtype: the dtype of the keys, see keys_array
+        :param value_dtype: the dtype of the values, see keys_array
+        :return: (keys, values) the two arrays
+        """
+        nodes = list(self._gen_slice(slice(start, stop), inclusive=inclusive))
+
+        return (_fill_array((node.get_key() for node in nodes), len(nodes), key_dtype),
+                _fill_array((node.get_value() for node in nodes), len(nodes), value_dtype))
+
+    def freeze(self):
+        """
+        Return an immutable, read-optimized copy of the tree, where the keys and values are stored in sorted arrays
+        :performance: O(n)
+        :return: a FrozenSortedMap
+        """
+        keys, values = [], []
+
+        for node in self._inorder_traversal(self._root):
+            keys.append(node.get_key())
+            values.append(node.get_value())
+
+        return FrozenSortedMap(keys, values)
+
+    def _options(self):
+        """
+        :return: the arguments of the constructor that made this tree
+        """
+        return dict(enable_index=self._enable_index, enable_threading=self._enable_threading)
+
+    def _new_empty(self):
+        """
+        :return: a new empty tree of the same type and with the same options
+        """
+        return type(self)(**self._options())
+
+    def dump(self, fileobj):
+        """
+        Write the tree to a binary file: a header with the options of the tree, then the in-order
+        (key, value) sequence in pickled chunks of parallel key and value lists. The nodes themselves
+        are not written, so the size of the dump does not depend on the shape of the tree.
+        :performance: O(n)
+        :param fileobj: a file opened in binary write mode
+        :return: void
+        """
+        fileobj.write(DUMP_MAGIC)
+        pickle.dump(self._options(), fileobj, pickle.HIGHEST_PROTOCOL)
+
+        keys, values = [], []
+
+        for node in self._inorder_traversal(self._root):
+            keys.append(node.get_key())
+            values.append(node.get_value())
+
+            if len(keys) == DUMP_CHUNK_SIZE:
+                pickle.dump((keys, values), fileobj, pickle.HIGHEST_PROTOCOL)
+                keys, values = [], []
+
+        if keys:
+            pickle.dump((keys, values), fileobj, pickle.HIGHEST_PROTOCOL)
+
+        pickle.dump(None, fileobj, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, fileobj):
+        """
+        Read a tree written by dump, and rebuild it with the balanced bulk construction
+        :performance: O(n)
+        :param fileobj: a file opened in binary read mode, only read from trusted sources (it is unpickled)
+        :return: the new tree
+        """
+        if fileobj.read(len(DUMP_MAGIC)) != DUMP_MAGIC:
+            raise ValueError("The file is not a tree dump")
+
+        options = pickle.load(fileobj)
+        keys, values = [], []
+
+        chunk = pickle.load(fileobj)
+        while chunk is not None:
+            keys.extend(chunk[0])
+            values.extend(chunk[1])
+            chunk = pickle.load(fileobj)
+
+        return cls._from_columns(options, keys, values)
+
+    @classmethod
+    def _from_columns(cls, options, keys, values):
+        """
+        :param options: the arguments of the constructor
+        :param keys: the keys, strictly increasing
+        :param values: the values, in the order of the keys
+        :return: the new tree
+        """
+        tree = cls(**options)
+        tree._bulk_load(list(zip(keys, values)))
+        return tree
+
+    def __reduce__(self):
+        # the default pickling follows the links between the nodes recursively
+        keys, values = [], []
+
+        for node in self._inorder_traversal(self._root):
+            keys.append(node.get_key())
+            values.append(node.get_value())
+
+        return self._from_columns, (self._options(), keys, values)
+
+    def union(self, other, merge_values=None, consume=False):
+        """
+        Return a new tree with the mappings of both trees.
+        The pairs of both trees are merged and the result is built in linear time. The new tree holds every mapping,
+        so copying the larger tree and inserting the keys of the smaller one would not be cheaper, even for m << n.
+        :performance: O(n + m)
+        :param other: the other tree
+        :param merge_values: function (value, other_value) -> value for the keys in both trees.
+        By default the value of the other tree wins, like dict.update
+        :param consume: empty both trees once the result is built, otherwise they are left untouched
+        :return: the new tree
+        """
+        if merge_values is None:
+            merge_values = lambda value, other_value: other_value
+
+        tree = self._new_empty()
+        tree._bulk_load(self._merge_sorted_pairs(self._pairs(), other._pairs(), merge_values))
+        return self._end_set_operation(other, tree, consume)
+
+    def intersection(self, other, merge_values=None, consume=False):
+        """
+        Return a new tree with the keys present in both trees.
+        When one tree is much smaller, its keys are searched in the other one with get_many instead.
+        :performance: O(min(n + m, m log(n / m + 1))) for sizes n >= m in balanced trees, O(n + m) otherwise
+        :param other: the other tree
+        :param merge_values: function (value, other_value) -> value. By default the value of this tree is kept
+        :param consume: empty both trees once the result is built, otherwise they are left untouched
+        :return: the new tree
+        """
+        if merge_values is None:
+            merge_values = lambda value, other_value: value
+
+        tree = self._new_empty()
+
+        if isinstance(other, BinarySearchTree) and self._prefer_search(*sorted((len(self), len(other)))):
+            if len(self) <= len(other):
+                pairs = self._pairs()
+                found = other.get_many([key for key, _ in pairs], MISSING)
+                tree._bulk_load([(key, merge_values(value, other_value))
+                                 for (key, value), other_value in zip(pairs, found) if other_value is not MISSING])
+            else:
+                other_pairs = other._pairs()
+                found = self.get_many([key for key, _ in other_pairs], MISSING)
+                tree._bulk_load([(key, merge_values(value, other_value))
+                                 for (key, other_value), value in zip(other_pairs, found) if value is not MISSING])
+            return self._end_set_operation(other, tree, consume)
+
+        pairs, other_pairs = self._pairs(), other._pairs()
+        common = []
+        i, j = 0, 0
+
+        while i < len(pairs) and j < len(other_pairs):
+            key, other_key = pairs[i][0], other_pairs[j][0]
+
+            if key < other_key:
+                i += 1
+            elif other_key < key:
+                j += 1
+            else:
+                common.append((key, merge_values(pairs[i][1], other_pairs[j][1])))
+                i += 1
+                j += 1
+
+        tree._bulk_load(common)
+        return self._end_set_operation(other, tree, consume)
+
+    def difference(self, other, consume=False):
+        """
+        Return a new tree with the mappings of this tree whose key is not in the other tree.
+        When this tree is much smaller, its keys are searched in the other one with get_many instead.
+        :performance: O(m log(n / m + 1)) when this tree has m keys and the other n >= m in a balanced tree,
+        O(n + m) otherwise
+        :param other: the other tree
+        :param consume: empty both trees once the result is built, otherwise they are left untouched
+        :return: the new tree
+        """
+        if isinstance(other, BinarySearchTree) and len(self) <= len(other) and \
+                self._prefer_search(len(self), len(other)):
+            pairs = self._pairs()
+            found = other.get_many([key for key, _ in pairs], MISSING)
+
+            tree = self._new_empty()
+            tree._bulk_load([pair for pair, other_value in zip(pairs, found) if other_value is MISSING])
+            return self._end_set_operation(other, tree, consume)
+
+        other_pairs = other._pairs()
+        remaining = []
+        j = 0
+
+        for key, value in self._pairs():
+            while j < len(other_pairs) and other_pairs[j][0] < key:
+                j += 1
+
+            if j == len(other_pairs) or key < other_pairs[j][0]:
+                remaining.append((key, value))
+
+        tree = self._new_empty()
+        tree._bulk_load(remaining)
+        return self._end_set_operation(other, tree, consume)
+
+    def _end_set_operation(self, other, tree, consume):
+        """
+        :return: the result of a set operation, after emptying both trees if consume
+        """
+        if consume:
+            self.clear()
+            other.clear()
+
+        return tree
+
+    def update(self, items):
+        """
+        Insert a batch of mappings, like dict.update. The batch is sorted, then either inserted key by key
+        (small batch) or merged with the content of the tree and rebuilt in linear time (large batch).
+        :performance: O(m log(m) + min(m log(n + m), n + m)) for a batch of size m
+        :param items: a mapping or an iterable of (key, value) tuples. When a key is repeated, the last value wins
+        :return: void
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        batch = list(dedup_sorted_pairs(sorted(items, key=lambda pair: pair[0])))
+
+        if self._prefer_rebuild(len(batch)):
+            self._bulk_load(self._merge_sorted_pairs(self._pairs(), batch, lambda old, new: new))
+        else:
+            for key, value in batch:
+                self._insert(key, value)
+
+    def _bulk_load(self, pairs):
+        """
+        Replace the content of the tree with a perfectly balanced tree made of the pairs.
+        :performance: O(n)
+        :param pairs: a list of (key, value) tuples with strictly increasing keys
+        :return: void
+        """
+        self.clear()
+
+        self._root = self._build_balanced(pairs, 0, len(pairs), None)
+        self._node_count = len(pairs)
+
+        if self._root is not None:
+            walk = self._root
+            while walk.has_child(LEFT_CHILD):
+                walk = walk.get_child(LEFT_CHILD)
+            self._min_node = walk
+
+            walk = self._root
+            while walk.has_child(RIGHT_CHILD):
+                walk = walk.get_child(RIGHT_CHILD)
+            self._max_node = walk
+
+        if self._enable_threading:
+            previous = None
+            for node in self._inorder_traversal(self._root):
+                self._link(previous, node)
+                previous = node
+
+    def _build_balanced(self, pairs, low, high, parent):
+        """
+        Build a balanced subtree with the pairs in [low, high[ and return its root.
+        The recursion depth is log(n), since each level halves the range.
+        :param pairs: a list of (key, value) tuples with strictly increasing keys
+        :param low: the first index (inclusive)
+        :param high: the last index (exclusive)
+        :param parent: the parent of the subtree root, None for the root
+        :return: the root of the subtree, None if the range is empty
+        """
+        if low >= high:
+            return None
+
+        middle = (low + high) // 2
+        key, value = pairs[middle]
+
+        node = self._make_node(key, value, parent)
+        left = self._build_balanced(pairs, low, middle, node)
+        right = self._build_balanced(pairs, middle + 1, high, node)
+
+        node.set_child(left, LEFT_CHILD)
+        node.set_child(right, RIGHT_CHILD)
+
+        size = 1
+        if left is not None:
+            size += left.get_subtree_size()
+        if right is not None:
+            size += right.get_subtree_size()
+        node.set_subtree_size(size)
+
+        self._built_hook(node)
+
+        return node
+
     def _inserted_hook(self, inserted_node):
         pass
 
+    def _built_hook(self, built_node):
+        pass
+
     def _accessed_hook(self, accessed_node):
+        """
+        Called after a lookup or an update reached a node: the node with the key, or the
+        last node visited when the key is not in the tree
+        :param accessed_node: the node
+        :return: void
+        """
         pass
 
     def _deleted_hook(self, parent_node):
@@ -200,28 +709,44 @@ class BinarySearchTree(SortedContainer):
             return self._get(query)
 
     def _gen_slice(self, query, inclusive=False):
-        start_node = self._search(query.start) if query.start is not None else self._min_node
-        stop_node = self._search(query.stop) if query.stop is not None else None
-        step = query.step
+        start, stop, step = query.start, query.stop, query.step
 
-        if start_node is not None and stop_node is not None:
-            if start_node.get_key() > stop_node.get_key():
-                raise ValueError("Cannot search for a slice with a start greater than a stop")
+        if start is not None and stop is not None and start > stop:
+            raise ValueError("Cannot search for a slice with a start greater than a stop")
 
-        walk = start_node
+        walk = self._ceiling_node(start) if start is not None else self._min_node
 
         while walk is not None:
+            key = walk.get_key()
 
-            if not inclusive and walk == stop_node:
+            if stop is not None and (stop < key or (not inclusive and key == stop)):
                 break
 
             yield walk
 
-            if walk == stop_node:
-                break
-
             for i in range(1 if step is None else step):  # skip "step" many items
                 walk = self._inorder_successor(walk)
+                if walk is None:
+                    break
+
+    def _ceiling_node(self, key):
+        """
+        Find the node with the smallest key greater or equal to the key
+        :performance: O(h)
+        :param key: the key
+        :return: the node, None if every key is smaller
+        """
+        walk = self._root
+        ceiling = None
+
+        while walk is not None:
+            if walk.get_key() < key:
+                walk = walk.get_child(RIGHT_CHILD)
+            else:
+                ceiling = walk
+                walk = walk.get_child(LEFT_CHILD)
+
+        return ceiling
 
     def _gen_islice(self, query, inclusive=False):
         start_node = self._search(query.start) if query.start is not None else self._min_node
@@ -275,9 +800,49 @@ class BinarySearchTree(SortedContainer):
     def islice(self, start, stop, step=1, inclusive=False):
         return self._get_islice(slice(start, stop, step), inclusive=inclusive)
 
+    def slice_by_index(self, start=None, stop=None, step=1):
+        """
+        Return a slice of the tree by position, like slicing the sorted list of (key, value) tuples.
+        It seeks the first index once, then streams forward (or backward for a negative step).
+        Steps larger than the height of the tree jump with the subtree sizes instead of visiting
+        the skipped nodes.
+        :performance: O(h + k * min(step, h)) for k results
+        :param start: the start index (inclusive), None for the first; negative values count from the end
+        :param stop: the stop index (exclusive), None for the end; negative values count from the end
+        :param step: the index increment between two results
+        :return: an array of (key,value) tuples
+        """
+        return [(node.get_key(), node.get_value()) for node in self._gen_index_slice(slice(start, stop, step))]
+
+    def _gen_index_slice(self, query):
+        indices = range(*query.indices(len(self)))
+
+        if len(indices) == 0:
+            return
+
+        step = indices.step
+        jump = abs(step) > len(self).bit_length()
+
+        walk = self._at_index(indices[0])
+        yield walk
+
+        for index in indices[1:]:
+            if jump:
+                walk = self._at_index(index)
+            elif step > 0:
+                for i in range(step):
+                    walk = self._inorder_successor(walk)
+            else:
+                for i in range(-step):
+                    walk = self._inorder_predecessor(walk)
+            yield walk
+
     def _get(self, key):
         node = self._search(key)
 
+        if node is not None:
+            self._accessed_hook(node)
+
         if node is not None and node.get_key() == key:
             return node.get_value()
         else:
@@ -285,8 +850,78 @@ class BinarySearchTree(SortedContainer):
 
     def __contains__(self, key):
         node = self._search(key)
+
+        if node is not None:
+            self._accessed_hook(node)
+
         return node is not None and node.get_key() == key
 
+    def get_many(self, keys, default=None):
+        """
+        Return the values of a batch of keys, in the order of the batch
+        :performance: O(m log(m) + m log(n / m + 1)) for a batch of size m in a balanced tree
+        :param keys: a list or an array of keys, in any order
+        :param default: the value of the keys that are not in the tree
+        :return: a list of values
+        """
+        values = [default] * len(keys)
+
+        for node, positions in self._search_many(keys):
+            for position in positions:
+                values[position] = node.get_value()
+
+        return values
+
+    def contains_many(self, keys):
+        """
+        Check a batch of keys, in the order of the batch
+        :performance: O(m log(m) + m log(n / m + 1)) for a batch of size m in a balanced tree
+        :param keys: a list or an array of keys, in any order
+        :return: a list of booleans
+        """
+        found = [False] * len(keys)
+
+        for _, positions in self._search_many(keys):
+            for position in positions:
+                found[position] = True
+
+        return found
+
+    def _search_many(self, keys):
+        """
+        Search a batch of keys in one walk. The sorted batch is split around the key of each visited node,
+        so the path shared by neighbouring keys is only walked once, and a subtree is left as soon as
+        no key of the batch can be in it.
+        :param keys: a list or an array of keys
+        :return: a list of (node, positions) tuples for the keys in the tree, positions being their indices in the batch
+        """
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        queries = [keys[position] for position in order]
+
+        found = []
+        stack = [(self._root, 0, len(queries))] if self._root is not None and queries else []
+
+        while stack:
+            node, low, high = stack.pop()
+            key = node.get_key()
+
+            equal_low = bisect_left(queries, key, low, high)
+            equal_high = bisect_right(queries, key, equal_low, high)
+
+            if equal_low < equal_high:
+                found.append((node, order[equal_low:equal_high]))
+
+            if low < equal_low and node.has_child(LEFT_CHILD):
+                stack.append((node.get_child(LEFT_CHILD), low, equal_low))
+            if equal_high < high and node.has_child(RIGHT_CHILD):
+                stack.append((node.get_child(RIGHT_CHILD), equal_high, high))
+
+        # hooks may restructure the tree, so they only run once the walk is over
+        for node, _ in found:
+            self._accessed_hook(node)
+
+        return found
+
     def __setitem__(self, query, value):
         if isinstance(query, slice):
             self.set_slice(query, value)
@@ -317,6 +952,14 @@ class BinarySearchTree(SortedContainer):
             insertion_spot.set_child(child, insertion_spot.get_key() > key)
             node = child
 
+            if self._enable_threading:
+                if insertion_spot.get_key() > key:
+                    self._link(insertion_spot.get_prev(), child)
+                    self._link(child, insertion_spot)
+                else:
+                    self._link(child, insertion_spot.get_next())
+                    self._link(insertion_spot, child)
+
         if node is not None:
             self._node_count += 1
 
@@ -368,7 +1011,37 @@ class BinarySearchTree(SortedContainer):
             parent = parent.get_parent()
 
     def __delitem__(self, key):
-        self._remove(key)
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("Cannot delete a slice of keys with a step")
+            self.delete_range(key.start, key.stop)
+        else:
+            self._remove(key)
+
+    def delete_range(self, start, stop, inclusive=False):
+        """
+        Delete every mapping whose key is in the range, same as del self[start:stop].
+        A small range is removed key by key, a large one by rebuilding the tree with the remaining keys.
+        AVLTree cuts the range out as a whole subtree instead, the other trees keep this implementation.
+        :performance: O(k + min(k h, n)) for k deleted keys
+        :param start: the start key (inclusive), None for the min
+        :param stop: the stop key (inclusive if specified else exclusive), None for the max
+        :param inclusive: if the stop key is deleted or not
+        :return: the number of deleted mappings
+        """
+        keys = [node.get_key() for node in self._gen_slice(slice(start, stop), inclusive=inclusive)]
+
+        if not keys:
+            return 0
+
+        if self._prefer_rebuild(len(keys)):
+            first, last = keys[0], keys[-1]
+            self._bulk_load([(key, value) for key, value in self._pairs() if key < first or last < key])
+        else:
+            for key in keys:
+                self._remove(key)
+
+        return len(keys)
 
     def _remove(self, key):
         node = self._search(key)
@@ -409,11 +1082,18 @@ class BinarySearchTree(SortedContainer):
         if self._enable_index:
             self._decrement_subtree_size(node)
 
+        # a lone child can have children of its own, the new extreme is the deepest one on that side
         if node is self._min_node:
-            self._min_node = child if child is not None else ancestor
+            self._min_node = ancestor
+            walk = child
+            while walk is not None:
+                self._min_node, walk = walk, walk.get_child(LEFT_CHILD)
 
         if node is self._max_node:
-            self._max_node = child if child is not None else ancestor
+            self._max_node = ancestor
+            walk = child
+            while walk is not None:
+                self._max_node, walk = walk, walk.get_child(RIGHT_CHILD)
 
         if ancestor is None:
             self._root = child
@@ -424,9 +1104,17 @@ class BinarySearchTree(SortedContainer):
         else:
             ancestor.set_child(None, side)
 
+        if self._enable_threading:
+            self._link(node.get_prev(), node.get_next())
+            node.set_prev(None)
+            node.set_next(None)
+
         node.set_parent(None)
         self._node_count -= 1
 
+        if ancestor is not None:
+            self._deleted_hook(ancestor)
+
     def __iter__(self):
         """
         Yield all (key,value) pairs of the tree.
@@ -436,31 +1124,67 @@ class BinarySearchTree(SortedContainer):
             yield node.get_key(), node.get_value()
 
     def _inorder_traversal(self, node):
+        """
+        Yield the nodes of the subtree in order (left, node, right).
+        The traversal uses an explicit stack, so each node is yielded in O(1) whatever its depth.
+        :param node: the root of the subtree
+        :return: generator of nodes
+        """
+        stack = []
+        walk = node
 
-        if node is None:
-            return
+        while stack or walk is not None:
+            while walk is not None:
+                stack.append(walk)
+                walk = walk.get_child(LEFT_CHILD)
 
-        yield from self._inorder_traversal(node.get_child(LEFT_CHILD))
-        yield node
-        yield from self._inorder_traversal(node.get_child(RIGHT_CHILD))
+            walk = stack.pop()
+            yield walk
+            walk = walk.get_child(RIGHT_CHILD)
 
     def _preorder_traversal(self, node):
-
+        """
+        Yield the nodes of the subtree in pre-order (node, left, right), using an explicit stack
+        :param node: the root of the subtree
+        :return: generator of nodes
+        """
         if node is None:
             return
 
-        yield node
-        yield from self._preorder_traversal(node.get_child(LEFT_CHILD))
-        yield from self._preorder_traversal(node.get_child(RIGHT_CHILD))
+        stack = [node]
+
+        while stack:
+            walk = stack.pop()
+            yield walk
+
+            if walk.has_child(RIGHT_CHILD):
+                stack.append(walk.get_child(RIGHT_CHILD))
+            if walk.has_child(LEFT_CHILD):
+                stack.append(walk.get_child(LEFT_CHILD))
 
     def _postorder_traversal(self, node):
+        """
+        Yield the nodes of the subtree in post-order (left, right, node), using an explicit stack
+        :param node: the root of the subtree
+        :return: generator of nodes
+        """
+        stack = []
+        last = None
+        walk = node
 
-        if node is None:
-            return
+        while stack or walk is not None:
+            if walk is not None:
+                stack.append(walk)
+                walk = walk.get_child(LEFT_CHILD)
+            else:
+                top = stack[-1]
+                right = top.get_child(RIGHT_CHILD)
 
-        yield from self._postorder_traversal(node.get_child(LEFT_CHILD))
-        yield from self._postorder_traversal(node.get_child(RIGHT_CHILD))
-        yield node
+                if right is not None and right is not last:
+                    walk = right
+                else:
+                    last = stack.pop()
+                    yield last
 
     # noinspection PyMethodMayBeStatic
     def _inorder_predecessor(self, node):
@@ -470,6 +1194,9 @@ class BinarySearchTree(SortedContainer):
         :param node: the node from where we start
         :return: the predecessor
         """
+        if self._enable_threading:
+            return node.get_prev()
+
         if node.has_child(child=True):
             walk = node.get_child()
             while walk.has_child(RIGHT_CHILD):
@@ -482,6 +1209,14 @@ class BinarySearchTree(SortedContainer):
             return walk
 
     def _inorder_successor(self, node):
+        """
+        Find the inorder successor of the node. That is, the node with the smallest key larger than
+        the node's itself
+        :param node: the node from where we start
+        :return: the successor
+        """
+        if self._enable_threading:
+            return node.get_next()
 
         if node.has_child(RIGHT_CHILD):
             walk = node.get_child(RIGHT_CHILD)
@@ -541,6 +1276,19 @@ class BinarySearchTree(SortedContainer):
         if new_child is not None:
             new_child.set_parent(parent)
 
+    def _link(self, prev_node, next_node):
+        """
+        Link two nodes that are neighbours in the inorder sequence. Rotations never change that sequence,
+        so links only change when nodes are inserted or deleted.
+        :param prev_node: the smaller node, can be None
+        :param next_node: the larger node, can be None
+        :return: void
+        """
+        if prev_node is not None:
+            prev_node.set_next(next_node)
+        if next_node is not None:
+            next_node.set_prev(prev_node)
+
     def index_of_or_raise(self, key):
         """
         See index_of.
@@ -647,19 +1395,66 @@ class BinarySearchTree(SortedContainer):
     def count_in_range(self, start, stop, step=1, inclusive=False):
         """
         Return the number of elements contained in the specified interval.
-
+        It is answered with two rank computations, without visiting the elements.
+        :performance: O(h)
         :param step: the step between two distinct elements
         :param start: the start of the range (inclusive), None for min_key
         :param stop:  the stop of the range (inclusive if specified else exclusive), None for max_key
         :param inclusive: if we include the stop or not
         :return: the count
         """
-        total = 0
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+        return self._step_count(first, last, step)
+
+    def rank(self, key):
+        """
+        Return the number of elements smaller than the key. The key does not need to be in the tree;
+        when it is, the rank is its index.
+        :performance: O(h)
+        :param key: the key
+        :return: the rank
+        """
+        return self.bisect_left(key)
+
+    def bisect_left(self, key):
+        """
+        Return the index where the key would be inserted, before any equal key (number of smaller elements)
+        :performance: O(h)
+        :param key: the key
+        :return: the index
+        """
+        return self._bisect(key, False)
+
+    def bisect_right(self, key):
+        """
+        Return the index where the key would be inserted, after any equal key (number of smaller or equal elements)
+        :performance: O(h)
+        :param key: the key
+        :return: the index
+        """
+        return self._bisect(key, True)
+
+    def _bisect(self, key, right):
+        if not self._enable_index:
+            raise RuntimeError("The binary search tree has been instantiated without support for index methods.")
+
+        walk = self._root
+        smaller_count = 0
 
-        for _, _ in self._get_slice(slice(start, stop, step), inclusive):
-            total += 1
+        while walk is not None:
+            walk_key = walk.get_key()
+
+            if walk_key < key or (right and walk_key == key):
+                # every element of the node and of its left subtree is before the key
+                right_child = walk.get_child(RIGHT_CHILD)
+                smaller_count += walk.get_subtree_size()
+                if right_child is not None:
+                    smaller_count -= right_child.get_subtree_size()
+                walk = right_child
+            else:
+                walk = walk.get_child(LEFT_CHILD)
 
-        return total
+        return smaller_count
 
     def find_gt(self, key):
         """
@@ -727,25 +1522,120 @@ class BinarySearchTree(SortedContainer):
 
         return walk.get_key(), walk.get_value()
 
+    def find_gt_many(self, keys):
+        """
+        Batched find_gt
+        :performance: O(m log(m) + m log(n / m + 1)) for a batch of size m in a balanced tree
+        :param keys: a list or an array of keys, in any order
+        :return: a list of (key, value) tuples in the order of the batch, (None, None) when there is no such key
+        """
+        return self._pairs_of(self._find_many(keys, greater=True, strict=True))
+
+    def find_gte_many(self, keys):
+        """
+        Batched find_gte
+        :performance: O(m log(m) + m log(n / m + 1)) for a batch of size m in a balanced tree
+        :param keys: a list or an array of keys, in any order
+        :return: a list of (key, value) tuples in the order of the batch, (None, None) when there is no such key
+        """
+        return self._pairs_of(self._find_many(keys, greater=True, strict=False))
+
+    def find_st_many(self, keys):
+        """
+        Batched find_st
+        :performance: O(m log(m) + m log(n / m + 1)) for a batch of size m in a balanced tree
+        :param keys: a list or an array of keys, in any order
+        :return: a list of (key, value) tuples in the order of the batch, (None, None) when there is no such key
+        """
+        return self._pairs_of(self._find_many(keys, greater=False, strict=True))
+
+    def find_ste_many(self, keys):
+        """
+        Batched find_ste
+        :performance: O(m log(m) + m log(n / m + 1)) for a batch of size m in a balanced tree
+        :param keys: a list or an array of keys, in any order
+        :return: a list of (key, value) tuples in the order of the batch, (None, None) when there is no such key
+        """
+        return self._pairs_of(self._find_many(keys, greater=False, strict=False))
+
+    @staticmethod
+    def _pairs_of(nodes):
+        return [(None, None) if node is None else (node.get_key(), node.get_value()) for node in nodes]
+
+    def _find_many(self, keys, greater, strict):
+        """
+        Find the neighbour of every key of a batch in one walk. The sorted batch is split around the key
+        of each visited node: the node is the best candidate so far for the keys sent to its left subtree
+        when searching greater keys, and for the keys sent to its right subtree when searching smaller keys.
+        Every key of the batch gets the last candidate of its path.
+        :param keys: a list or an array of keys
+        :param greater: search for greater keys (find_gt, find_gte) or smaller keys (find_st, find_ste)
+        :param strict: exclude the keys equal to the searched key
+        :return: a list of nodes (None when there is no neighbour), in the order of the batch
+        """
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        queries = [keys[position] for position in order]
+
+        nodes = [None] * len(keys)
+        stack = [(self._root, None, 0, len(queries))] if queries else []
+
+        # the keys going left are the ones smaller than the node, or smaller or equal to it
+        split = bisect_left if greater == strict else bisect_right
+
+        while stack:
+            node, candidate, low, high = stack.pop()
+
+            if node is None:
+                for position in order[low:high]:
+                    nodes[position] = candidate
+                continue
+
+            middle = split(queries, node.get_key(), low, high)
+
+            if low < middle:
+                stack.append((node.get_child(LEFT_CHILD), node if greater else candidate, low, middle))
+            if middle < high:
+                stack.append((node.get_child(RIGHT_CHILD), candidate if greater else node, middle, high))
+
+        return nodes
+
     def __setslice__(self, i, j, sequence):
         raise RuntimeError("No clue what this is for since __setitem works for slices...")
 
     def _gen_bfs(self):
-        q = Queue()
-        q.put(self._root)
+        """
+        Yield the nodes of the tree in level order
+        :return: generator of nodes
+        """
+        if self._root is None:
+            return
+
+        q = deque([self._root])
 
-        while q.qsize() > 0:
-            node = q.get()
+        while q:
+            node = q.popleft()
 
             yield node
 
             if node.has_child(LEFT_CHILD):
-                q.put(node.get_child(LEFT_CHILD))
+                q.append(node.get_child(LEFT_CHILD))
             if node.has_child(RIGHT_CHILD):
-                q.put(node.get_child(RIGHT_CHILD))
+                q.append(node.get_child(RIGHT_CHILD))
 
     def _height(self, node):
-        return 1 + max(self.height(), node.get_child(RIGHT_CHILD))
+        """
+        :param node: the root of the subtree, can be None
+        :return: the number of levels of the subtree, counted iteratively so deep trees are fine
+        """
+        height = 0
+        level = [node] if node is not None else []
+
+        while level:
+            height += 1
+            level = [child for walk in level for child in (walk.get_child(LEFT_CHILD), walk.get_child(RIGHT_CHILD))
+                     if child is not None]
+
+        return height
 
     def height(self):
         return self._height(self._root)
@@ -0,0 +1,269 @@
+import mmap
+import pickle
+import struct
+import threading
+from collections import OrderedDict
+
+from pymaps.SortedContainer import dedup_sorted_pairs
+from pymaps.trees.BaseBPlusTree import BaseBPlusTree
+
+FILE_MAGIC = b"PYMAPSBT"
+FILE_HEADER = struct.Struct("<8sIIQQQQ")  # magic, page size, order, count, root, first leaf, last leaf
+NODE_HEADER = struct.Struct("<BIQQ")  # kind, payload length, previous leaf, next leaf
+
+LEAF = 0
+INTERNAL = 1
+NO_NODE = 0  # the header page is at offset 0, so no node can be there
+
+
+class DiskLeaf:
+    """
+    Leaf node. prev_leaf and next_leaf are the offsets of the neighbouring leaves in the file, NO_NODE at the ends.
+    """
+    __slots__ = ["_keys", "_values", "_prev_leaf", "_next_leaf"]
+
+    def __init__(self, keys, values, prev_leaf, next_leaf):
+        self._keys = keys
+        self._values = values
+        self._prev_leaf = prev_leaf
+        self._next_leaf = next_leaf
+
+    def __repr__(self):
+        return "Leaf%s" % (self._keys,)
+
+
+class DiskInternal:
+    """
+    Internal node. The child i holds the keys k such that keys[i - 1] <= k < keys[i],
+    children[i] is its offset in the file and counts[i] the number of keys stored under it.
+    """
+    __slots__ = ["_keys", "_children", "_counts"]
+
+    def __init__(self, keys, children, counts):
+        self._keys = keys
+        self._children = children
+        self._counts = counts
+
+    def __repr__(self):
+        return "Internal%s" % (self._keys,)
+
+
+class DiskBPlusTree(BaseBPlusTree):
+    """
+    Read-only sorted map stored in a single file, as a B+ tree read through mmap.
+    The file starts with a header page, followed by the nodes, each one starting on a page boundary.
+    A node is a small header and its pickled content: the keys and values of a leaf, or the separator
+    keys, child offsets and child counts of an internal node. The leaves are linked both ways for range scans.
+    The reads are the ones of BaseBPlusTree, with the offsets as node references.
+
+    Only the nodes on the paths being read are decoded, and the most recent ones are kept in an LRU cache,
+    so the map can be much larger than the memory. The file is written once, with from_sorted or bulk_load.
+    The cache is locked, so several threads can read the same tree.
+
+    The file is unpickled: only open files from trusted sources.
+    """
+    __slots__ = ["_path", "_file", "_map", "_order", "_cache", "_cache_size", "_cache_lock"]
+
+    _internal_class = DiskInternal
+
+    def __init__(self, path, cache_size=1024):
+        """
+        :param path: the path of a file written by from_sorted or bulk_load
+        :param cache_size: the maximal number of decoded nodes kept in memory
+        """
+        super().__init__()
+
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+        # the cache is shared by the threads reading the tree, like the compaction of LSMSortedMap
+        self._cache_lock = threading.Lock()
+
+        self._path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, _, self._order, self._item_count, self._root, self._first_leaf, self._last_leaf = \
+            FILE_HEADER.unpack_from(self._map, 0)
+
+        if magic != FILE_MAGIC:
+            self.close()
+            raise ValueError("The file is not a B+ tree file")
+
+    @classmethod
+    def from_sorted(cls, path, items, order=128, page_size=4096, cache_size=1024):
+        """
+        Write a tree file from (key, value) pairs already sorted by key, then open it.
+        The leaves are written while the pairs are read, so the pairs do not need to fit in memory.
+        :performance: O(n)
+        :param path: the path of the file, overwritten if it exists
+        :param items: an iterable of (key, value) tuples, sorted by key. When a key is repeated, the last value wins
+        :param order: the maximal number of keys in a leaf and of children in an internal node (at least 4)
+        :param page_size: the alignment of the nodes in the file, at least the size of the file header (48 bytes).
+        A node larger than a page takes several pages
+        :param cache_size: see __init__
+        :return: the opened tree
+        """
+        if order < 4:
+            raise ValueError("The order of a B+ tree must be at least 4")
+
+        if page_size < FILE_HEADER.size:
+            raise ValueError("The page size must be at least %d bytes to hold the file header" % FILE_HEADER.size)
+
+        with open(path, "wb") as file:
+            file.write(bytes(page_size))
+
+            writer = _NodeWriter(file, page_size)
+            keys, values = [], []
+            level = []  # (lowest key, offset, count) of the nodes of the level being built
+
+            for key, value in dedup_sorted_pairs(items):
+                keys.append(key)
+                values.append(value)
+
+                if len(keys) == order:
+                    level.append((keys[0], writer.write_leaf(keys, values), len(keys)))
+                    keys, values = [], []
+
+            if keys:
+                level.append((keys[0], writer.write_leaf(keys, values), len(keys)))
+
+            first_offset = level[0][1] if level else NO_NODE
+            last_offset = level[-1][1] if level else NO_NODE
+
+            while len(level) > 1:
+                parents = []
+                node_count = -(-len(level) // order)
+
+                for i in range(node_count):
+                    children = level[len(level) * i // node_count:len(level) * (i + 1) // node_count]
+                    offset = writer.write_internal([lowest_key for lowest_key, _, _ in children[1:]],
+                                                   [child_offset for _, child_offset, _ in children],
+                                                   [count for _, _, count in children])
+                    parents.append((children[0][0], offset, sum(count for _, _, count in children)))
+
+                level = parents
+
+            root_offset = level[0][1] if level else NO_NODE
+            item_count = level[0][2] if level else 0
+
+            file.seek(0)
+            file.write(FILE_HEADER.pack(FILE_MAGIC, page_size, order, item_count, root_offset, first_offset,
+                                        last_offset))
+
+        return cls(path, cache_size=cache_size)
+
+    @classmethod
+    def bulk_load(cls, path, items, order=128, page_size=4096, cache_size=1024):
+        """
+        Write a tree file from (key, value) pairs (or a mapping) in any order, then open it
+        :performance: O(n log(n))
+        :param path: the path of the file, overwritten if it exists
+        :param items: a mapping or an iterable of (key, value) tuples. When a key is repeated, the last value wins
+        :return: the opened tree
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        return cls.from_sorted(path, sorted(items, key=lambda pair: pair[0]), order=order, page_size=page_size,
+                               cache_size=cache_size)
+
+    def get_path(self):
+        return self._path
+
+    def close(self):
+        """
+        Release the mapping and the file
+        :return: void
+        """
+        with self._cache_lock:
+            self._cache.clear()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _node(self, offset):
+        """
+        Decode the node at an offset, or take it from the cache
+        :param offset: the offset of the node in the file
+        :return: a DiskLeaf or a DiskInternal, None for NO_NODE
+        """
+        if offset == NO_NODE:
+            return None
+
+        with self._cache_lock:
+            node = self._cache.get(offset)
+            if node is not None:
+                self._cache.move_to_end(offset)
+                return node
+
+        kind, length, prev_offset, next_offset = NODE_HEADER.unpack_from(self._map, offset)
+        start = offset + NODE_HEADER.size
+        content = pickle.loads(self._map[start:start + length])
+
+        if kind == LEAF:
+            node = DiskLeaf(content[0], content[1], prev_offset, next_offset)
+        else:
+            node = DiskInternal(*content)
+
+        if self._cache_size > 0:
+            with self._cache_lock:
+                self._cache[offset] = node
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        return node
+
+    def clear(self):
+        raise TypeError("A disk B+ tree is read-only, write a new file instead")
+
+    def __setitem__(self, key, value):
+        raise TypeError("A disk B+ tree is read-only, write a new file instead")
+
+    def __delitem__(self, key):
+        raise TypeError("A disk B+ tree is read-only, write a new file instead")
+
+
+class _NodeWriter:
+    """
+    Append nodes to a tree file, each one on a page boundary, and link the leaves as they are written
+    """
+    __slots__ = ["_file", "_page_size", "_offset", "_last_leaf_offset"]
+
+    def __init__(self, file, page_size):
+        self._file = file
+        self._page_size = page_size
+        self._offset = file.tell()
+        self._last_leaf_offset = NO_NODE
+
+    def _write(self, kind, content, prev_offset):
+        payload = pickle.dumps(content, pickle.HIGHEST_PROTOCOL)
+        offset = self._offset
+
+        self._file.seek(offset)
+        self._file.write(NODE_HEADER.pack(kind, len(payload), prev_offset, NO_NODE))
+        self._file.write(payload)
+
+        size = NODE_HEADER.size + len(payload)
+        self._offset = offset + -(-size // self._page_size) * self._page_size
+
+        return offset
+
+    def write_leaf(self, keys, values):
+        offset = self._write(LEAF, (keys, values), self._last_leaf_offset)
+
+        if self._last_leaf_offset != NO_NODE:
+            # the next offset of the previous leaf is only known now
+            self._file.seek(self._last_leaf_offset + NODE_HEADER.size - 8)
+            self._file.write(struct.pack("<Q", offset))
+
+        self._last_leaf_offset = offset
+        return offset
+
+    def write_internal(self, keys, children, counts):
+        return self._write(INTERNAL, (keys, children, counts), NO_NODE)
@@ -0,0 +1,254 @@
+from bisect import bisect_left, bisect_right
+
+from pymaps.SortedContainer import SortedContainer, dedup_sorted_pairs
+
+
+class FrozenSortedMap(SortedContainer):
+    """
+    Immutable sorted map, usually obtained with BinarySearchTree.freeze().
+    The keys and the values are kept in two sorted tuples, and every search is a binary search
+    over the keys, done by the bisect module in C. There are no nodes to follow and the position
+    of a key is its index, so the index methods are O(1) or O(log(n)).
+
+    It offers the read half of the map interface of BinarySearchTree.
+    """
+    __slots__ = ["_keys", "_values"]
+
+    def __init__(self, keys=(), values=()):
+        """
+        :param keys: the keys, sorted and without duplicates
+        :param values: the values, in the order of the keys
+        """
+        super().__init__()
+
+        if len(keys) != len(values):
+            raise ValueError("There must be as many keys as values")
+
+        self._keys = tuple(keys)
+        self._values = tuple(values)
+
+        for i in range(1, len(self._keys)):
+            if not self._keys[i - 1] < self._keys[i]:
+                raise ValueError("The keys are not sorted or have duplicates")
+
+    @classmethod
+    def from_sorted(cls, items):
+        """
+        Build a frozen map from (key, value) pairs already sorted by key
+        :performance: O(n)
+        :param items: an iterable of (key, value) tuples, sorted by key. When a key is repeated, the last value wins
+        :return: the new map
+        """
+        pairs = list(dedup_sorted_pairs(items))
+        return cls([key for key, _ in pairs], [value for _, value in pairs])
+
+    @classmethod
+    def bulk_load(cls, items):
+        """
+        Build a frozen map from (key, value) pairs (or a mapping) in any order
+        :performance: O(n log(n))
+        :param items: an iterable of (key, value) tuples, or a mapping. When a key is repeated, the last value wins
+        :return: the new map
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        # a stable sort keeps the repeated keys in order, so the last value still wins
+        return cls.from_sorted(sorted(items, key=lambda item: item[0]))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return zip(self._keys, self._values)
+
+    def __getitem__(self, query):
+        if isinstance(query, slice):
+            return self.slice(query.start, query.stop, query.step)
+        else:
+            return self._get(query)
+
+    def __setitem__(self, key, value):
+        raise TypeError("A frozen map cannot be modified")
+
+    def __delitem__(self, key):
+        raise TypeError("A frozen map cannot be modified")
+
+    def clear(self):
+        raise TypeError("A frozen map cannot be modified")
+
+    def _find(self, key):
+        """
+        :return: the index of the key, or None if the key is not in the map
+        """
+        index = bisect_left(self._keys, key)
+
+        if index < len(self._keys) and self._keys[index] == key:
+            return index
+
+        return None
+
+    def _get(self, key):
+        index = self._find(key)
+        return self._values[index] if index is not None else None
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def get_many(self, keys, default=None):
+        """
+        Return the values of a batch of keys, in the order of the batch
+        :performance: O(m log(n))
+        :param keys: a list or an array of keys
+        :param default: the value of the keys that are not in the map
+        :return: a list of values
+        """
+        values = []
+
+        for key in keys:
+            index = self._find(key)
+            values.append(self._values[index] if index is not None else default)
+
+        return values
+
+    def contains_many(self, keys):
+        """
+        Check a batch of keys, in the order of the batch
+        :performance: O(m log(n))
+        :param keys: a list or an array of keys
+        :return: a list of booleans
+        """
+        return [self._find(key) is not None for key in keys]
+
+    def _pairs_between(self, first, last, step):
+        step = 1 if step is None else step
+        return list(zip(self._keys[first:last:step], self._values[first:last:step]))
+
+    def slice(self, start, stop, step=1, inclusive=False):
+        """
+        Return a slice of the map
+        :performance: O(log(n) + k) for k results
+        :param start: the start key (None for min_key)
+        :param stop: the stop key (None for until the end of the map)
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if the stop key is included or not
+        :return: an array of (key,value) tuples
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+        return self._pairs_between(first, last, step)
+
+    def islice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the inverse of a slice: the mappings with a key smaller than start or greater than stop
+        :param start: the start key, None for the min
+        :param stop: the stop key, None for the max
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if start and stop are included or not
+        :return: an array of (key,value) tuples
+        """
+        if start is None:
+            before = 0
+        else:
+            before = bisect_right(self._keys, start) if inclusive else bisect_left(self._keys, start)
+
+        if stop is None:
+            after = len(self._keys)
+        else:
+            after = bisect_left(self._keys, stop) if inclusive else bisect_right(self._keys, stop)
+
+        return self._pairs_between(0, before, step) + self._pairs_between(after, len(self._keys), step)
+
+    def slice_by_index(self, start=None, stop=None, step=1):
+        """
+        Return a slice of the map by position, same as slicing the sorted list of (key, value) tuples
+        :performance: O(k) for k results
+        :return: an array of (key,value) tuples
+        """
+        return list(zip(self._keys[start:stop:step], self._values[start:stop:step]))
+
+    def at_index(self, index):
+        """
+        :performance: O(1)
+        :param index: the index
+        :return: (tuple)(key, value)
+        """
+        if not -len(self._keys) <= index < len(self._keys):
+            raise ValueError("Illegal index")
+
+        return self._keys[index], self._values[index]
+
+    def index_of(self, key):
+        """
+        :performance: O(log(n))
+        :param key: the key to search for
+        :return: the index, or None if the key is not in the map
+        """
+        return self._find(key)
+
+    def rank(self, key):
+        """
+        :performance: O(log(n))
+        :return: the number of keys smaller than the key
+        """
+        return bisect_left(self._keys, key)
+
+    def bisect_left(self, key):
+        return bisect_left(self._keys, key)
+
+    def bisect_right(self, key):
+        return bisect_right(self._keys, key)
+
+    def count_in_range(self, start, stop, step=1, inclusive=False):
+        """
+        Return the number of keys contained in the specified interval
+        :performance: O(log(n))
+        :param start: the start of the range (inclusive), None for min_key
+        :param stop: the stop of the range (inclusive if specified else exclusive), None for max_key
+        :param step: the step between two distinct keys
+        :param inclusive: if we include the stop or not
+        :return: the count
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+        return self._step_count(first, last, step)
+
+    def get_min(self):
+        if not self._keys:
+            raise ValueError("Empty frozen map")
+
+        return self._keys[0], self._values[0]
+
+    def get_max(self):
+        if not self._keys:
+            raise ValueError("Empty frozen map")
+
+        return self._keys[-1], self._values[-1]
+
+    def _pair_at(self, index):
+        if 0 <= index < len(self._keys):
+            return self._keys[index], self._values[index]
+
+        return None, None
+
+    def find_gt(self, key):
+        return self._pair_at(bisect_right(self._keys, key))
+
+    def find_gte(self, key):
+        return self._pair_at(bisect_left(self._keys, key))
+
+    def find_st(self, key):
+        return self._pair_at(bisect_left(self._keys, key) - 1)
+
+    def find_ste(self, key):
+        return self._pair_at(bisect_right(self._keys, key) - 1)
+
+    def find_gt_many(self, keys):
+        return [self.find_gt(key) for key in keys]
+
+    def find_gte_many(self, keys):
+        return [self.find_gte(key) for key in keys]
+
+    def find_st_many(self, keys):
+        return [self.find_st(key) for key in keys]
+
+    def find_ste_many(self, keys):
+        return [self.find_ste(key) for key in keys]
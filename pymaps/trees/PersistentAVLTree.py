@@ -0,0 +1,511 @@
+from pymaps.SortedContainer import SortedContainer, dedup_sorted_pairs
+from pymaps.trees.BinarySearchTree import LEFT_CHILD, RIGHT_CHILD
+from pymaps.trees.FrozenSortedMap import FrozenSortedMap
+
+
+class PersistentNode:
+    """
+    Immutable AVL node. There is no parent pointer: a node can be shared by many versions of the tree,
+    each with its own path to it.
+    """
+    __slots__ = ["_key", "_value", "_left_child", "_right_child", "_height", "_subtree_size"]
+
+    def __init__(self, key, value, left, right):
+        self._key = key
+        self._value = value
+        self._left_child = left
+        self._right_child = right
+        self._height = 1 + max(_height(left), _height(right))
+        self._subtree_size = 1 + _size(left) + _size(right)
+
+    def get_key(self):
+        return self._key
+
+    def get_value(self):
+        return self._value
+
+    def get_child(self, child=LEFT_CHILD):
+        return self._left_child if child == LEFT_CHILD else self._right_child
+
+    def get_height(self):
+        return self._height
+
+    def get_subtree_size(self):
+        return self._subtree_size
+
+    def __repr__(self):
+        return "[%s: %s]" % (self._key, self._value)
+
+
+def _height(node):
+    return 0 if node is None else node._height
+
+
+def _size(node):
+    return 0 if node is None else node._subtree_size
+
+
+class PersistentAVLTree(SortedContainer):
+    """
+    Persistent AVL tree. Nodes are never modified: an insert or a delete copies the nodes on the path
+    from the root to the change and shares every other node with the previous version.
+
+    A snapshot is just the current root, so it costs O(1), and it stays readable (and writable, without
+    affecting this tree) whatever happens to the tree afterwards. Iterations and slices also work on the
+    version current when they start.
+    """
+    __slots__ = ["_root"]
+
+    def __init__(self):
+        super().__init__()
+        self._root = None
+
+    @classmethod
+    def _with_root(cls, root):
+        tree = cls()
+        tree._root = root
+        return tree
+
+    @classmethod
+    def from_sorted(cls, items):
+        """
+        Build a perfectly balanced tree from (key, value) pairs already sorted by key
+        :performance: O(n)
+        :param items: an iterable of (key, value) tuples, sorted by key. When a key is repeated, the last value wins
+        :return: the new tree
+        """
+        pairs = list(dedup_sorted_pairs(items))
+        return cls._with_root(cls._build_balanced(pairs, 0, len(pairs)))
+
+    @classmethod
+    def bulk_load(cls, items):
+        """
+        Build a perfectly balanced tree from (key, value) pairs (or a mapping) in any order
+        :performance: O(n log(n)), O(n) if the input is already sorted
+        :param items: a mapping or an iterable of (key, value) tuples. When a key is repeated, the last value wins
+        :return: the new tree
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        return cls.from_sorted(sorted(items, key=lambda pair: pair[0]))
+
+    @staticmethod
+    def _build_balanced(pairs, low, high):
+        if low >= high:
+            return None
+
+        middle = (low + high) // 2
+        key, value = pairs[middle]
+
+        return PersistentNode(key, value, PersistentAVLTree._build_balanced(pairs, low, middle),
+                              PersistentAVLTree._build_balanced(pairs, middle + 1, high))
+
+    def snapshot(self):
+        """
+        Return a point-in-time copy of the tree, sharing all of its nodes
+        :performance: O(1)
+        :return: the snapshot, an independent PersistentAVLTree
+        """
+        return self._with_root(self._root)
+
+    def freeze(self):
+        """
+        Return an immutable, read-optimized copy of the tree
+        :performance: O(n)
+        :return: a FrozenSortedMap
+        """
+        return FrozenSortedMap.from_sorted(self)
+
+    def clear(self):
+        self._root = None
+
+    def __len__(self):
+        return _size(self._root)
+
+    def height(self):
+        return _height(self._root)
+
+    def __iter__(self):
+        for node in self._gen_nodes(self._ceiling_path(None)):
+            yield node.get_key(), node.get_value()
+
+    def __getitem__(self, query):
+        if isinstance(query, slice):
+            return self.slice(query.start, query.stop, query.step)
+        else:
+            return self._get(query)
+
+    def __setitem__(self, key, value):
+        self._root = self._insert(self._root, key, value)
+
+    def __delitem__(self, key):
+        self._root, _ = self._remove(self._root, key)
+
+    def _search(self, key):
+        walk = self._root
+
+        while walk is not None and walk.get_key() != key:
+            walk = walk.get_child(key < walk.get_key())
+
+        return walk
+
+    def _get(self, key):
+        node = self._search(key)
+        return node.get_value() if node is not None else None
+
+    def __contains__(self, key):
+        return self._search(key) is not None
+
+    def get_many(self, keys, default=None):
+        """
+        Return the values of a batch of keys, in the order of the batch
+        :performance: O(m log(n))
+        :param keys: a list or an array of keys
+        :param default: the value of the keys that are not in the tree
+        :return: a list of values
+        """
+        nodes = [self._search(key) for key in keys]
+        return [node.get_value() if node is not None else default for node in nodes]
+
+    def contains_many(self, keys):
+        """
+        Check a batch of keys, in the order of the batch
+        :performance: O(m log(n))
+        :param keys: a list or an array of keys
+        :return: a list of booleans
+        """
+        return [self._search(key) is not None for key in keys]
+
+    def update(self, items):
+        """
+        Insert a batch of mappings, like dict.update. Snapshots taken before are not affected
+        :performance: O(m log(n + m))
+        :param items: a mapping or an iterable of (key, value) tuples
+        :return: void
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+
+        root = self._root
+        for key, value in items:
+            root = self._insert(root, key, value)
+
+        self._root = root
+
+    def _balance(self, key, value, left, right):
+        """
+        Make a node from its content and two AVL subtrees whose heights differ by at most two,
+        with at most two rotations
+        :return: the root of the balanced subtree
+        """
+        if _height(left) > _height(right) + 1:
+            outer, inner = left.get_child(LEFT_CHILD), left.get_child(RIGHT_CHILD)
+
+            if _height(outer) >= _height(inner):
+                return PersistentNode(left.get_key(), left.get_value(), outer,
+                                      PersistentNode(key, value, inner, right))
+
+            return PersistentNode(inner.get_key(), inner.get_value(),
+                                  PersistentNode(left.get_key(), left.get_value(), outer, inner.get_child(LEFT_CHILD)),
+                                  PersistentNode(key, value, inner.get_child(RIGHT_CHILD), right))
+
+        if _height(right) > _height(left) + 1:
+            outer, inner = right.get_child(RIGHT_CHILD), right.get_child(LEFT_CHILD)
+
+            if _height(outer) >= _height(inner):
+                return PersistentNode(right.get_key(), right.get_value(),
+                                      PersistentNode(key, value, left, inner), outer)
+
+            return PersistentNode(inner.get_key(), inner.get_value(),
+                                  PersistentNode(key, value, left, inner.get_child(LEFT_CHILD)),
+                                  PersistentNode(right.get_key(), right.get_value(), inner.get_child(RIGHT_CHILD),
+                                                 outer))
+
+        return PersistentNode(key, value, left, right)
+
+    def _insert(self, node, key, value):
+        """
+        :performance: O(log(n)) time and new nodes
+        :return: the root of the new version of the subtree
+        """
+        if node is None:
+            return PersistentNode(key, value, None, None)
+
+        left, right = node.get_child(LEFT_CHILD), node.get_child(RIGHT_CHILD)
+
+        if key == node.get_key():
+            return PersistentNode(key, value, left, right)
+        elif key < node.get_key():
+            return self._balance(node.get_key(), node.get_value(), self._insert(left, key, value), right)
+        else:
+            return self._balance(node.get_key(), node.get_value(), left, self._insert(right, key, value))
+
+    def _remove(self, node, key):
+        """
+        :performance: O(log(n)) time and new nodes
+        :return: (root, removed) the root of the new version of the subtree, and the removed node (None if absent)
+        """
+        if node is None:
+            return None, None
+
+        left, right = node.get_child(LEFT_CHILD), node.get_child(RIGHT_CHILD)
+
+        if key == node.get_key():
+            if left is None:
+                return right, node
+            if right is None:
+                return left, node
+
+            right, successor = self._remove_min(right)
+            return self._balance(successor.get_key(), successor.get_value(), left, right), node
+
+        if key < node.get_key():
+            left, removed = self._remove(left, key)
+        else:
+            right, removed = self._remove(right, key)
+
+        if removed is None:
+            return node, None
+
+        return self._balance(node.get_key(), node.get_value(), left, right), removed
+
+    def _remove_min(self, node):
+        """
+        :return: (root, min) the new version of the subtree without its smallest node, and that node
+        """
+        left = node.get_child(LEFT_CHILD)
+
+        if left is None:
+            return node.get_child(RIGHT_CHILD), node
+
+        left, smallest = self._remove_min(left)
+        return self._balance(node.get_key(), node.get_value(), left, node.get_child(RIGHT_CHILD)), smallest
+
+    def _ceiling_path(self, key):
+        """
+        :return: a stack of the nodes to visit, the node with the smallest key greater or equal to the key
+        on top. None starts at the smallest key
+        """
+        stack = []
+        walk = self._root
+
+        while walk is not None:
+            if key is not None and walk.get_key() < key:
+                walk = walk.get_child(RIGHT_CHILD)
+            else:
+                stack.append(walk)
+                walk = walk.get_child(LEFT_CHILD)
+
+        return stack
+
+    def _index_path(self, index, reverse=False):
+        """
+        :return: a stack of the nodes to visit, the node at the index on top
+        """
+        stack = []
+        walk = self._root
+
+        while walk is not None:
+            left_size = _size(walk.get_child(LEFT_CHILD))
+
+            if index < left_size:
+                if not reverse:
+                    stack.append(walk)
+                walk = walk.get_child(LEFT_CHILD)
+            elif index == left_size:
+                stack.append(walk)
+                break
+            else:
+                if reverse:
+                    stack.append(walk)
+                index -= left_size + 1
+                walk = walk.get_child(RIGHT_CHILD)
+
+        return stack
+
+    def _gen_nodes(self, stack, reverse=False):
+        """
+        Yield the nodes in order (or in reverse order), starting with the node on top of the stack
+        """
+        while stack:
+            node = stack.pop()
+            yield node
+
+            walk = node.get_child(reverse)
+            while walk is not None:
+                stack.append(walk)
+                walk = walk.get_child(not reverse)
+
+    def slice(self, start, stop, step=1, inclusive=False):
+        """
+        Return a slice of the tree
+        :performance: O(log(n) + k * step) for k results
+        :param start: the start key (None for min_key)
+        :param stop: the stop key (None for until the end of the tree)
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if the stop key is included or not
+        :return: an array of (key,value) tuples
+        """
+        if start is not None and stop is not None and start > stop:
+            raise ValueError("Cannot search for a slice with a start greater than a stop")
+
+        step = 1 if step is None else step
+        result = []
+
+        for i, node in enumerate(self._gen_nodes(self._ceiling_path(start))):
+            key = node.get_key()
+
+            if stop is not None and (stop < key or (not inclusive and key == stop)):
+                break
+
+            if i % step == 0:
+                result.append((key, node.get_value()))
+
+        return result
+
+    def islice(self, start, stop, step=1, inclusive=False):
+        """
+        Return the inverse of a slice: the mappings with a key smaller than start or greater than stop
+        :param start: the start key, None for the min
+        :param stop: the stop key, None for the max
+        :param step: the number of keys skipped in between each result
+        :param inclusive: if start and stop are included or not
+        :return: an array of (key,value) tuples
+        """
+        pairs = list(self)
+
+        before = 0 if start is None else (self.bisect_right(start) if inclusive else self.bisect_left(start))
+        after = len(pairs) if stop is None else (self.bisect_left(stop) if inclusive else self.bisect_right(stop))
+
+        return pairs[0:before:step] + pairs[after::step]
+
+    def slice_by_index(self, start=None, stop=None, step=1):
+        """
+        Return a slice of the tree by position, like slicing the sorted list of (key, value) tuples
+        :performance: O(log(n) + k * |step|) for k results
+        :return: an array of (key,value) tuples
+        """
+        indices = range(*slice(start, stop, step).indices(len(self)))
+
+        if len(indices) == 0:
+            return []
+
+        reverse = indices.step < 0
+        nodes = self._gen_nodes(self._index_path(indices[0], reverse), reverse)
+
+        return [(node.get_key(), node.get_value())
+                for i, node in zip(range(len(indices) * abs(indices.step)), nodes) if i % abs(indices.step) == 0]
+
+    def at_index(self, index):
+        """
+        :performance: O(log(n))
+        :param index: the index, negative values count from the end
+        :return: (tuple)(key, value)
+        """
+        if not -len(self) <= index < len(self):
+            raise ValueError("Illegal index")
+
+        node = self._index_path(index % len(self))[-1]
+        return node.get_key(), node.get_value()
+
+    def _bisect(self, key, right):
+        count = 0
+        walk = self._root
+
+        while walk is not None:
+            if walk.get_key() < key or (right and walk.get_key() == key):
+                count += _size(walk.get_child(LEFT_CHILD)) + 1
+                walk = walk.get_child(RIGHT_CHILD)
+            else:
+                walk = walk.get_child(LEFT_CHILD)
+
+        return count
+
+    def bisect_left(self, key):
+        """
+        :performance: O(log(n))
+        :return: the number of keys smaller than the key
+        """
+        return self._bisect(key, False)
+
+    def bisect_right(self, key):
+        """
+        :performance: O(log(n))
+        :return: the number of keys smaller or equal to the key
+        """
+        return self._bisect(key, True)
+
+    def rank(self, key):
+        return self._bisect(key, False)
+
+    def index_of(self, key):
+        """
+        :performance: O(log(n))
+        :param key: the key to search for
+        :return: the index, or None if the key is not in the tree
+        """
+        return self._bisect(key, False) if key in self else None
+
+    def count_in_range(self, start, stop, step=1, inclusive=False):
+        """
+        Return the number of keys contained in the specified interval
+        :performance: O(log(n))
+        :param start: the start of the range (inclusive), None for min_key
+        :param stop: the stop of the range (inclusive if specified else exclusive), None for max_key
+        :param step: the step between two distinct keys
+        :param inclusive: if we include the stop or not
+        :return: the count
+        """
+        first, last = self._range_indices(start, stop, inclusive, self.bisect_left, self.bisect_right)
+        return self._step_count(first, last, step)
+
+    def get_min(self):
+        if self._root is None:
+            raise ValueError("Empty persistent tree")
+
+        return self.at_index(0)
+
+    def get_max(self):
+        if self._root is None:
+            raise ValueError("Empty persistent tree")
+
+        return self.at_index(-1)
+
+    def _neighbour(self, key, greater, strict):
+        """
+        :return: the (key, value) of the closest key in a direction, (None, None) if there is none
+        """
+        candidate = None
+        walk = self._root
+
+        while walk is not None:
+            walk_key = walk.get_key()
+
+            if greater:
+                accepted = key < walk_key or (not strict and key == walk_key)
+            else:
+                accepted = walk_key < key or (not strict and key == walk_key)
+
+            if accepted:
+                candidate = walk
+
+            # after an accepted node, look for a closer one on the side of the key
+            walk = walk.get_child(accepted == greater)
+
+        if candidate is None:
+            return None, None
+
+        return candidate.get_key(), candidate.get_value()
+
+    def find_gt(self, key):
+        return self._neighbour(key, greater=True, strict=True)
+
+    def find_gte(self, key):
+        return self._neighbour(key, greater=True, strict=False)
+
+    def find_st(self, key):
+        return self._neighbour(key, greater=False, strict=True)
+
+    def find_ste(self, key):
+        return self._neighbour(key, greater=False, strict=False)
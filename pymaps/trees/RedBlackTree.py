@@ -0,0 +1,151 @@
+from pymaps.trees.BinarySearchTree import TreeNode, LEFT_CHILD, RIGHT_CHILD, BinarySearchTree
+
+
+class RedBlackNode(TreeNode):
+    __slots__ = ["_red"]
+
+    def __init__(self, key, value, parent):
+        super().__init__(key, value, parent)
+        self._red = True
+
+    def is_red(self):
+        return self._red
+
+    def set_red(self, red):
+        old_red = self._red
+        self._red = red
+        return old_red
+
+
+def _is_red(node):
+    return node is not None and node.is_red()
+
+
+class RedBlackTree(BinarySearchTree):
+    """
+    Red-black tree. The balance is looser than an AVL tree, but an insert does at most two
+    rotations and a delete at most three, which makes it cheaper under heavy churn.
+    """
+
+    def __init__(self, enable_index=True, enable_threading=False):
+        super().__init__(enable_index=enable_index, enable_threading=enable_threading)
+
+    def _make_node(self, key, value, parent):
+        return RedBlackNode(key, value, parent)
+
+    def _side(self, node):
+        parent = node.get_parent()
+        return node is parent.get_child(LEFT_CHILD)
+
+    def _inserted_hook(self, inserted_node):
+        node = inserted_node
+
+        while _is_red(node.get_parent()):
+            parent = node.get_parent()
+            grand_parent = parent.get_parent()  # exists, since the root is black
+            parent_side = self._side(parent)
+            uncle = grand_parent.get_child(not parent_side)
+
+            if _is_red(uncle):
+                parent.set_red(False)
+                uncle.set_red(False)
+                grand_parent.set_red(True)
+                node = grand_parent
+            else:
+                if self._side(node) != parent_side:
+                    self._rotate(node)
+                    node, parent = parent, node
+
+                self._rotate(parent)
+                parent.set_red(False)
+                grand_parent.set_red(True)
+                break
+
+        self._root.set_red(False)
+
+    def _single_child_delete(self, node):
+        ancestor = node.get_parent()
+        side = self._side(node) if ancestor is not None else LEFT_CHILD
+        child = node.get_child(LEFT_CHILD) if node.has_child(LEFT_CHILD) else node.get_child(RIGHT_CHILD)
+
+        super()._single_child_delete(node)
+
+        if node.is_red():
+            return
+
+        if _is_red(child):
+            child.set_red(False)
+        elif ancestor is not None:
+            self._fix_double_black(ancestor, side)
+
+    def _fix_double_black(self, parent, side):
+        """
+        Restore the black height after a black node was removed from the side of the parent.
+        :param parent: the parent of the (possibly empty) subtree missing a black node
+        :param side: the side of that subtree
+        :return: void
+        """
+        while parent is not None:
+            node = parent.get_child(side)
+
+            if _is_red(node):
+                node.set_red(False)
+                return
+
+            sibling = parent.get_child(not side)
+
+            if sibling.is_red():
+                sibling.set_red(False)
+                parent.set_red(True)
+                self._rotate(sibling)
+                sibling = parent.get_child(not side)
+
+            far_nephew = sibling.get_child(not side)
+            near_nephew = sibling.get_child(side)
+
+            if not _is_red(far_nephew) and not _is_red(near_nephew):
+                sibling.set_red(True)
+
+                if parent.is_red():
+                    parent.set_red(False)
+                    return
+
+                if parent.get_parent() is None:
+                    return
+
+                side = self._side(parent)
+                parent = parent.get_parent()
+                continue
+
+            if not _is_red(far_nephew):
+                near_nephew.set_red(False)
+                sibling.set_red(True)
+                self._rotate(near_nephew)
+                sibling, far_nephew = near_nephew, sibling
+
+            sibling.set_red(parent.is_red())
+            parent.set_red(False)
+            far_nephew.set_red(False)
+            self._rotate(sibling)
+            return
+
+    def _bulk_load(self, pairs):
+        super()._bulk_load(pairs)
+
+        # the balanced build only has leaves on its two last levels:
+        # every path has the same number of black nodes if only the deepest level is red
+        depths = [(self._root, 1)] if self._root is not None else []
+        nodes_with_depth = []
+        max_depth = 0
+
+        while depths:
+            node, depth = depths.pop()
+            nodes_with_depth.append((node, depth))
+            max_depth = max(max_depth, depth)
+
+            for child in (node.get_child(LEFT_CHILD), node.get_child(RIGHT_CHILD)):
+                if child is not None:
+                    depths.append((child, depth + 1))
+
+        for node, depth in nodes_with_depth:
+            node.set_red(depth == max_depth and depth > 1)
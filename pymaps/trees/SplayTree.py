@@ -0,0 +1,62 @@
+from pymaps.trees.BinarySearchTree import LEFT_CHILD, BinarySearchTree
+
+
+class SplayTree(BinarySearchTree):
+    """
+    Self-adjusting tree. Every inserted or accessed node is splayed to the root, so the keys
+    that are looked up often stay close to the root. The cost of an operation is O(log(n)) amortized.
+    """
+    __slots__ = ["_splay_interval", "_access_count"]
+
+    def __init__(self, enable_index=True, enable_threading=False, splay_interval=1):
+        """
+        :param enable_index: see BinarySearchTree
+        :param enable_threading: see BinarySearchTree
+        :param splay_interval: splay only one access (lookup or update) out of splay_interval,
+        to limit the restructuring cost. Inserts and deletes always splay
+        """
+        super().__init__(enable_index=enable_index, enable_threading=enable_threading)
+
+        if splay_interval < 1:
+            raise ValueError("The splay interval must be at least 1")
+
+        self._splay_interval = splay_interval
+        self._access_count = 0
+
+    def _options(self):
+        options = super()._options()
+        options["splay_interval"] = self._splay_interval
+        return options
+
+    def _splay(self, node):
+        """
+        Move a node to the root with zig, zig-zig and zig-zag steps
+        :performance: O(log(n)) amortized
+        :param node: the node
+        :return: void
+        """
+        while node.get_parent() is not None:
+            parent = node.get_parent()
+            grand_parent = parent.get_parent()
+
+            if grand_parent is None:
+                self._rotate(node)
+            elif (node is parent.get_child(LEFT_CHILD)) == (parent is grand_parent.get_child(LEFT_CHILD)):
+                self._rotate(parent)
+                self._rotate(node)
+            else:
+                self._rotate(node)
+                self._rotate(node)
+
+    def _accessed_hook(self, accessed_node):
+        self._access_count += 1
+
+        if self._access_count >= self._splay_interval:
+            self._access_count = 0
+            self._splay(accessed_node)
+
+    def _inserted_hook(self, inserted_node):
+        self._splay(inserted_node)
+
+    def _deleted_hook(self, parent_node):
+        self._splay(parent_node)
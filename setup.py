@@ -7,5 +7,6 @@ setup(
     author='Samuel Yvon',
     author_email='samuel.yvon@umontreal.ca',
     url='https://github.com/SamuelYvon/PyMaps',
-    packages=find_packages(exclude=['contrib', 'docs', 'tests'])
+    packages=find_packages(exclude=['contrib', 'docs', 'tests', 'benchmarks']),
+    extras_require={'numpy': ['numpy']}
 )
@@ -0,0 +1,111 @@
+import bisect
+import random
+import unittest
+
+from pymaps import ArrayAVLTree
+
+
+class TestArrayAvlTrees(unittest.TestCase):
+
+    def test_basic_functions(self):
+        bt = ArrayAVLTree()
+        self.assertEqual(len(bt), 0)
+        self.assertRaises(ValueError, bt.get_min)
+
+        bt[5] = 1
+        bt[4] = 2
+        bt[6] = 3
+
+        self.assertEqual(len(bt), 3)
+        self.assertEqual(bt[4], 2)
+        self.assertIsNone(bt[7])
+        self.assertTrue(5 in bt)
+        self.assertFalse(7 in bt)
+        self.assertEqual(bt.get_min(), (4, 2))
+        self.assertEqual(bt.get_max(), (6, 3))
+
+        bt[5] = 10
+        self.assertEqual(bt[5], 10)
+        self.assertEqual(len(bt), 3)
+
+        bt.clear()
+        self.assertEqual(len(bt), 0)
+
+    def test_random_inserts_and_delete(self):
+        bt = ArrayAVLTree()
+        control = dict()
+
+        for i in range(10000):
+            key = random.randint(0, 2000)
+            value = random.randint(0, 8000)
+
+            if random.randint(0, 100) > 60 and key in control:
+                del bt[key]
+                del control[key]
+            else:
+                bt[key] = value
+                control[key] = value
+
+        self.assert_match(bt, control)
+        self.assert_balanced(bt, bt._root)
+
+        # deleted slots are reused
+        self.assertEqual(len(bt._keys), len(control) + len(bt._free))
+
+    def test_index_and_find(self):
+        keys = sorted(random.sample(range(0, 2000, 2), 300))
+        bt = ArrayAVLTree.bulk_load({k: -k for k in keys})
+
+        self.assert_balanced(bt, bt._root)
+
+        for i, key in enumerate(keys):
+            self.assertEqual(bt.at_index(i), (key, -key))
+            self.assertEqual(bt.index_of(key), i)
+
+        self.assertEqual(bt.at_index(-1), (keys[-1], -keys[-1]))
+        self.assertIsNone(bt.index_of(1))
+
+        for key in range(-1, 2001, 7):
+            self.assertEqual(bt.bisect_left(key), bisect.bisect_left(keys, key))
+            self.assertEqual(bt.bisect_right(key), bisect.bisect_right(keys, key))
+
+            i = bisect.bisect_right(keys, key)
+            self.assertEqual(bt.find_gt(key)[0], keys[i] if i < len(keys) else None)
+            i = bisect.bisect_left(keys, key)
+            self.assertEqual(bt.find_gte(key)[0], keys[i] if i < len(keys) else None)
+            self.assertEqual(bt.find_st(key)[0], keys[i - 1] if i > 0 else None)
+            i = bisect.bisect_right(keys, key)
+            self.assertEqual(bt.find_ste(key)[0], keys[i - 1] if i > 0 else None)
+
+    def test_slice(self):
+        bt = ArrayAVLTree()
+        for i in range(1, 5):
+            bt[i] = i
+
+        self.assertEqual([(1, 1)], bt[:2])
+        self.assertEqual([(1, 1), (2, 2)], bt[1:3])
+        self.assertEqual([(1, 1), (3, 3)], bt[1::2])
+        self.assertEqual([(2, 2), (3, 3)], bt.slice(2, 3, inclusive=True))
+        self.assertEqual(2, bt.count_in_range(1, 3))
+
+        self.assertEqual(bt.islice(1, 2), [(3, 3), (4, 4)])
+        self.assertEqual(bt.islice(1, 2, inclusive=True), [(1, 1), (2, 2), (3, 3), (4, 4)])
+
+    def assert_match(self, bt, control):
+        for k in control:
+            self.assertEqual(control[k], bt[k], "Control has a key that the tree doesn't")
+
+        self.assertEqual(list(bt), sorted(control.items()))
+        self.assertEqual(len(bt), len(control))
+
+    def assert_balanced(self, bt, node):
+        if node == -1:
+            return 0
+
+        left_height = self.assert_balanced(bt, bt._left[node])
+        right_height = self.assert_balanced(bt, bt._right[node])
+
+        self.assertLessEqual(abs(left_height - right_height), 1)
+        self.assertEqual(bt._height[node], 1 + max(left_height, right_height))
+
+        return bt._height[node]
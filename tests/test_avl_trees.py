@@ -1,3 +1,5 @@
+import io
+import pickle
 import random
 import unittest
 
@@ -89,3 +91,280 @@ class TestAvlTrees(unittest.TestCase):
             self.assertEqual(v, control[k], "BST as a key that control doesn't")
 
         self.assertEqual(len(bt), len(control))
+
+    def test_from_sorted(self):
+        bt = AVLTree.from_sorted((i, i) for i in range(1000))
+        control = {i: i for i in range(1000)}
+
+        self.assert_match(bt, control)
+        self.assert_balanced(bt._root)
+        self.assertEqual(bt._root.get_subtree_size(), 1000)
+
+        for i in range(0, 1000, 3):
+            del bt[i]
+            del control[i]
+
+        for i in range(1000, 1200):
+            bt[i] = i
+            control[i] = i
+
+        self.assert_match(bt, control)
+
+        for i, key in enumerate(sorted(control)):
+            self.assertEqual(bt.index_of(key), i)
+
+    def test_bulk_load(self):
+        keys = list(range(500))
+        random.shuffle(keys)
+
+        bt = AVLTree.bulk_load((k, -k) for k in keys)
+
+        self.assert_match(bt, {k: -k for k in keys})
+        self.assert_balanced(bt._root)
+
+    def assert_balanced(self, node):
+        if node is None:
+            return 0
+
+        left_height = self.assert_balanced(node.get_child(True))
+        right_height = self.assert_balanced(node.get_child(False))
+
+        self.assertLessEqual(abs(left_height - right_height), 1)
+        self.assertEqual(node.get_height(), 1 + max(left_height, right_height))
+
+        return node.get_height()
+
+    def test_update(self):
+        bt = AVLTree()
+        control = dict()
+
+        for size in [2, 1000, 10, 5000]:
+            batch = {random.randint(0, 10000): random.randint(0, 8000) for _ in range(size)}
+            bt.update(batch)
+            control.update(batch)
+            self.assert_match(bt, control)
+            self.assert_balanced(bt._root)
+
+    def test_threading(self):
+        bt = AVLTree(enable_threading=True)
+        control = dict()
+
+        for i in range(5000):
+            key = random.randint(0, 2000)
+
+            if random.randint(0, 100) > 60 and key in control:
+                del bt[key]
+                del control[key]
+            else:
+                bt[key] = i
+                control[key] = i
+
+        self.assert_match(bt, control)
+
+        nodes = list(bt._inorder_traversal(bt._root))
+        walk = bt._min_node
+
+        for node in nodes:
+            self.assertIs(walk, node)
+            walk = walk.get_next()
+
+        self.assertIsNone(walk)
+
+    def test_balanced_after_deletes(self):
+        bt = AVLTree()
+        control = dict()
+
+        for i in range(3000):
+            key = random.randint(0, 1000)
+
+            if random.randint(0, 100) > 50 and key in control:
+                del bt[key]
+                del control[key]
+            else:
+                bt[key] = i
+                control[key] = i
+
+        self.assert_match(bt, control)
+        self.assert_balanced(bt._root)
+
+        for i, key in enumerate(sorted(control)):
+            self.assertEqual(bt.index_of(key), i)
+
+    def test_split(self):
+        keys = sorted(random.sample(range(10000), 2000))
+
+        for cut in [-1, keys[0], keys[700], keys[700] + 1, keys[-1], 10001]:
+            bt = AVLTree.from_sorted((k, k) for k in keys)
+            bt[10001] = 10001
+            del bt[10001]
+
+            left, right = bt.split(cut)
+
+            self.assertEqual(len(bt), 0)
+            self.assert_match(left, {k: k for k in keys if k < cut})
+            self.assert_match(right, {k: k for k in keys if k >= cut})
+
+            for tree in (left, right):
+                self.assert_balanced(tree._root)
+                if len(tree) > 0:
+                    self.assertEqual(tree._root.get_subtree_size(), len(tree))
+                    self.assertIsNone(tree._root.get_parent())
+                    self.assertEqual(tree.get_min()[0], next(iter(tree))[0])
+                    self.assertEqual(tree.at_index(-1), tree.get_max())
+
+    def test_join(self):
+        left = AVLTree()
+        for i in range(100):
+            left[i] = i
+
+        right = AVLTree.from_sorted((i, i) for i in range(1000, 5000))
+
+        bt = AVLTree.join(left, right)
+
+        self.assertEqual(len(left), 0)
+        self.assertEqual(len(right), 0)
+
+        control = {i: i for i in list(range(100)) + list(range(1000, 5000))}
+        self.assert_match(bt, control)
+        self.assert_balanced(bt._root)
+        self.assertEqual(bt.get_min(), (0, 0))
+        self.assertEqual(bt.get_max(), (4999, 4999))
+
+        for i, key in enumerate(sorted(control)):
+            self.assertEqual(bt.index_of(key), i)
+
+        bt[500] = 500
+        del bt[0]
+        self.assert_balanced(bt._root)
+
+        self.assertEqual(len(AVLTree.join(AVLTree(), AVLTree())), 0)
+        self.assertRaises(ValueError, AVLTree.join, AVLTree.from_sorted([(5, 5)]), AVLTree.from_sorted([(1, 1)]))
+
+    def test_split_join_threaded(self):
+        bt = AVLTree.from_sorted(((i, i) for i in range(300)), enable_threading=True)
+
+        left, right = bt.split(120)
+
+        self.assertEqual(left[100:200], [(i, i) for i in range(100, 120)])
+        self.assertEqual(right[100:200], [(i, i) for i in range(120, 200)])
+        self.assertEqual(left.find_gt(119), (None, None))
+        self.assertEqual(right.find_st(120), (None, None))
+
+        bt = AVLTree.join(left, right)
+        self.assertEqual(bt[100:200], [(i, i) for i in range(100, 200)])
+
+    def test_split_join_without_index(self):
+        bt = AVLTree(enable_index=False)
+        for key in random.sample(range(100), 100):
+            bt[key] = key
+
+        left, right = bt.split(50)
+
+        self.assertEqual(len(left), 50)
+        self.assertEqual(len(right), 50)
+        self.assert_match(left, {k: k for k in range(50)})
+        self.assert_match(right, {k: k for k in range(50, 100)})
+
+        bt = AVLTree.join(left, right)
+        self.assertEqual(len(bt), 100)
+        self.assert_match(bt, {k: k for k in range(100)})
+
+        # the subtree sizes of the unindexed side would be wrong in an indexed result
+        indexed = AVLTree.from_sorted((i, i) for i in range(5))
+        unindexed = AVLTree.from_sorted(((i, i) for i in range(10, 30)), enable_index=False)
+        self.assertRaises(ValueError, AVLTree.join, indexed, unindexed)
+        self.assertRaises(ValueError, AVLTree.join, unindexed, indexed)
+        self.assertEqual(len(indexed), 5)
+
+    def test_set_operations(self):
+        for small_size, large_size in [(0, 500), (20, 3000), (3000, 20), (800, 1000)]:
+            for consume in (False, True):
+                mine = {k: k for k in random.sample(range(5000), small_size)}
+                theirs = {k: -k for k in random.sample(range(5000), large_size)}
+                merge = lambda value, other_value: (value, other_value)
+
+                expected_union = {k: (mine[k], theirs[k]) if k in mine and k in theirs else
+                                  mine.get(k, theirs.get(k)) for k in set(mine) | set(theirs)}
+                expected_intersection = {k: (mine[k], theirs[k]) for k in set(mine) & set(theirs)}
+                expected_difference = {k: mine[k] for k in set(mine) - set(theirs)}
+
+                for operation, expected in [(lambda a, b: a.union(b, merge, consume=consume), expected_union),
+                                            (lambda a, b: a.intersection(b, merge, consume=consume),
+                                             expected_intersection),
+                                            (lambda a, b: a.difference(b, consume=consume), expected_difference)]:
+                    bt = AVLTree.bulk_load(mine.items())
+                    other = AVLTree.bulk_load(theirs.items())
+
+                    result = operation(bt, other)
+
+                    self.assert_match(result, expected)
+                    self.assert_balanced(result._root)
+                    self.assertEqual(len(bt), 0 if consume else len(mine))
+                    self.assertEqual(len(other), 0 if consume else len(theirs))
+
+                    if len(result) > 0:
+                        self.assertEqual(result._root.get_subtree_size(), len(result))
+                        self.assertEqual(result.get_min()[0], min(expected))
+                        self.assertEqual(result.get_max()[0], max(expected))
+                        self.assertEqual(result.index_of(max(expected)), len(expected) - 1)
+
+    def test_set_operations_threaded(self):
+        bt = AVLTree.from_sorted(((i, i) for i in range(0, 300, 2)), enable_threading=True)
+        other = AVLTree.from_sorted(((i, i) for i in range(0, 300, 3)), enable_threading=True)
+
+        union = bt.union(other, consume=True)
+
+        self.assertEqual(len(bt), 0)
+        self.assertEqual(union[0:20], [(i, i) for i in range(20) if i % 2 == 0 or i % 3 == 0])
+
+    def test_set_operations_without_index(self):
+        bt = AVLTree(enable_index=False)
+        for key in random.sample(range(1000), 1000):
+            bt[key] = key
+
+        other = AVLTree.from_sorted(((i, i) for i in range(1000, 1010)), enable_index=False)
+        union = bt.union(other, consume=True)
+
+        self.assertEqual(len(union), 1010)
+        self.assertEqual(list(union), [(i, i) for i in range(1010)])
+
+    def test_delete_range(self):
+        keys = random.sample(range(5000), 2000)
+
+        for start, stop, inclusive in [(None, None, False), (100, 110, False), (100, 4000, True), (None, 2500, False),
+                                       (4990, None, False), (6000, 7000, False), (keys[0], keys[0], True)]:
+            for enable_index, enable_threading in [(True, False), (True, True), (False, False), (False, True)]:
+                bt = AVLTree.bulk_load(((k, k) for k in keys), enable_index=enable_index,
+                                       enable_threading=enable_threading)
+                expected = {k: k for k in keys if not ((start is None or k >= start) and
+                                                       (stop is None or k < stop or (inclusive and k == stop)))}
+
+                self.assertEqual(bt.delete_range(start, stop, inclusive), len(keys) - len(expected))
+                self.assert_match(bt, expected)
+                self.assert_balanced(bt._root)
+                self.assertEqual(bt[None:None], sorted(expected.items()))
+
+                if expected:
+                    self.assertEqual(bt.get_min()[0], min(expected))
+                    self.assertEqual(bt.get_max()[0], max(expected))
+
+                bt[2500] = 0
+                self.assert_balanced(bt._root)
+
+    def test_dump_and_load(self):
+        bt = AVLTree.bulk_load(((k, -k) for k in random.sample(range(100000), 10000)), enable_index=False)
+
+        buffer = io.BytesIO()
+        bt.dump(buffer)
+        buffer.seek(0)
+        loaded = AVLTree.load(buffer)
+
+        self.assertEqual(list(loaded), list(bt))
+        self.assertIsInstance(loaded, AVLTree)
+        self.assertFalse(loaded._enable_index)
+        self.assert_balanced(loaded._root)
+
+        copy = pickle.loads(pickle.dumps(bt))
+        self.assertEqual(list(copy), list(bt))
+        copy[-1] = 1
+        self.assert_balanced(copy._root)
@@ -0,0 +1,139 @@
+import bisect
+import random
+import unittest
+
+from pymaps import BPlusTree
+from pymaps.trees.BPlusTree import BPlusInternal
+
+
+class TestBPlusTrees(unittest.TestCase):
+
+    def test_basic_functions(self):
+        bt = BPlusTree(order=4)
+        self.assertEqual(len(bt), 0)
+        self.assertRaises(ValueError, bt.get_min)
+        self.assertEqual(bt.find_gt(1), (None, None))
+        self.assertEqual(bt[:], [])
+
+        for key in [5, 4, 6]:
+            bt[key] = key * 10
+
+        self.assertEqual(len(bt), 3)
+        self.assertEqual(bt[4], 40)
+        self.assertIsNone(bt[7])
+        self.assertTrue(5 in bt)
+        self.assertFalse(7 in bt)
+        self.assertEqual(bt.get_min(), (4, 40))
+        self.assertEqual(bt.get_max(), (6, 60))
+
+        bt[5] = 1
+        self.assertEqual(bt[5], 1)
+        self.assertEqual(len(bt), 3)
+
+        self.assertRaises(ValueError, BPlusTree, 3)
+
+    def test_random_inserts_and_delete(self):
+        for order in [4, 5, 16]:
+            bt = BPlusTree(order=order)
+            control = dict()
+
+            for i in range(5000):
+                key = random.randint(0, 1000)
+
+                if random.randint(0, 100) > 55 and key in control:
+                    del bt[key]
+                    del control[key]
+                else:
+                    bt[key] = i
+                    control[key] = i
+
+            self.assert_match(bt, control)
+            self.assert_valid(bt)
+
+            for key in list(control):
+                del bt[key]
+
+            self.assertEqual(len(bt), 0)
+            self.assertEqual(list(bt), [])
+
+    def test_index_and_find(self):
+        keys = sorted(random.sample(range(0, 4000, 2), 1000))
+        bt = BPlusTree.bulk_load({k: -k for k in keys}, order=8)
+
+        self.assert_valid(bt)
+
+        for i, key in enumerate(keys):
+            self.assertEqual(bt.at_index(i), (key, -key))
+            self.assertEqual(bt.index_of(key), i)
+
+        self.assertEqual(bt.at_index(-1), (keys[-1], -keys[-1]))
+        self.assertIsNone(bt.index_of(1))
+
+        for key in range(-1, 4001, 7):
+            self.assertEqual(bt.bisect_left(key), bisect.bisect_left(keys, key))
+            self.assertEqual(bt.bisect_right(key), bisect.bisect_right(keys, key))
+
+            i = bisect.bisect_right(keys, key)
+            self.assertEqual(bt.find_gt(key)[0], keys[i] if i < len(keys) else None)
+            i = bisect.bisect_left(keys, key)
+            self.assertEqual(bt.find_gte(key)[0], keys[i] if i < len(keys) else None)
+            self.assertEqual(bt.find_st(key)[0], keys[i - 1] if i > 0 else None)
+            i = bisect.bisect_right(keys, key)
+            self.assertEqual(bt.find_ste(key)[0], keys[i - 1] if i > 0 else None)
+
+    def test_slice(self):
+        bt = BPlusTree.from_sorted(((i, i) for i in range(1, 5)), order=4)
+
+        self.assertEqual([(1, 1)], bt[:2])
+        self.assertEqual([(1, 1), (2, 2)], bt[1:3])
+        self.assertEqual([(1, 1), (3, 3)], bt[1::2])
+        self.assertEqual([(2, 2), (3, 3)], bt.slice(2, 3, inclusive=True))
+        self.assertEqual(2, bt.count_in_range(1, 3))
+
+        self.assertEqual(bt.islice(1, 2), [(3, 3), (4, 4)])
+        self.assertEqual(bt.islice(1, 2, inclusive=True), [(1, 1), (2, 2), (3, 3), (4, 4)])
+
+        keys = list(range(0, 1000, 3))
+        bt = BPlusTree.from_sorted(((k, k) for k in keys), order=6)
+
+        for start, stop, step in [(10, 500, 1), (11, 500, 7), (None, 100, 3), (900, None, 1)]:
+            expected = [k for k in keys if (start is None or k >= start) and (stop is None or k < stop)][::step]
+            self.assertEqual([k for k, _ in bt.slice(start, stop, step)], expected)
+
+    def assert_match(self, bt, control):
+        for k in control:
+            self.assertEqual(control[k], bt[k], "Control has a key that the tree doesn't")
+
+        self.assertEqual(list(bt), sorted(control.items()))
+        self.assertEqual(len(bt), len(control))
+
+    def assert_valid(self, bt):
+        leaves = []
+        self.assert_valid_node(bt, bt._root, None, None, leaves, True)
+
+        leaf = bt._first_leaf
+        for expected in leaves:
+            self.assertIs(leaf, expected)
+            leaf = leaf._next_leaf
+        self.assertIsNone(leaf)
+        self.assertIs(bt._last_leaf, leaves[-1])
+
+    def assert_valid_node(self, bt, node, low, high, leaves, is_root):
+        if not is_root:
+            self.assertGreaterEqual(node.get_width(), bt._order // 2)
+        self.assertLessEqual(node.get_width(), bt._order)
+
+        if isinstance(node, BPlusInternal):
+            self.assertEqual(len(node._keys), len(node._children) - 1)
+            bounds = [low] + node._keys + [high]
+            for i, child in enumerate(node._children):
+                count = self.assert_valid_node(bt, child, bounds[i], bounds[i + 1], leaves, False)
+                self.assertEqual(node._counts[i], count)
+            return sum(node._counts)
+
+        leaves.append(node)
+        self.assertEqual(node._keys, sorted(node._keys))
+        for key in node._keys:
+            self.assertTrue(low is None or low <= key)
+            self.assertTrue(high is None or key < high)
+        return len(node._keys)
@@ -1,8 +1,16 @@
+import bisect
+import io
+import pickle
 import random
 import unittest
 
 from pymaps.trees.BinarySearchTree import BinarySearchTree
-from tests.test_utils import inorder_str, postorder_str
+from tests.test_utils import inorder_str, postorder_str, preorder_str
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class TestBinarySearchTrees(unittest.TestCase):
@@ -283,3 +291,302 @@ class TestBinarySearchTrees(unittest.TestCase):
             bt[i + 1] = i + 1
 
         bt[1:6] = 5
+
+    def test_from_sorted(self):
+        bt = BinarySearchTree.from_sorted((i, i * 2) for i in range(100))
+
+        self.assertEqual(len(bt), 100)
+        self.assertEqual(bt.get_min(), (0, 0))
+        self.assertEqual(bt.get_max(), (99, 198))
+        self.assertEqual(bt._root.get_subtree_size(), 100)
+        self.assertEqual([k for k, _ in bt], list(range(100)))
+
+        for i in range(100):
+            self.assertEqual(bt.at_index(i), (i, i * 2))
+            self.assertEqual(bt.index_of(i), i)
+
+        bt[100] = 200
+        del bt[0]
+        self.assertEqual(bt.get_min(), (1, 2))
+        self.assertEqual(bt.get_max(), (100, 200))
+
+        self.assertEqual(len(BinarySearchTree.from_sorted([])), 0)
+        self.assertEqual(list(BinarySearchTree.from_sorted([(1, 1), (1, 2)])), [(1, 2)])
+        self.assertRaises(ValueError, BinarySearchTree.from_sorted, [(2, 2), (1, 1)])
+
+    def test_bulk_load(self):
+        control = {random.randint(0, 10000): random.randint(0, 8000) for _ in range(1000)}
+
+        self.assert_match(BinarySearchTree.bulk_load(control), control)
+        self.assert_match(BinarySearchTree.bulk_load(list(control.items())), control)
+
+        self.assertEqual(list(BinarySearchTree.bulk_load([(2, 1), (1, 1), (2, 3)])), [(1, 1), (2, 3)])
+
+    def test_update(self):
+        bt = BinarySearchTree()
+        control = dict()
+
+        for size in [1, 5, 1000, 3, 2000]:
+            batch = [(random.randint(0, 10000), random.randint(0, 8000)) for _ in range(size)]
+            bt.update(batch)
+            control.update(batch)
+            self.assert_match(bt, control)
+
+        bt.update({-1: 1})
+        control.update({-1: 1})
+        self.assert_match(bt, control)
+        self.assertEqual(bt.get_min(), (-1, 1))
+
+        for i, key in enumerate(sorted(control)):
+            self.assertEqual(bt.index_of(key), i)
+
+    def test_traversals(self):
+        bt = BinarySearchTree()
+
+        for key in [5, 2, 8, 1, 3, 7, 9, 4]:
+            bt[key] = key
+
+        self.assertEqual(inorder_str(bt), "12345789")
+        self.assertEqual(preorder_str(bt), "52134879")
+        self.assertEqual(postorder_str(bt), "14327985")
+        self.assertEqual([node.get_key() for node in bt._gen_bfs()], [5, 2, 8, 1, 3, 7, 9, 4])
+
+        self.assertEqual(list(BinarySearchTree()._gen_bfs()), [])
+        self.assertEqual(list(BinarySearchTree()), [])
+
+    def test_deep_traversal(self):
+        bt = BinarySearchTree()
+
+        for i in range(1500):  # degenerated tree, deeper than the recursion limit
+            bt[i] = i
+
+        self.assertEqual([k for k, _ in bt], list(range(1500)))
+        self.assertEqual(len(list(bt._preorder_traversal(bt._root))), 1500)
+        self.assertEqual([node.get_key() for node in bt._postorder_traversal(bt._root)], list(range(1499, -1, -1)))
+
+    def test_threading(self):
+        bt = BinarySearchTree(enable_threading=True)
+        control = dict()
+
+        for i in range(5000):
+            key = random.randint(0, 2000)
+
+            if random.randint(0, 100) > 60 and key in control:
+                del bt[key]
+                del control[key]
+            else:
+                bt[key] = i
+                control[key] = i
+
+        self.assert_match(bt, control)
+        self.assert_threaded(bt)
+
+        keys = sorted(control)
+        self.assertEqual(bt[keys[10]:keys[50]], [(k, control[k]) for k in keys[10:50]])
+        self.assertEqual(bt.find_gt(keys[10]), (keys[11], control[keys[11]]))
+        self.assertEqual(bt.find_st(keys[10]), (keys[9], control[keys[9]]))
+
+        bt = BinarySearchTree.from_sorted([(i, i) for i in range(100)], enable_threading=True)
+        self.assert_threaded(bt)
+
+        bt.update([(i, i) for i in range(100, 300, 2)])
+        self.assert_threaded(bt)
+
+    def assert_threaded(self, bt):
+        nodes = list(bt._inorder_traversal(bt._root))
+
+        for i, node in enumerate(nodes):
+            self.assertIs(node.get_prev(), nodes[i - 1] if i > 0 else None)
+            self.assertIs(node.get_next(), nodes[i + 1] if i + 1 < len(nodes) else None)
+
+    def test_rank_and_count_in_range(self):
+        bt = BinarySearchTree()
+        keys = sorted(random.sample(range(0, 2000, 2), 300))
+
+        for key in keys:
+            bt[key] = key
+
+        for key in range(-1, 2001, 7):
+            self.assertEqual(bt.bisect_left(key), bisect.bisect_left(keys, key))
+            self.assertEqual(bt.bisect_right(key), bisect.bisect_right(keys, key))
+            self.assertEqual(bt.rank(key), bisect.bisect_left(keys, key))
+
+        for i in range(0, 290, 13):
+            start, stop = keys[i], keys[i + 9]
+            for step in [1, 2, 4]:
+                self.assertEqual(bt.count_in_range(start, stop, step), len(bt[start:stop:step]))
+                self.assertEqual(bt.count_in_range(start, stop, step, inclusive=True),
+                                 len(bt.slice(start, stop, step, inclusive=True)))
+
+        self.assertEqual(bt.count_in_range(None, None), len(keys))
+        self.assertEqual(bt.count_in_range(None, keys[5]), 5)
+        self.assertEqual(bt.count_in_range(keys[5], None), len(keys) - 5)
+        self.assertEqual(bt.count_in_range(keys[0] + 1, keys[2] + 1), 2)
+        self.assertRaises(ValueError, bt.count_in_range, 10, 5)
+
+    def test_slice_by_index(self):
+        keys = sorted(random.sample(range(5000), 1000))
+        bt = BinarySearchTree.from_sorted((k, -k) for k in keys)
+        pairs = [(k, -k) for k in keys]
+
+        for start, stop, step in [(None, None, 1), (10, 20, 1), (500, 600, 3), (0, 1000, 97), (-50, None, 1),
+                                  (None, -900, 2), (990, 2000, 1), (20, 10, 1), (None, None, -1), (900, 100, -7),
+                                  (800, 10, -200)]:
+            self.assertEqual(bt.slice_by_index(start, stop, step), pairs[start:stop:step])
+
+        self.assertEqual(BinarySearchTree().slice_by_index(), [])
+
+    def test_set_operations(self):
+        mine = {k: k for k in random.sample(range(2000), 500)}
+        theirs = {k: -k for k in random.sample(range(2000), 700)}
+
+        bt = BinarySearchTree.bulk_load(mine.items())
+        other = BinarySearchTree.bulk_load(theirs.items())
+
+        union = bt.union(other)
+        self.assertEqual(list(union), sorted({**mine, **theirs}.items()))
+
+        union = bt.union(other, merge_values=lambda value, other_value: value + other_value)
+        self.assertEqual(list(union), sorted({k: mine.get(k, 0) + theirs.get(k, 0)
+                                              for k in set(mine) | set(theirs)}.items()))
+
+        intersection = bt.intersection(other)
+        self.assertEqual(list(intersection), sorted((k, mine[k]) for k in set(mine) & set(theirs)))
+
+        intersection = bt.intersection(other, merge_values=lambda value, other_value: other_value)
+        self.assertEqual(list(intersection), sorted((k, theirs[k]) for k in set(mine) & set(theirs)))
+
+        difference = bt.difference(other)
+        self.assertEqual(list(difference), sorted((k, mine[k]) for k in set(mine) - set(theirs)))
+
+        # the operands are left untouched
+        self.assertEqual(list(bt), sorted(mine.items()))
+        self.assertEqual(list(other), sorted(theirs.items()))
+
+        self.assertEqual(len(BinarySearchTree().union(BinarySearchTree())), 0)
+        self.assertEqual(list(bt.difference(BinarySearchTree())), sorted(mine.items()))
+
+        # a small tree against a large one searches the keys of the small one
+        small = BinarySearchTree.bulk_load((k, None) for k in [5, 1000, 3000])
+        merge = lambda value, other_value: (value, other_value)
+
+        self.assertEqual(list(small.intersection(bt, merge)), [(k, (None, k)) for k in [5, 1000] if k in mine])
+        self.assertEqual(list(bt.intersection(small, merge)), [(k, (k, None)) for k in [5, 1000] if k in mine])
+        self.assertEqual(list(small.difference(bt)), [(k, None) for k in [5, 1000, 3000] if k not in mine])
+        self.assertEqual(list(bt.difference(small)), sorted((k, k) for k in mine if k not in (5, 1000)))
+
+        # consuming empties both operands
+        union = bt.union(small, consume=True)
+        self.assertEqual(len(union), len(set(mine) | {5, 1000, 3000}))
+        self.assertEqual((len(bt), len(small)), (0, 0))
+
+    def test_delete_range(self):
+        keys = random.sample(range(1000), 400)
+
+        for start, stop, inclusive in [(None, None, False), (100, 110, False), (100, 900, True), (None, 500, False),
+                                       (990, None, False), (2000, 3000, False)]:
+            bt = BinarySearchTree.bulk_load((k, k) for k in keys)
+            expected = sorted(k for k in keys if not ((start is None or k >= start) and
+                                                       (stop is None or k < stop or (inclusive and k == stop))))
+
+            self.assertEqual(bt.delete_range(start, stop, inclusive), len(keys) - len(expected))
+            self.assertEqual([k for k, _ in bt], expected)
+            self.assertEqual(len(bt), len(expected))
+
+        bt = BinarySearchTree.bulk_load((k, k) for k in keys)
+        del bt[200:300]
+        self.assertEqual([k for k, _ in bt], sorted(k for k in keys if not 200 <= k < 300))
+        self.assertRaises(ValueError, bt.__delitem__, slice(0, 100, 2))
+
+    def test_get_many(self):
+        keys = random.sample(range(2000), 500)
+        bt = BinarySearchTree.bulk_load((k, -k) for k in keys)
+        queries = [random.randint(-10, 2010) for _ in range(3000)]
+
+        self.assertEqual(bt.get_many(queries), [bt[q] for q in queries])
+        self.assertEqual(bt.get_many(queries, default=1), [-q if q in keys else 1 for q in queries])
+        self.assertEqual(bt.contains_many(queries), [q in keys for q in queries])
+
+        self.assertEqual(bt.get_many([]), [])
+        self.assertEqual(BinarySearchTree().get_many([1, 2]), [None, None])
+        self.assertEqual(BinarySearchTree().contains_many((1, 2)), [False, False])
+
+    def test_find_many(self):
+        keys = sorted(random.sample(range(0, 2000, 2), 300))
+        bt = BinarySearchTree.bulk_load((k, -k) for k in keys)
+        queries = [random.randint(-10, 2010) for _ in range(2000)]
+
+        self.assertEqual(bt.find_gt_many(queries), [bt.find_gt(q) for q in queries])
+        self.assertEqual(bt.find_gte_many(queries), [bt.find_gte(q) for q in queries])
+        self.assertEqual(bt.find_st_many(queries), [bt.find_st(q) for q in queries])
+        self.assertEqual(bt.find_ste_many(queries), [bt.find_ste(q) for q in queries])
+
+        self.assertEqual(bt.find_gt_many([keys[-1], keys[0]]), [(None, None), (keys[1], -keys[1])])
+        self.assertEqual(BinarySearchTree().find_ste_many([1]), [(None, None)])
+        self.assertEqual(bt.find_gte_many([]), [])
+
+    def test_array_export(self):
+        keys = random.sample(range(1000), 300)
+        bt = BinarySearchTree.bulk_load((k, k / 2) for k in keys)
+
+        self.assertEqual(list(bt.keys_array()), sorted(keys))
+        self.assertEqual(list(bt.keys_array(dtype="q")), sorted(keys))
+        self.assertEqual(list(bt.values_array(dtype="d")), [k / 2 for k in sorted(keys)])
+
+        range_keys, range_values = bt.items_arrays(100, 500, key_dtype="q", value_dtype="d")
+        self.assertEqual(list(range_keys), [k for k in sorted(keys) if 100 <= k < 500])
+        self.assertEqual(list(range_values), [k / 2 for k in sorted(keys) if 100 <= k < 500])
+
+        copy = BinarySearchTree.from_arrays(bt.keys_array(dtype="q"), bt.values_array(dtype="d"))
+        self.assertEqual(list(copy), list(bt))
+        self.assertEqual(list(BinarySearchTree.from_arrays([3, 1, 2], ["c", "a", "b"])), [(1, "a"), (2, "b"), (3, "c")])
+        self.assertRaises(ValueError, BinarySearchTree.from_arrays, [1, 2], [1])
+
+        self.assertEqual(len(BinarySearchTree().keys_array()), 0)
+
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_numpy_array_export(self):
+        keys = random.sample(range(1000), 300)
+        bt = BinarySearchTree.bulk_load((k, (k, str(k))) for k in keys)
+
+        keys_array = bt.keys_array()
+        self.assertIsInstance(keys_array, numpy.ndarray)
+        self.assertEqual(keys_array.dtype, numpy.dtype(object))
+        self.assertEqual(keys_array.tolist(), sorted(keys))
+
+        # tuple values are stored as objects, not unpacked in a second dimension
+        values_array = bt.values_array()
+        self.assertEqual(values_array.shape, (300,))
+        self.assertEqual(values_array[0], (min(keys), str(min(keys))))
+
+        range_keys, range_values = bt.items_arrays(100, 500, key_dtype=numpy.int64, value_dtype=object)
+        self.assertEqual(range_keys.dtype, numpy.int64)
+        self.assertEqual(range_keys.tolist(), [k for k in sorted(keys) if 100 <= k < 500])
+        self.assertEqual(len(range_values), len(range_keys))
+
+        copy = BinarySearchTree.from_arrays(bt.keys_array(dtype="q"), bt.values_array())
+        self.assertEqual(list(copy), list(bt))
+        self.assertEqual(len(BinarySearchTree().keys_array()), 0)
+
+    def test_dump_and_load(self):
+        # a degenerate tree, deeper than the recursion limit
+        bt = BinarySearchTree(enable_threading=True)
+        for i in range(3000):
+            bt[i] = str(i)
+
+        buffer = io.BytesIO()
+        bt.dump(buffer)
+        buffer.seek(0)
+        loaded = BinarySearchTree.load(buffer)
+
+        self.assertEqual(list(loaded), list(bt))
+        self.assertTrue(loaded._enable_threading)
+        self.assertLessEqual(loaded.height(), 12)
+        self.assertEqual(loaded.at_index(1500), (1500, "1500"))
+
+        copy = pickle.loads(pickle.dumps(bt))
+        self.assertEqual(list(copy), list(bt))
+        self.assertEqual(copy[1000:1003], [(1000, "1000"), (1001, "1001"), (1002, "1002")])
+
+        self.assertEqual(len(pickle.loads(pickle.dumps(BinarySearchTree()))), 0)
+        self.assertRaises(ValueError, BinarySearchTree.load, io.BytesIO(b"not a dump"))
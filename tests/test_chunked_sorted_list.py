@@ -0,0 +1,134 @@
+import bisect
+import random
+import unittest
+
+from pymaps import ChunkedSortedList
+
+
+class TestChunkedSortedList(unittest.TestCase):
+
+    def test_general_insertions(self):
+        sl = ChunkedSortedList(load_factor=4)
+
+        for e in [1, 3, 2, 1, 5, 6, 3]:
+            sl.append(e)
+
+        self.assertEqual([x for x in sl], [1, 1, 2, 3, 3, 5, 6])
+        self.assertEqual(len(sl), 7)
+
+        self.assertEqual([sl.at_index(i) for i in range(7)], [1, 1, 2, 3, 3, 5, 6])
+        self.assertEqual(sl.at_index(-1), 6)
+
+        self.assertEqual(sl.index_of(1), 0)
+        self.assertEqual(sl.index_of(3), 3)
+        self.assertEqual(sl.index_of(6), 6)
+        self.assertIsNone(sl.index_of(4))
+        self.assertIsNone(sl.index_of(7))
+
+        self.assertEqual(sl.get_min(), 1)
+        self.assertEqual(sl.get_max(), 6)
+
+        self.assertEqual(sl.find_st(1), None)
+        self.assertEqual(sl.find_ste(1), 1)
+        self.assertEqual(sl.find_gt(6), None)
+        self.assertEqual(sl.find_gte(6), 6)
+        self.assertEqual(sl.find_gt(3), 5)
+        self.assertEqual(sl.find_st(3), 2)
+
+        self.assertEqual(sl[0], 1)
+        self.assertEqual(sl[3], 3)
+
+    def test_random_operations(self):
+        sl = ChunkedSortedList(load_factor=8)
+        array = []
+
+        for i in range(5000):
+            action = random.randint(0, 100)
+
+            if action > 80 and array:
+                index = random.randrange(len(array))
+                del sl[index]
+                del array[index]
+            elif action > 70 and array:
+                self.assertEqual(sl.pop(), array.pop())
+            elif action > 65 and array:
+                element = random.choice(array)
+                sl.remove(element)
+                array.remove(element)
+            else:
+                element = random.randint(0, 200)
+                sl.append(element)
+                bisect.insort(array, element)
+
+        self.assertEqual(list(sl), array)
+        self.assertEqual(len(sl), len(array))
+        self.assertEqual([sl.at_index(i) for i in range(len(array))], array)
+
+        for e in range(-1, 202, 3):
+            self.assertEqual(sl.bisect_left(e), bisect.bisect_left(array, e))
+            self.assertEqual(sl.bisect_right(e), bisect.bisect_right(array, e))
+
+            i = bisect.bisect_right(array, e)
+            self.assertEqual(sl.find_gt(e), array[i] if i < len(array) else None)
+            self.assertEqual(sl.find_ste(e), array[i - 1] if i > 0 else None)
+            i = bisect.bisect_left(array, e)
+            self.assertEqual(sl.find_gte(e), array[i] if i < len(array) else None)
+            self.assertEqual(sl.find_st(e), array[i - 1] if i > 0 else None)
+
+    def test_slice(self):
+        array = sorted(random.randint(0, 100) for _ in range(500))
+        sl = ChunkedSortedList.from_sorted(array, load_factor=16)
+
+        self.assertEqual(list(sl), array)
+
+        for start, stop, step in [(None, None, 1), (10, 20, 1), (100, 400, 3), (0, 500, 37), (-50, None, 1),
+                                  (5, 6, 100), (490, 1000, 1), (3, 480, 17)]:
+            self.assertEqual(sl[start:stop:step], array[start:stop:step])
+            self.assertEqual(sl.slice_by_index(start, stop, step), array[start:stop:step])
+
+        self.assertEqual(sl.slice(10, 20), [e for e in array if 10 <= e < 20])
+        self.assertEqual(sl.slice(10, 20, inclusive=True), [e for e in array if 10 <= e <= 20])
+        self.assertEqual(sl.islice(10, 20), [e for e in array if e < 10 or e > 20])
+        self.assertEqual(sl.count_in_range(10, 20), len([e for e in array if 10 <= e < 20]))
+
+        del sl[100:200]
+        del array[100:200]
+        self.assertEqual(list(sl), array)
+
+        del sl[10:300:3]
+        del array[10:300:3]
+        self.assertEqual(list(sl), array)
+
+        sl[0] = 1000
+        self.assertEqual(sl.get_max(), 1000)
+
+        self.assertRaises(ValueError, ChunkedSortedList.from_sorted, [2, 1])
+
+    def test_update(self):
+        sl = ChunkedSortedList(load_factor=8)
+        array = []
+
+        for size in [1, 3, 200, 2, 500]:
+            batch = [random.randint(0, 50) for _ in range(size)]
+            sl.update(batch)
+            array.extend(batch)
+            array.sort()
+
+            self.assertEqual(list(sl), array)
+            self.assertEqual(sl[:], array)
+
+    def test_empty(self):
+        sl = ChunkedSortedList()
+
+        self.assertEqual(list(sl), [])
+        self.assertEqual(sl[:], [])
+        self.assertRaises(ValueError, sl.get_min)
+        self.assertRaises(ValueError, sl.pop)
+        self.assertRaises(ValueError, sl.at_index, 0)
+        self.assertIsNone(sl.find_gt(1))
+        self.assertIsNone(sl.find_st(1))
+        self.assertEqual(sl.bisect_left(1), 0)
+
+        sl.append(1)
+        sl.clear()
+        self.assertEqual(len(sl), 0)
@@ -0,0 +1,143 @@
+import random
+import threading
+import unittest
+
+from pymaps import AVLTree, ConcurrentSortedMap, PersistentAVLTree, SplayTree
+from pymaps.adapters.ConcurrentSortedMap import ReadWriteLock
+
+
+class TestConcurrentSortedMap(unittest.TestCase):
+
+    def test_map_api(self):
+        cm = ConcurrentSortedMap()
+
+        for i in range(100):
+            cm[i] = -i
+
+        self.assertEqual(cm[10], -10)
+        self.assertTrue(10 in cm)
+        self.assertEqual(len(cm), 100)
+        self.assertEqual(cm[10:13], [(10, -10), (11, -11), (12, -12)])
+        self.assertEqual(cm.find_gt(10), (11, -11))
+        self.assertEqual(cm.at_index(-1), (99, -99))
+        self.assertEqual(cm.get_many([1, 200]), [-1, None])
+
+        del cm[10]
+        self.assertFalse(10 in cm)
+
+        cm.update({200: 0, 201: 1})
+        self.assertEqual(cm.get_max(), (201, 1))
+        self.assertEqual(list(cm)[:2], [(0, 0), (1, -1)])
+
+        cm.clear()
+        self.assertEqual(len(cm), 0)
+
+    def test_snapshot_reads(self):
+        cm = ConcurrentSortedMap()
+        cm.update((i, i) for i in range(10))
+
+        # an iteration runs on the version published when it started
+        iterator = iter(cm)
+        cm[100] = 100
+        del cm[0]
+
+        self.assertEqual([key for key, _ in iterator], list(range(10)))
+        self.assertEqual([key for key, _ in cm], list(range(1, 10)) + [100])
+
+    def test_batch(self):
+        cm = ConcurrentSortedMap(AVLTree.from_sorted((i, i) for i in range(10)))
+
+        with cm.batch() as batch:
+            batch[100] = 100
+            del batch[0]
+            self.assertTrue(0 in cm)
+            self.assertFalse(100 in cm)
+
+        self.assertFalse(0 in cm)
+        self.assertEqual(cm[100], 100)
+
+        with self.assertRaises(KeyError):
+            with cm.batch() as batch:
+                batch[200] = 200
+                raise KeyError()
+
+        self.assertFalse(200 in cm)
+
+    def test_failed_batch(self):
+        for tree in (PersistentAVLTree(), AVLTree(), SplayTree()):
+            cm = ConcurrentSortedMap(tree)
+            cm[1] = 1
+            cm[3] = 3
+
+            # the third write cannot compare its key with the others, the first two are rolled back
+            with self.assertRaises(TypeError):
+                with cm.batch() as batch:
+                    batch[2] = 2
+                    del batch[3]
+                    batch["x"] = 4
+
+            self.assertEqual(list(cm), [(1, 1), (3, 3)])
+            self.assertEqual(len(cm), 2)
+
+            cm[4] = 4
+            self.assertEqual(cm[1:10], [(1, 1), (3, 3), (4, 4)])
+
+    def test_concurrent_reads_and_writes(self):
+        for tree in (PersistentAVLTree(), AVLTree(), SplayTree()):
+            cm = ConcurrentSortedMap(tree)
+            errors = []
+
+            def write():
+                for i in range(3000):
+                    key = random.randint(0, 500)
+                    if random.random() < 0.3:
+                        del cm[key]
+                    else:
+                        cm[key] = key * 2
+
+            def read():
+                try:
+                    for _ in range(3000):
+                        key = random.randint(0, 500)
+                        value = cm[key]
+                        if value is not None and value != key * 2:
+                            errors.append((key, value))
+                        found = cm.find_gte(key)[0]
+                        if found is not None and found < key:
+                            errors.append((key, found))
+                        cm[key:key + 10]
+                except Exception as error:
+                    errors.append(error)
+
+            threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(errors, [])
+            keys = [key for key, _ in cm]
+            self.assertEqual(keys, sorted(set(keys)))
+            self.assertEqual(len(keys), len(cm))
+
+    def test_read_write_lock(self):
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        lock.acquire_read()
+
+        acquired = threading.Event()
+
+        def write():
+            with lock.writing():
+                acquired.set()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+
+        self.assertFalse(acquired.wait(0.05))
+        lock.release_read()
+        self.assertFalse(acquired.wait(0.05))
+        lock.release_read()
+
+        writer.join()
+        self.assertTrue(acquired.is_set())
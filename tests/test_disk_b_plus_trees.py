@@ -0,0 +1,106 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+from pymaps import BPlusTree, DiskBPlusTree
+
+
+class TestDiskBPlusTrees(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tree.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_as_memory_tree(self):
+        keys = random.sample(range(0, 20000, 2), 5000)
+
+        for order, cache_size in [(4, 0), (16, 8), (128, 1024)]:
+            with DiskBPlusTree.bulk_load(self.path, ((k, str(k)) for k in keys), order=order, page_size=512,
+                                         cache_size=cache_size) as dt:
+                bt = BPlusTree.bulk_load(((k, str(k)) for k in keys), order=order)
+
+                self.assertEqual(list(dt), list(bt))
+                self.assertEqual(len(dt), len(bt))
+                self.assertEqual(dt.get_min(), bt.get_min())
+                self.assertEqual(dt.get_max(), bt.get_max())
+
+                for query in random.sample(range(-5, 20005), 300):
+                    self.assertEqual(dt[query], bt[query])
+                    self.assertEqual(query in dt, query in bt)
+                    self.assertEqual(dt.find_gt(query), bt.find_gt(query))
+                    self.assertEqual(dt.find_gte(query), bt.find_gte(query))
+                    self.assertEqual(dt.find_st(query), bt.find_st(query))
+                    self.assertEqual(dt.find_ste(query), bt.find_ste(query))
+                    self.assertEqual(dt.index_of(query), bt.index_of(query))
+
+                for start, stop, step, inclusive in [(None, None, 1, False), (100, 2000, 1, False),
+                                                     (100, 2000, 7, True), (19990, None, 1, False)]:
+                    self.assertEqual(dt.slice(start, stop, step, inclusive), bt.slice(start, stop, step, inclusive))
+                    self.assertEqual(dt.islice(start, stop, step, inclusive), bt.islice(start, stop, step, inclusive))
+                    self.assertEqual(dt.count_in_range(start, stop, step, inclusive),
+                                     bt.count_in_range(start, stop, step, inclusive))
+
+                for index in [0, 1, 2500, -1, -4999]:
+                    self.assertEqual(dt.at_index(index), bt.at_index(index))
+
+                self.assertLessEqual(len(dt._cache), cache_size)
+
+    def test_reopen(self):
+        DiskBPlusTree.from_sorted(self.path, [(1, "a"), (2, "b"), (2, "c"), (3, "d")]).close()
+
+        with DiskBPlusTree(self.path) as dt:
+            self.assertEqual(list(dt), [(1, "a"), (2, "c"), (3, "d")])
+            self.assertRaises(TypeError, dt.__setitem__, 4, "e")
+            self.assertRaises(TypeError, dt.clear)
+
+        self.assertRaises(ValueError, DiskBPlusTree.from_sorted, self.path, [(2, 2), (1, 1)])
+        self.assertRaises(ValueError, DiskBPlusTree.from_sorted, self.path, [(1, 1)], page_size=32)
+
+        # the smallest page size, where nodes span several pages
+        with DiskBPlusTree.from_sorted(self.path, [(i, i) for i in range(100)], order=4, page_size=48) as dt:
+            self.assertEqual(list(dt), [(i, i) for i in range(100)])
+
+        # a key repeated across a full leaf keeps its last value
+        items = [(i, i) for i in range(4)] + [(3, "last"), (4, 4)]
+        with DiskBPlusTree.from_sorted(self.path, items, order=4) as dt:
+            self.assertEqual(list(dt), [(0, 0), (1, 1), (2, 2), (3, "last"), (4, 4)])
+
+        with open(self.path, "wb") as file:
+            file.write(bytes(4096))
+        self.assertRaises(ValueError, DiskBPlusTree, self.path)
+
+    def test_concurrent_reads(self):
+        keys = list(range(5000))
+        errors = []
+
+        with DiskBPlusTree.from_sorted(self.path, ((k, k) for k in keys), order=8, page_size=64, cache_size=4) as dt:
+
+            def read():
+                try:
+                    for _ in range(3):
+                        self.assertEqual(list(dt), [(k, k) for k in keys])
+                except BaseException as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=read) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+
+    def test_empty(self):
+        with DiskBPlusTree.from_sorted(self.path, []) as dt:
+            self.assertEqual(len(dt), 0)
+            self.assertEqual(list(dt), [])
+            self.assertEqual(dt[:], [])
+            self.assertIsNone(dt[1])
+            self.assertEqual(dt.find_gt(1), (None, None))
+            self.assertEqual(dt.bisect_left(1), 0)
+            self.assertRaises(ValueError, dt.get_min)
@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from pymaps import AVLTree, FrozenSortedMap
+
+
+class TestFrozenSortedMap(unittest.TestCase):
+
+    def test_freeze(self):
+        keys = random.sample(range(0, 4000, 2), 800)
+        bt = AVLTree.bulk_load((k, -k) for k in keys)
+        frozen = bt.freeze()
+
+        self.assertEqual(list(frozen), list(bt))
+        self.assertEqual(len(frozen), len(bt))
+
+        for query in range(-5, 4005, 3):
+            self.assertEqual(frozen[query], bt[query])
+            self.assertEqual(query in frozen, query in bt)
+            self.assertEqual(frozen.find_gt(query), bt.find_gt(query))
+            self.assertEqual(frozen.find_gte(query), bt.find_gte(query))
+            self.assertEqual(frozen.find_st(query), bt.find_st(query))
+            self.assertEqual(frozen.find_ste(query), bt.find_ste(query))
+            self.assertEqual(frozen.index_of(query), bt.index_of(query))
+            self.assertEqual(frozen.rank(query), bt.rank(query))
+
+        for i in range(-len(keys), len(keys)):
+            self.assertEqual(frozen.at_index(i), bt.at_index(i))
+
+        for start, stop, step, inclusive in [(None, None, 1, False), (100, 200, 1, False), (100, 200, 3, True),
+                                             (101, 101, 1, True), (3000, None, 2, False)]:
+            self.assertEqual(frozen.slice(start, stop, step, inclusive), bt.slice(start, stop, step, inclusive))
+            self.assertEqual(frozen.count_in_range(start, stop, step, inclusive),
+                             bt.count_in_range(start, stop, step, inclusive))
+
+        self.assertEqual(frozen[100:200], bt[100:200])
+        self.assertEqual(frozen.islice(1000, 3000), [(k, v) for k, v in bt if k < 1000 or k > 3000])
+        self.assertEqual(frozen.slice_by_index(10, 20), bt.slice_by_index(10, 20))
+        self.assertEqual(frozen.get_min(), bt.get_min())
+        self.assertEqual(frozen.get_max(), bt.get_max())
+        self.assertEqual(frozen.get_many([2, 3, keys[0]]), bt.get_many([2, 3, keys[0]]))
+
+        # the frozen map is a copy
+        bt[1] = 1
+        self.assertFalse(1 in frozen)
+
+    def test_immutable(self):
+        frozen = FrozenSortedMap.bulk_load({3: "c", 1: "a", 2: "b"})
+
+        self.assertEqual(list(frozen), [(1, "a"), (2, "b"), (3, "c")])
+        self.assertRaises(TypeError, frozen.__setitem__, 4, "d")
+        self.assertRaises(TypeError, frozen.__delitem__, 1)
+        self.assertRaises(TypeError, frozen.clear)
+
+        self.assertRaises(ValueError, FrozenSortedMap, [2, 1], ["b", "a"])
+        self.assertRaises(ValueError, FrozenSortedMap().get_min)
+        self.assertRaises(ValueError, frozen.at_index, 3)
+        self.assertEqual(FrozenSortedMap.from_sorted([(1, 1), (1, 2)]).get_max(), (1, 2))
@@ -0,0 +1,153 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from pymaps import AVLTree, LSMSortedMap
+
+
+class TestLSMSortedMap(unittest.TestCase):
+
+    def check_same(self, lsm, reference):
+        self.assertEqual(list(lsm), list(reference))
+        self.assertEqual(len(lsm), len(reference))
+        self.assertEqual(lsm.slice(100, 300), reference.slice(100, 300))
+        self.assertEqual(lsm.slice(100, 300, 3, inclusive=True), reference.slice(100, 300, 3, inclusive=True))
+        self.assertEqual(lsm.islice(100, 300), [(k, v) for k, v in reference if k < 100 or 300 < k])
+
+        for key in random.sample(range(-10, 1010), 200):
+            self.assertEqual(lsm[key], reference[key])
+            self.assertEqual(key in lsm, key in reference)
+            self.assertEqual(lsm.find_gt(key), reference.find_gt(key))
+            self.assertEqual(lsm.find_gte(key), reference.find_gte(key))
+            self.assertEqual(lsm.find_st(key), reference.find_st(key))
+            self.assertEqual(lsm.find_ste(key), reference.find_ste(key))
+
+        if len(reference) > 0:
+            self.assertEqual(lsm.get_min(), reference.get_min())
+            self.assertEqual(lsm.get_max(), reference.get_max())
+
+    def random_writes(self, lsm, reference, count):
+        for _ in range(count):
+            key = random.randrange(1000)
+
+            if random.random() < 0.3:
+                del lsm[key]
+                if key in reference:
+                    del reference[key]
+            else:
+                value = random.random()
+                lsm[key] = value
+                reference[key] = value
+
+    def test_same_as_avl_tree(self):
+        lsm = LSMSortedMap(memtable_size=50, max_runs=4)
+        reference = AVLTree()
+
+        self.random_writes(lsm, reference, 3000)
+        self.check_same(lsm, reference)
+
+        lsm.flush()
+        lsm.compact()
+        self.assertEqual(len(lsm._runs), 1)
+        self.assertEqual(len(lsm._memtable), 0)
+        self.check_same(lsm, reference)
+
+    def test_tombstones(self):
+        lsm = LSMSortedMap(memtable_size=4)
+
+        for i in range(8):
+            lsm[i] = i
+
+        del lsm[0]
+        del lsm[7]
+        del lsm[3]
+
+        self.assertFalse(0 in lsm)
+        self.assertIsNone(lsm[3])
+        self.assertEqual(lsm.get_min(), (1, 1))
+        self.assertEqual(lsm.get_max(), (6, 6))
+        self.assertEqual(lsm.find_gt(2), (4, 4))
+        self.assertEqual(lsm.find_st(4), (2, 2))
+        self.assertEqual(lsm[:], [(1, 1), (2, 2), (4, 4), (5, 5), (6, 6)])
+
+        lsm[3] = None
+        self.assertTrue(3 in lsm)
+
+        for i in range(8):
+            del lsm[i]
+
+        self.assertEqual(len(lsm), 0)
+        self.assertEqual(lsm.find_gte(0), (None, None))
+        self.assertRaises(ValueError, lsm.get_min)
+
+        lsm.flush()
+        lsm.compact()
+        self.assertEqual(len(lsm._runs[0]), 0)
+
+    def test_disk_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            lsm = LSMSortedMap(memtable_size=100, max_runs=3, directory=directory)
+            reference = AVLTree()
+
+            self.random_writes(lsm, reference, 2000)
+            self.check_same(lsm, reference)
+
+            lsm.flush()
+            lsm.compact()
+            lsm.flush()  # deletes the files of the compacted runs
+            self.assertEqual(len(os.listdir(directory)), 1)
+            self.check_same(lsm, reference)
+
+            lsm.clear()
+            self.assertEqual(os.listdir(directory), [])
+            self.assertEqual(list(lsm), [])
+            lsm.close()
+
+    def test_shared_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = LSMSortedMap(memtable_size=10, directory=directory)
+            second = LSMSortedMap(memtable_size=10, directory=directory)
+
+            for i in range(100):
+                first[i] = "first"
+                second[i] = "second"
+
+            self.assertEqual(list(first), [(i, "first") for i in range(100)])
+            self.assertEqual(list(second), [(i, "second") for i in range(100)])
+            self.assertEqual(len(os.listdir(directory)), len(first._runs) + len(second._runs))
+
+            first.close()
+            second.close()
+
+    def test_background_compaction(self):
+        lsm = LSMSortedMap(memtable_size=20, max_runs=2, background=True)
+        reference = AVLTree()
+
+        for _ in range(5):
+            self.random_writes(lsm, reference, 500)
+            self.check_same(lsm, reference)
+
+        lsm.wait_for_compaction()
+        self.check_same(lsm, reference)
+        lsm.close()
+
+    def test_failed_background_compaction(self):
+        lsm = LSMSortedMap(memtable_size=10, max_runs=100)
+        for i in range(100):
+            lsm[i] = i
+
+        with mock.patch.object(LSMSortedMap, "_merge", side_effect=OSError()), \
+                mock.patch.object(threading, "excepthook", lambda args: None, create=True):
+            lsm.compact(wait=False)
+            lsm.wait_for_compaction()
+
+        self.assertIsNone(lsm._compaction)
+        self.assertEqual(len(lsm._runs), 10)
+
+        lsm.compact(wait=False)
+        lsm.wait_for_compaction()
+        self.assertEqual(len(lsm._runs), 1)
+        self.assertEqual(list(lsm), [(i, i) for i in range(100)])
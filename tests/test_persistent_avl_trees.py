@@ -0,0 +1,113 @@
+import random
+import unittest
+
+from pymaps import AVLTree, PersistentAVLTree
+
+
+class TestPersistentAvlTrees(unittest.TestCase):
+
+    def assert_balanced(self, node):
+        if node is None:
+            return 0
+
+        left_height = self.assert_balanced(node.get_child(True))
+        right_height = self.assert_balanced(node.get_child(False))
+
+        self.assertLessEqual(abs(left_height - right_height), 1)
+        self.assertEqual(node.get_height(), 1 + max(left_height, right_height))
+
+        return node.get_height()
+
+    def test_random_inserts_and_delete(self):
+        bt = PersistentAVLTree()
+        control = dict()
+
+        for i in range(5000):
+            key = random.randint(0, 1000)
+
+            if random.random() < 0.4 and key in control:
+                del bt[key]
+                del control[key]
+            else:
+                bt[key] = i
+                control[key] = i
+
+            self.assertEqual(bt[key], control.get(key))
+
+        self.assert_balanced(bt._root)
+        self.assertEqual(list(bt), sorted(control.items()))
+        self.assertEqual(len(bt), len(control))
+
+        del bt[-1]
+        self.assertEqual(len(bt), len(control))
+
+    def test_snapshots(self):
+        bt = PersistentAVLTree.from_sorted((i, i) for i in range(100))
+        versions = [(bt.snapshot(), dict((i, i) for i in range(100)))]
+        control = dict(versions[0][1])
+
+        for step in range(50):
+            for _ in range(20):
+                key = random.randint(0, 200)
+                if random.random() < 0.5:
+                    del bt[key]
+                    control.pop(key, None)
+                else:
+                    bt[key] = step
+                    control[key] = step
+
+            versions.append((bt.snapshot(), dict(control)))
+
+        for snapshot, expected in versions:
+            self.assertEqual(list(snapshot), sorted(expected.items()))
+            self.assert_balanced(snapshot._root)
+
+        # a snapshot is writable, without touching the tree it was taken from
+        snapshot, expected = versions[0]
+        snapshot[1000] = 1000
+        self.assertNotIn(1000, versions[1][0])
+        self.assertIn(1000, snapshot)
+
+    def test_read_api(self):
+        keys = random.sample(range(0, 4000, 2), 800)
+        pt = PersistentAVLTree.bulk_load((k, -k) for k in keys)
+        bt = AVLTree.bulk_load((k, -k) for k in keys)
+
+        for query in range(-5, 4005, 7):
+            self.assertEqual(pt[query], bt[query])
+            self.assertEqual(pt.find_gt(query), bt.find_gt(query))
+            self.assertEqual(pt.find_gte(query), bt.find_gte(query))
+            self.assertEqual(pt.find_st(query), bt.find_st(query))
+            self.assertEqual(pt.find_ste(query), bt.find_ste(query))
+            self.assertEqual(pt.index_of(query), bt.index_of(query))
+            self.assertEqual(pt.bisect_right(query), bt.bisect_right(query))
+
+        for i in range(-len(keys), len(keys), 13):
+            self.assertEqual(pt.at_index(i), bt.at_index(i))
+
+        for start, stop, step, inclusive in [(None, None, 1, False), (100, 200, 1, False), (100, 200, 3, True),
+                                             (3000, None, 2, False)]:
+            self.assertEqual(pt.slice(start, stop, step, inclusive), bt.slice(start, stop, step, inclusive))
+            self.assertEqual(pt.count_in_range(start, stop, step, inclusive),
+                             bt.count_in_range(start, stop, step, inclusive))
+
+        for start, stop, step in [(None, None, 1), (10, 20, 1), (500, 600, 3), (-50, None, 1), (None, None, -1),
+                                  (700, 100, -7), (20, 10, 1)]:
+            self.assertEqual(pt.slice_by_index(start, stop, step), bt.slice_by_index(start, stop, step))
+
+        self.assertEqual(pt.islice(1000, 3000), [(k, v) for k, v in bt if k < 1000 or k > 3000])
+        self.assertEqual(pt.get_min(), bt.get_min())
+        self.assertEqual(pt.get_max(), bt.get_max())
+        self.assertEqual(list(pt.freeze()), list(bt))
+        self.assertRaises(ValueError, PersistentAVLTree().get_min)
+
+        queries = list(range(-5, 4005, 7))
+        self.assertEqual(pt.get_many(queries, -1), bt.get_many(queries, -1))
+        self.assertEqual(pt.contains_many(queries), bt.contains_many(queries))
+
+        snapshot = pt.snapshot()
+        pt.update({-1: -1, 5000: 5000})
+        bt.update({-1: -1, 5000: 5000})
+
+        self.assertEqual(list(pt), list(bt))
+        self.assertFalse(-1 in snapshot)
@@ -0,0 +1,99 @@
+import random
+import unittest
+
+from pymaps import RedBlackTree
+
+
+class TestRedBlackTrees(unittest.TestCase):
+
+    def test_ascending_insertions(self):
+        bt = RedBlackTree()
+
+        for i in range(100):
+            bt[i] = i
+
+        self.assert_red_black(bt)
+        self.assertEqual([k for k, _ in bt], list(range(100)))
+
+    def test_random_inserts_and_delete(self):
+        bt = RedBlackTree()
+        control = dict()
+
+        for i in range(10000):
+            key = random.randint(0, 2000)
+
+            if random.randint(0, 100) > 55 and key in control:
+                del bt[key]
+                del control[key]
+            else:
+                bt[key] = i
+                control[key] = i
+
+        self.assert_match(bt, control)
+        self.assert_red_black(bt)
+
+        for i, key in enumerate(sorted(control)):
+            self.assertEqual(bt.index_of(key), i)
+            self.assertEqual(bt.at_index(i), (key, control[key]))
+
+        for key in list(control):
+            del bt[key]
+
+        self.assertEqual(len(bt), 0)
+        self.assertIsNone(bt._root)
+
+    def test_threading(self):
+        bt = RedBlackTree(enable_threading=True)
+
+        for i in range(200):
+            bt[random.randint(0, 100)] = i
+            del bt[random.randint(0, 100)]
+
+        self.assertEqual(bt[:], list(bt))
+        self.assert_red_black(bt)
+
+    def test_from_sorted(self):
+        for size in [0, 1, 2, 3, 7, 8, 100]:
+            bt = RedBlackTree.from_sorted((i, i) for i in range(size))
+            self.assert_red_black(bt)
+
+            for i in range(size, size + 20):
+                bt[i] = i
+            for i in range(0, size, 2):
+                del bt[i]
+
+            self.assert_red_black(bt)
+
+    def assert_match(self, bt, control):
+        for k in control:
+            self.assertEqual(control[k], bt[k], "Control has a key that the tree doesn't")
+
+        self.assertEqual(list(bt), sorted(control.items()))
+        self.assertEqual(len(bt), len(control))
+
+    def assert_red_black(self, bt):
+        if bt._root is not None:
+            self.assertFalse(bt._root.is_red())
+        self.assert_red_black_node(bt._root)
+
+    def assert_red_black_node(self, node):
+        """
+        :return: the black height of the subtree
+        """
+        if node is None:
+            return 1
+
+        left, right = node.get_child(True), node.get_child(False)
+
+        if node.is_red():
+            self.assertFalse(left is not None and left.is_red())
+            self.assertFalse(right is not None and right.is_red())
+
+        left_height = self.assert_red_black_node(left)
+        right_height = self.assert_red_black_node(right)
+        self.assertEqual(left_height, right_height)
+
+        size = 1 + (left.get_subtree_size() if left else 0) + (right.get_subtree_size() if right else 0)
+        self.assertEqual(node.get_subtree_size(), size)
+
+        return left_height + (0 if node.is_red() else 1)
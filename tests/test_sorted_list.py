@@ -1,3 +1,7 @@
+import bisect
+import io
+import pickle
+import random
 import unittest
 
 from pymaps import AVLSortedList
@@ -102,3 +106,224 @@ class TestSortedList(unittest.TestCase):
         self.assertEqual(sl[::2], array[::2])
         self.assertEqual(sl[1:9:2], array[1:9:2])
         self.assertEqual(sl[-2:-1], array[-2:-1])
+
+    def test_from_sorted(self):
+        array = [1, 1, 2, 3, 3, 3, 5, 8, 8]
+
+        sl = AVLSortedList.from_sorted(array)
+
+        self.assertEqual(len(sl), len(array))
+        self.assertEqual([x for x in sl], array)
+        self.assertEqual(sl[:], array)
+        self.assertEqual(sl[::2], array[::2])
+
+        for i, e in enumerate(array):
+            self.assertEqual(sl.at_index(i), e)
+            self.assertEqual(sl.index_of(e), array.index(e))
+
+        sl.append(4)
+        array.append(4)
+        array.sort()
+
+        self.assertEqual(sl[:], array)
+
+        self.assertRaises(ValueError, AVLSortedList.from_sorted, [2, 1])
+
+    def test_bulk_load(self):
+        array = [5, 3, 1, 3, 8, 1, 2, 8, 3]
+
+        sl = AVLSortedList.bulk_load(array)
+
+        self.assertEqual(sl[:], sorted(array))
+        self.assertEqual(sl.get_min(), 1)
+        self.assertEqual(sl.get_max(), 8)
+
+    def test_update(self):
+        sl = AVLSortedList()
+        array = []
+
+        for size in [1, 3, 200, 2, 500]:
+            batch = [random.randint(0, 50) for _ in range(size)]
+            sl.update(batch)
+            array.extend(batch)
+            array.sort()
+
+            self.assertEqual(len(sl), len(array))
+            self.assertEqual(sl[:], array)
+            self.assertEqual([sl.at_index(i) for i in range(len(array))], array)
+
+    def test_threading(self):
+        sl = AVLSortedList(enable_threading=True)
+        array = [random.randint(0, 50) for _ in range(300)]
+
+        for e in array:
+            sl.append(e)
+
+        array.sort()
+
+        self.assertEqual(sl[:], array)
+        self.assertEqual(sl[3:200:7], array[3:200:7])
+        self.assertEqual(sl.find_gt(array[0]), min(e for e in array if e > array[0]))
+
+    def test_rank_and_count_in_range(self):
+        array = sorted(random.randint(0, 30) for _ in range(200))
+        sl = AVLSortedList.bulk_load(array)
+
+        for e in range(-1, 32):
+            self.assertEqual(sl.bisect_left(e), bisect.bisect_left(array, e))
+            self.assertEqual(sl.bisect_right(e), bisect.bisect_right(array, e))
+
+        self.assertEqual(sl.count_in_range(5, 10), len([e for e in array if 5 <= e < 10]))
+        self.assertEqual(sl.count_in_range(5, 10, inclusive=True), len([e for e in array if 5 <= e <= 10]))
+
+    def test_slice_by_index(self):
+        array = sorted(random.randint(0, 100) for _ in range(500))
+        sl = AVLSortedList.from_sorted(array)
+
+        for start, stop, step in [(None, None, 1), (10, 20, 1), (100, 400, 3), (0, 500, 37), (-50, None, 1),
+                                  (5, 6, 100), (490, 1000, 1)]:
+            self.assertEqual(sl.slice_by_index(start, stop, step), array[start:stop:step])
+            self.assertEqual(sl[start:stop:step], array[start:stop:step])
+
+    def test_delete_range(self):
+        elements = sorted(random.randint(0, 300) for _ in range(2000))
+
+        for start, stop, inclusive in [(None, None, False), (10, 20, False), (10, 20, True), (-5, 50, False),
+                                       (150, None, False), (None, 150, True), (299, 1000, False), (42, 42, True)]:
+            sl = AVLSortedList.from_sorted(elements, enable_threading=True)
+            expected = [e for e in elements if not ((start is None or e >= start) and
+                                                    (stop is None or e < stop or (inclusive and e == stop)))]
+
+            self.assertEqual(sl.delete_range(start, stop, inclusive), len(elements) - len(expected))
+            self.assertEqual(list(sl), expected)
+            self.assertEqual(len(sl), len(expected))
+            self.assertEqual(sl._node_count, len(set(expected)))
+            self.assertEqual(sl[0:len(expected)], expected)
+
+            if expected:
+                self.assertEqual(sl.at_index(-1), expected[-1])
+                self.assertEqual(sl.get_min(), expected[0])
+
+        sl = AVLSortedList.from_sorted([1, 1, 2, 2, 3, 3])
+        self.assertEqual(sl.delete_range(10, 20), 0)
+        self.assertEqual(sl._node_count, 3)
+        self.assertEqual(sl._item_count, 6)
+        self.assertEqual(list(sl), [1, 1, 2, 2, 3, 3])
+
+    def test_delete_by_index(self):
+        elements = sorted(random.randint(0, 100) for _ in range(1000))
+
+        for query in [slice(None), slice(10, 20), slice(0, 1), slice(100, 600), slice(-30, None), slice(500, 100),
+                      slice(3, 900, 7), slice(None, None, 2), slice(800, 10, -3), 5, -1, 0]:
+            sl = AVLSortedList.from_sorted(elements)
+            expected = list(elements)
+
+            del sl[query]
+            del expected[query]
+
+            self.assertEqual(list(sl), expected)
+            self.assertEqual(len(sl), len(expected))
+            self.assertEqual([sl.at_index(i) for i in range(len(expected))], expected)
+
+            sl.append(50)
+            bisect.insort(expected, 50)
+            self.assertEqual(list(sl), expected)
+
+    def test_find_many(self):
+        sl = AVLSortedList.bulk_load(random.randint(0, 100) * 2 for _ in range(500))
+        queries = [random.randint(-5, 205) for _ in range(500)]
+
+        self.assertEqual(sl.find_gt_many(queries), [sl.find_gt(q) for q in queries])
+        self.assertEqual(sl.find_gte_many(queries), [sl.find_gte(q) for q in queries])
+        self.assertEqual(sl.find_st_many(queries), [sl.find_st(q) for q in queries])
+        self.assertEqual(sl.find_ste_many(queries), [sl.find_ste(q) for q in queries])
+
+    def test_array_export(self):
+        elements = [random.randint(0, 100) for _ in range(500)]
+        sl = AVLSortedList.from_arrays(elements)
+
+        self.assertEqual(list(sl.elements_array()), sorted(elements))
+        self.assertEqual(list(sl.elements_array(dtype="q", start=20, stop=50, inclusive=True)),
+                         [e for e in sorted(elements) if 20 <= e <= 50])
+        self.assertEqual(list(sl.keys_array()), sorted(set(elements)))
+        self.assertEqual(list(sl.values_array()), [elements.count(e) for e in sorted(set(elements))])
+
+    def test_dump_and_load(self):
+        elements = [random.randint(0, 100) for _ in range(1000)]
+        sl = AVLSortedList.bulk_load(elements, enable_threading=True)
+
+        buffer = io.BytesIO()
+        sl.dump(buffer)
+        buffer.seek(0)
+        loaded = AVLSortedList.load(buffer)
+
+        self.assertEqual(list(loaded), sorted(elements))
+        self.assertEqual(len(loaded), len(elements))
+        self.assertEqual(loaded.at_index(500), sorted(elements)[500])
+
+        copy = pickle.loads(pickle.dumps(sl))
+        self.assertEqual(list(copy), sorted(elements))
+        self.assertTrue(copy._enable_threading)
+
+    def test_split_and_join(self):
+        for enable_threading in (False, True):
+            elements = sorted(random.randint(0, 100) for _ in range(500))
+            sl = AVLSortedList.from_sorted(elements, enable_threading=enable_threading)
+
+            left, right = sl.split(50)
+            self.assertEqual(len(sl), 0)
+            self.assertEqual(list(left), [e for e in elements if e < 50])
+            self.assertEqual(list(right), [e for e in elements if e >= 50])
+            self.assertEqual(len(left) + len(right), len(elements))
+            self.assertEqual(list(left.keys_array()), sorted(set(e for e in elements if e < 50)))
+            self.assertEqual(list(right.values_array()), [elements.count(e) for e in sorted(set(elements)) if e >= 50])
+
+            joined = AVLSortedList.join(left, right)
+            self.assertEqual(list(joined), elements)
+            self.assertEqual(len(joined), len(elements))
+            self.assertEqual(joined.at_index(250), elements[250])
+            self.assertEqual(len(left), 0)
+
+            joined.append(50)
+            self.assertEqual(list(joined), sorted(elements + [50]))
+
+            with self.assertRaises(ValueError):
+                AVLSortedList.join(AVLSortedList.bulk_load([1, 2]), AVLSortedList.bulk_load([2, 3]))
+
+    def test_set_operations(self):
+        from collections import Counter
+
+        for size in (10, 1000):
+            elements = [random.randint(0, 200) for _ in range(1000)]
+            other_elements = [random.randint(0, 200) for _ in range(size)]
+            counter, other_counter = Counter(elements), Counter(other_elements)
+
+            for operation, expected in (("union", counter + other_counter),
+                                        ("intersection", counter & other_counter),
+                                        ("difference", counter - other_counter)):
+                sl, other = AVLSortedList.bulk_load(elements), AVLSortedList.bulk_load(other_elements)
+                for first, second in ((sl, other), (other, sl)) if operation != "difference" else ((sl, other),):
+                    result = getattr(first, operation)(second)
+                    self.assertEqual(list(result), sorted(expected.elements()))
+                    self.assertEqual(len(result), sum(expected.values()))
+                    self.assertEqual(list(result.values_array()), [expected[e] for e in sorted(expected)])
+                    self.assertEqual(len(sl), len(elements))
+
+                getattr(other, operation)(sl, consume=True)
+                self.assertEqual(len(sl), 0)
+                self.assertEqual(len(other), 0)
+
+            small = AVLSortedList.bulk_load(other_elements)
+            self.assertEqual(list(small.difference(AVLSortedList.bulk_load(elements))),
+                             sorted((other_counter - counter).elements()))
+
+        union = AVLSortedList.bulk_load([1, 2, 2]).union(AVLSortedList.bulk_load([2, 3]), merge_values=max)
+        self.assertEqual(list(union), [1, 2, 2, 3])
+
+    def test_freeze(self):
+        elements = [random.randint(0, 100) for _ in range(500)]
+        frozen = AVLSortedList.bulk_load(elements).freeze()
+
+        self.assertEqual(list(frozen), [(e, elements.count(e)) for e in sorted(set(elements))])
+        self.assertEqual(len(frozen), len(set(elements)))
+        self.assertEqual(frozen[elements[0]], elements.count(elements[0]))
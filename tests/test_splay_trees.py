@@ -0,0 +1,92 @@
+import pickle
+import random
+import unittest
+
+from pymaps import SplayTree
+from tests.test_utils import inorder_str
+
+
+class TestSplayTrees(unittest.TestCase):
+
+    def test_splay_on_access(self):
+        bt = SplayTree()
+
+        for i in range(10):
+            bt[i] = i
+
+        self.assertEqual(bt._root.get_key(), 9)
+
+        self.assertEqual(bt[3], 3)
+        self.assertEqual(bt._root.get_key(), 3)
+
+        self.assertTrue(7 in bt)
+        self.assertEqual(bt._root.get_key(), 7)
+
+        bt[5] = 50
+        self.assertEqual(bt._root.get_key(), 5)
+
+        self.assertEqual(inorder_str(bt), "0123456789")
+        self.assertEqual(bt._root.get_subtree_size(), 10)
+
+    def test_splay_interval(self):
+        bt = SplayTree(splay_interval=3)
+
+        for i in range(10):
+            bt[i] = i
+
+        bt[2]
+        bt[2]
+        self.assertEqual(bt._root.get_key(), 9)
+
+        bt[2]
+        self.assertEqual(bt._root.get_key(), 2)
+
+        self.assertRaises(ValueError, SplayTree, splay_interval=0)
+
+    def test_random_inserts_and_delete(self):
+        bt = SplayTree()
+        control = dict()
+
+        for i in range(10000):
+            key = random.randint(0, 2000)
+            action = random.randint(0, 100)
+
+            if action > 60 and key in control:
+                del bt[key]
+                del control[key]
+            elif action > 30:
+                self.assertEqual(bt[key], control.get(key))
+            else:
+                bt[key] = i
+                control[key] = i
+
+        self.assertEqual(list(bt), sorted(control.items()))
+        self.assertEqual(len(bt), len(control))
+
+        for i, key in enumerate(sorted(control)):
+            self.assertEqual(bt.index_of(key), i)
+            self.assertEqual(bt.at_index(i), (key, control[key]))
+
+        self.assertEqual(bt.get_min(), min(control.items()))
+        self.assertEqual(bt.get_max(), max(control.items()))
+
+    def test_get_many(self):
+        bt = SplayTree()
+
+        for i in range(100):
+            bt[i] = -i
+
+        self.assertEqual(bt.get_many([42, 7, 500, 7]), [-42, -7, None, -7])
+        self.assertIn(bt._root.get_key(), (7, 42))
+        self.assertEqual(inorder_str(bt), "".join(str(i) for i in range(100)))
+        self.assertEqual(bt._root.get_subtree_size(), 100)
+
+    def test_pickle(self):
+        bt = SplayTree(splay_interval=4)
+        for i in range(100):
+            bt[i] = i
+
+        copy = pickle.loads(pickle.dumps(bt))
+
+        self.assertEqual(list(copy), list(bt))
+        self.assertEqual(copy._splay_interval, 4)